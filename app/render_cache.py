@@ -0,0 +1,41 @@
+# Caches rendered HTML fragments between requests.
+import threading
+from collections import OrderedDict
+
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class RenderCache:
+    """
+    Thread safe LRU cache of rendered HTML fragments, capped by the total size of the cached strings. Keys should include the
+    database version the fragment was rendered from, so a reload never serves stale tables.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: the cached fragment, or None
+        """
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            if key in self._fragments:
+                self.size -= len(self._fragments.pop(key))
+            self._fragments[key] = fragment
+            self.size += len(fragment)
+            while self.size > self.max_bytes and len(self._fragments) > 1:
+                _, evicted = self._fragments.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self._fragments)
@@ -1,13 +1,21 @@
-import json
 import pandas as pd
 from flask import render_template
 from app import app
+from app.render_cache import RenderCache
+from app.snapshot import SnapshotLoader
+from nfl.columns import COLUMN_DISPLAY_NAMES
+
+DATABASE_FILE = 'json/leagueid_1075600889420845056.json'
+
+league_snapshot = SnapshotLoader(DATABASE_FILE)
+player_table_cache = RenderCache()
 
 
 def load_database():
-    with open('json/leagueid_1075600889420845056.json') as file:
-        database_data = json.load(file)
-    return database_data
+    """
+    Returns the rosters of the current league snapshot. They are shared between requests, don't modify them.
+    """
+    return league_snapshot.get().rosters
 
 
 def reformat_player_data(player_dataframe):
@@ -23,99 +31,42 @@ def reformat_player_data(player_dataframe):
     player_dataframe.columns = player_dataframe.columns.astype(str)
 
     # resolve column names
-    player_dataframe.columns = player_dataframe.columns.str.replace('Rk', 'Index') \
-        .str.replace('G#', 'Game') \
-        .str.replace('Tm', 'Team') \
-        .str.replace('1', '') \
-        .str.replace('Opp', 'Opponent') \
-        .str.replace('GS', 'Starter') \
-        .str.replace('Off. Snaps_Num', '# Offensive Snaps') \
-        .str.replace('Off. Snaps_Pct', '% Offensive Snaps') \
-        .str.replace('Def. Snaps_Pct', '% Defensive Snaps') \
-        .str.replace('Def. Snaps_Num', '# Defensive Snaps') \
-        .str.replace('ST Snaps_Num', '# Special Teams Snaps') \
-        .str.replace('ST Snaps_Pct', '% Special Teams Snaps') \
-        .str.replace('Receiving_Tgt', 'Receiving Targets') \
-        .str.replace('Receiving_Yds', 'Receiving Yards') \
-        .str.replace('Receiving_Y/R', 'Receiving Yards/Reception') \
-        .str.replace('Receiving_TD', 'Receiving TD') \
-        .str.replace('Receiving_Ctch%', 'Receiving Catch %') \
-        .str.replace('Receiving_Y/Tgt', 'Receiving Yards/Target') \
-        .str.replace('Kick Returns_Rt', 'Kick Return Tries') \
-        .str.replace('Kick Returns_Yds', 'Kick Return Yards') \
-        .str.replace('Kick Returns_Y/R', 'Kick Return Yards/Return') \
-        .str.replace('Kick Returns_TD', 'Kick Return TD') \
-        .str.replace('Scoring_2PM', '2pt Conversion') \
-        .str.replace('Scoring_TD', 'Scoring TD (any)') \
-        .str.replace('Scoring_Pts', 'Points Scored') \
-        .str.replace('Fumbles_Fmb', 'Fumbles') \
-        .str.replace('Fumbles_FL', 'Fumbles Lost') \
-        .str.replace('Fumbles_FF', 'Fumbles Forced') \
-        .str.replace('Fumbles_FR', 'Fumbles Recovered') \
-        .str.replace('Fumbles_Yds', 'Fumble Yards Returned') \
-        .str.replace('Fumbles_TD', 'Fumble Return TD') \
-        .str.replace('fantasy_points', 'Fantasy Points') \
-        .str.replace('Sk', 'Sacks') \
-        .str.replace('Tackles_Solo', 'Solo Tackles') \
-        .str.replace('Tackles_Ast', 'Assisted Tackles') \
-        .str.replace('Tackles_Comb', 'Combined Tackles') \
-        .str.replace('Tackles_TFL', 'Tackles for Loss') \
-        .str.replace('Tackles_QBHits', 'QB Hits') \
-        .str.replace('Def Interceptions_Int', 'Def. Interceptions') \
-        .str.replace('Def Interceptions_Yds', 'Def. Interception Yards') \
-        .str.replace('Def Interceptions_TD', 'Def. Interception TD') \
-        .str.replace('Def Interceptions_PD', 'Passes Defended') \
-        .str.replace('Rushing_Att', 'Rush Attempts') \
-        .str.replace('Rushing_Yds', 'Rush Yards') \
-        .str.replace('Rushing_Y/A', 'Rush Yards/Attempt') \
-        .str.replace('Rushing_TD', 'Rush TD') \
-        .str.replace('Passing_Cmp', 'Pass Completions') \
-        .str.replace('Passing_Att', 'Pass Attempts') \
-        .str.replace('Passing_Cmp%', 'Pass Completion %') \
-        .str.replace('Passing_Yds', 'Passing Yards') \
-        .str.replace('Passing_TD', 'Passing TD') \
-        .str.replace('Passing_Int', 'Passing INT') \
-        .str.replace('Passing_Rate', 'Pass Rate') \
-        .str.replace('Passing_Sk', 'Sacked') \
-        .str.replace('Passing_Yds.1', 'Yards Lost to Sacks') \
-        .str.replace('Passing_Y/A', 'Pass Yards/Attempt') \
-        .str.replace('Passing_AY/A', 'Adjusted Pass Yards/Attempt*') \
-        .str.replace('Punt Returns_Ret', 'Punt Return Tries') \
-        .str.replace('Punt Returns_Yds', 'Punt Return Yards') \
-        .str.replace('Punt Returns_Y/R', 'Punt Return Yards/Return') \
-        .str.replace('Punt Returns_TD', 'Punt Return TD') \
-        .str.replace('Scoring_Sfty', 'Safety')
+    player_dataframe = player_dataframe.rename(columns=COLUMN_DISPLAY_NAMES)
     # Passing_AY/A = Pass yds + 20 * Passing TD - 45 * Interceptions / Passes Attempted
     # Remove the index column
     player_dataframe = player_dataframe.iloc[:, 1:]
     return player_dataframe
 
 
+def render_player_table(stats):
+    player_df = pd.DataFrame(stats)
+    player_df = reformat_player_data(player_df)
+    return player_df.to_html(classes='table table-striped', index=False)
+
+
 def get_player_info(player_id):
-    database_data = load_database()
+    snapshot = league_snapshot.get()
+    player = snapshot.players.get(player_id)
     player_query = {}
     player_tables = {}
 
-    for roster in database_data:
-        for player_data in roster['players_data']:
-            for player_name, player_details in player_data.items():
-                if player_details[0]['player_id'] == player_id:
-                    player_query.update({'owner': roster['team_name']})
-                    player_query.update({'owner_id': roster['owner_id']})
-                    player_query.update({
-                        'player_name': player_name,
-                        'details': player_details[0],
-                        'stats': [detail.keys() for detail in player_details[1:]]
-                    })
-                    for year, stats in player_details[1].items():
-                        player_df = pd.DataFrame(stats)
-                        player_df = reformat_player_data(player_df)
-                        player_tables[year] = player_df.to_html(classes='table table-striped', index=False)
-                    for detail in player_details[2:]:
-                        for year, stats in detail.items():
-                            player_df = pd.DataFrame(stats)
-                            player_df = reformat_player_data(player_df)
-                            player_tables[year] = player_df.to_html(classes='table table-striped', index=False)
+    if player:
+        seasons = snapshot.player_seasons(player_id)
+        player_query.update({
+            'owner': player['owner'],
+            'owner_id': player['owner_id'],
+            'player_name': player['player_name'],
+            'details': player['details'],
+            'stats': [detail.keys() for detail in seasons]
+        })
+        for detail in seasons:
+            for year, stats in detail.items():
+                cache_key = (player_id, year, snapshot.version)
+                player_table = player_table_cache.get(cache_key)
+                if player_table is None:
+                    player_table = render_player_table(stats)
+                    player_table_cache.put(cache_key, player_table)
+                player_tables[year] = player_table
     return player_query, player_tables
 
 
@@ -146,20 +97,9 @@ def generate_breadcrumbs(current_page, crumbs=None):
 @app.route('/team/<int:owner_id>')
 def team_info(owner_id):
     owner_id = str(owner_id)
-    database_data = load_database()
-    selected_team = None
-    roster = []
-    for team in database_data:
-        if team['owner_id'] == owner_id:
-            selected_team = team
-            roster.clear()
-            for player_data in selected_team['players_data']:
-                for player_name, player_details in player_data.items():
-                    roster.append({
-                        'player_name': player_name,
-                        'position': player_details[0]['position'],
-                        'player_id': player_details[0]['player_id']
-                    })
+    team = league_snapshot.get().teams.get(owner_id)
+    selected_team = team['team'] if team else None
+    roster = team['roster'] if team else []
     if selected_team:
         crumbs = {"team_name": selected_team['team_name'], "owner_id": selected_team['owner_id']}
         breadcrumbs = generate_breadcrumbs('team', crumbs=crumbs)
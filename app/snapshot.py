@@ -0,0 +1,142 @@
+# Keeps the league database in memory for the request handlers.
+import hashlib
+import json
+import logging
+import os
+import threading
+from types import MappingProxyType
+
+from nfl.stats_store import LeagueStatsStore
+
+
+class LeagueSnapshot:
+    """
+    One loaded version of the league database plus the lookup indexes the routes need. Handlers share it between
+    requests: the indexes are read only mappings, the roster and player dicts in them must not be modified either.
+
+    Attributes:
+        rosters (tuple): The league database's roster dicts.
+        version (str): Content hash of the database file the snapshot was loaded from.
+        players (MappingProxyType): player_id -> {'owner', 'owner_id', 'player_name', 'details', 'seasons'}, seasons being
+            the player's list of {"YYYY_stats": {...}} dicts.
+        teams (MappingProxyType): owner_id -> {'team': roster dict, 'roster': list of {'player_name', 'position', 'player_id'}}
+    """
+
+    def __init__(self, rosters, version):
+        self.rosters = tuple(rosters)
+        self.version = version
+        players = {}
+        teams = {}
+        for team in self.rosters:
+            roster = []
+            for player_data in team['players_data']:
+                for player_name, player_details in player_data.items():
+                    player_id = player_details[0]['player_id']
+                    players[player_id] = {
+                        'owner': team['team_name'],
+                        'owner_id': team['owner_id'],
+                        'player_name': player_name,
+                        'details': player_details[0],
+                        'seasons': player_details[1:],
+                    }
+                    roster.append({
+                        'player_name': player_name,
+                        'position': player_details[0]['position'],
+                        'player_id': player_id
+                    })
+            teams[team['owner_id']] = {'team': team, 'roster': roster}
+        self.players = MappingProxyType(players)
+        self.teams = MappingProxyType(teams)
+
+    def player_seasons(self, player_id):
+        """
+        :return: list of {"YYYY_stats": {stat: {row: value}}} dicts, the player's gamelogs
+        """
+        return self.players[player_id]['seasons']
+
+
+class StoreSnapshot(LeagueSnapshot):
+    """
+    LeagueSnapshot of a league's stats store. Only the rosters and player details are loaded, a player's gamelogs are read
+    from the store when player_seasons() is called, so the league is never parsed whole. 'seasons' in the players index is empty.
+    """
+
+    def __init__(self, store_file, version):
+        self.store_file = store_file
+        with LeagueStatsStore(store_file) as store:
+            rosters = [{
+                'owner_id': roster['owner_id'],
+                'display_name': roster['display_name'],
+                'team_name': roster['team_name'],
+                'players_data': [{player_name: [details]} for _, player_name, details in roster['players']],
+            } for roster in store.rosters()]
+        super().__init__(rosters, version)
+
+    def player_seasons(self, player_id):
+        # One connection per call, request handlers run on several threads.
+        with LeagueStatsStore(self.store_file) as store:
+            return [{stats_key: stats_table} for stats_key, stats_table in store.player_seasons(player_id).items()]
+
+
+class SnapshotLoader:
+    """
+    Loads the league database once and hands the same LeagueSnapshot to every request. The file is stat'ed on each get(),
+    and reloaded when its mtime or size changes. If the content hash changed too, the new snapshot is swapped in
+    atomically. While one thread reloads, everyone else keeps reading the previous snapshot.
+
+    When the database has a stats store, the store is served instead through a StoreSnapshot. Hashing the store would read
+    all of it, so its mtime and size are its version.
+    """
+
+    def __init__(self, database_file):
+        self.database_file = database_file
+        self.store_file = LeagueStatsStore.store_file_for(database_file)
+        self._snapshot = None
+        self._file_state = None
+        self._reload_lock = threading.Lock()
+
+    def _read_file_state(self):
+        source = self.store_file if os.path.exists(self.store_file) else self.database_file
+        stat = os.stat(source)
+        return source, stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        """
+        :return: LeagueSnapshot, the latest loaded version of the database
+        """
+        file_state = self._read_file_state()
+        snapshot = self._snapshot
+        if snapshot is not None and file_state == self._file_state:
+            return snapshot
+
+        # Only the first caller to see the change reloads, the rest carry on with the snapshot they already have.
+        if not self._reload_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            if self._snapshot is not None and file_state == self._file_state:
+                return self._snapshot
+            self._reload(file_state)
+            return self._snapshot
+        finally:
+            self._reload_lock.release()
+
+    def _reload(self, file_state):
+        source, mtime_ns, size = file_state
+        if source == self.store_file:
+            self._snapshot = StoreSnapshot(self.store_file, f"{mtime_ns}-{size}")
+            self._file_state = file_state
+            logging.info(f"Loaded {self.store_file=} version={self._snapshot.version}")
+            return
+        with open(self.database_file, 'rb') as file:
+            raw = file.read()
+        version = hashlib.sha256(raw).hexdigest()
+        if self._snapshot is None or version != self._snapshot.version:
+            self._snapshot = self.build(json.loads(raw), version)
+            logging.info(f"Loaded {self.database_file=} {version=}")
+        self._file_state = file_state
+
+    def build(self, rosters, version):
+        """
+        Builds the snapshot for a freshly loaded database.
+        """
+        return LeagueSnapshot(rosters, version)
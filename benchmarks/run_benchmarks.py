@@ -0,0 +1,246 @@
+"""
+Times the hot paths against a synthetic league and writes the results as json, so runs on two commits can be compared.
+
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --compare bench_results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from benchmarks.synthetic_league import SyntheticLeague
+from nfl.pfr_standin import PFRStandin
+
+# TLOOJ's scoring, every field stat_weight_from_scoring_settings() reads.
+SCORING_SETTINGS = {
+    'pass_yd': 0.04, 'pass_td': 4, 'rec_td': 6, 'rush_td': 6, 'st_td': 6, 'idp_def_td': 6, 'idp_safe': 2, 'rec': 0.5,
+    'rush_yd': 0.1, 'rec_yd': 0.1, 'kr_yd': 0.04, 'pr_yd': 0.04, 'pass_int': -2, 'idp_sack': 2, 'idp_int': 3,
+    'idp_pass_def': 1, 'idp_qb_hit': 0.5, 'idp_tkl_loss': 1, 'idp_tkl_solo': 1, 'idp_tkl_ast': 0.5, 'fum': -1,
+    'fum_lost': -2, 'fum_ret_yd': 0.1, 'int_ret_yd': 0.1, 'idp_blk_kick': 2, 'idp_ff': 2, 'idp_fum_rec': 2, 'pass_2pt': 2,
+}
+RESULTS_FILE = 'bench_results.json'
+# The gamelog crawl runs against a local PFR stand-in: every response is this slow and every CRAWL_BURST_EVERY
+# requests one gets a 429, so the timing covers the crawler's concurrency and the client's retries.
+CRAWL_LATENCY_SECONDS = 0.02
+CRAWL_BURST_EVERY = 20
+
+
+class FakeLeague:
+    """
+    Stands in for the sleeper League NFLStatsDatabase wants, it only reads the scoring settings.
+    """
+
+    def __init__(self):
+        self.scoring_settings = SimpleNamespace(**SCORING_SETTINGS)
+
+
+def time_scenario(run, repeat, setup=None):
+    """
+    :param run: callable, the timed work
+    :param repeat: int, number of timed runs
+    :param setup: callable, optional, untimed work before each run
+    :return: dict of timings in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+    }
+
+
+def write_json(file_path, data):
+    with open(file_path, 'w') as file:
+        json.dump(data, file, indent=4)
+
+
+def crawl_scenario(league, workdir, standin):
+    """
+    Fetches one season of gamelog pages for every player in the league on the gamelog Crawler's thread pool, from the
+    stand-in instead of PFR. Pages aren't parsed, this times the crawler's concurrency and the client's retries. The
+    response cache and rate limiter are fresh for every run, so every page is requested.
+    :return: tuple, (run, setup)
+    """
+    from nfl.crawler import Crawler, HostRateLimiter
+    from nfl.http_cache import ResponseCache
+    from nfl.http_client import HTTPClient
+
+    pfr_player_ids = [f"{details[0]['last_name'][:4]}{details[0]['first_name'][:2]}{i % 100:02d}"
+                      for i, details in enumerate(details for roster in league.league_data
+                                                  for player in roster['players_data'] for details in player.values())]
+    cache_directory = os.path.join(workdir, 'http_cache')
+    clients = []
+
+    def setup():
+        shutil.rmtree(cache_directory, ignore_errors=True)
+        limiter = HostRateLimiter(requests_per_minute=600000, burst=100)
+        clients[:] = [HTTPClient(backoff_base=0.01, limiter=limiter, cache=ResponseCache(cache_directory))]
+
+    def fetch(pfr_player_id, year):
+        return clients[0].get_text(f"{standin.url}/players/{pfr_player_id[0]}/{pfr_player_id}/gamelog/{year}/")
+
+    def crawl():
+        crawler = Crawler(fetch=fetch)
+        for pfr_player_id in pfr_player_ids:
+            crawler.submit(pfr_player_id, league.seasons[-1], lambda page: None)
+        crawler.run()
+
+    return crawl, setup
+
+
+def scenarios(league, workdir, standin=None):
+    """
+    :param league: SyntheticLeague
+    :param workdir: directory the database copies are written to
+    :param standin: PFRStandin, optional, the gamelog crawl only runs with one
+    :return: dict, scenario name -> (run, setup)
+    """
+    from app import routes
+    from app.render_cache import RenderCache
+    from app.snapshot import SnapshotLoader
+    from nfl.json_handler import CustomJSONEncoder
+    from nfl.nfl_stats import NFLStatsDatabase
+    from nfl.sleeper_api import FantasyLeagueDatabase
+    from nfl.utils import rename_keys_in_json
+
+    database_file = os.path.join(workdir, 'json', 'league.json')
+    scratch_file = os.path.join(workdir, 'json', 'scratch.json')
+    os.makedirs(os.path.dirname(database_file))
+    # The CSV export writes to ../data/ relative to the working directory.
+    os.makedirs(os.path.join(workdir, 'data'))
+    write_json(database_file, league.league_data)
+    new_owner_data = league.churned_rosters()
+
+    def reset_scratch():
+        shutil.copyfile(database_file, scratch_file)
+
+    def export_csv():
+        cwd = os.getcwd()
+        os.chdir(os.path.join(workdir, 'json'))
+        try:
+            CustomJSONEncoder.normalize_gamelog_json_database_to_csv_format('league.json')
+        finally:
+            os.chdir(cwd)
+
+    def diff_rostered_players():
+        # Everything diff_rostered_players does once Sleeper has answered.
+        with open(database_file, 'r') as file:
+            old_owner_json = json.load(file)
+        FantasyLeagueDatabase.diff_rosters(old_owner_json, new_owner_data, league.player_data)
+
+    routes.league_snapshot = SnapshotLoader(database_file)
+    client = routes.app.test_client()
+    owner_ids = [roster['owner_id'] for roster in league.league_data]
+    player_ids = [details[0]['player_id'] for roster in league.league_data for player in roster['players_data'] for details in player.values()]
+
+    def get(paths):
+        # player_info prints the whole player, keep it out of the report.
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path in paths:
+                response = client.get(path)
+                assert response.status_code == 200, (path, response.status_code)
+
+    def clear_render_cache():
+        routes.player_table_cache = RenderCache()
+
+    timed = {
+        "calculate_fantasy_points": (NFLStatsDatabase(scratch_file, FakeLeague()).calculate_fantasy_points, reset_scratch),
+        "normalize_gamelog_json_database_to_csv_format": (export_csv, None),
+        "rename_keys_in_json": (lambda: rename_keys_in_json(scratch_file), reset_scratch),
+        "diff_rostered_players": (diff_rostered_players, None),
+        "route_team": (lambda: get(f'/team/{owner_id}' for owner_id in owner_ids), None),
+        "route_player_cold": (lambda: get(f'/player/{player_id}' for player_id in player_ids), clear_render_cache),
+        "route_player_warm": (lambda: get(f'/player/{player_id}' for player_id in player_ids), None),
+    }
+    if standin is not None:
+        timed["crawl_gamelogs"] = crawl_scenario(league, workdir, standin)
+    return timed
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    league = SyntheticLeague(teams=args.teams, roster_size=args.roster_size, seasons=args.seasons,
+                             games_per_season=args.games, seed=args.seed)
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "fixture": {"teams": args.teams, "roster_size": args.roster_size, "seasons": args.seasons, "games": args.games, "seed": args.seed},
+        "scenarios": {},
+    }
+    selected = set(args.scenario or [])
+    standin = PFRStandin(latency=CRAWL_LATENCY_SECONDS, burst_every=CRAWL_BURST_EVERY, retry_after=0)
+    with tempfile.TemporaryDirectory() as workdir, standin:
+        for name, (work, setup) in scenarios(league, workdir, standin).items():
+            if selected and name not in selected:
+                continue
+            results["scenarios"][name] = time_scenario(work, args.repeat, setup)
+            print(f"{name:<48} median {results['scenarios'][name]['median'] * 1000:10.2f} ms")
+        results["pfr_standin"] = standin.counters()
+    return results
+
+
+def compare(results, baseline):
+    """
+    Prints each scenario's median against the baseline's, > 1 is slower.
+    """
+    if results["fixture"] != baseline["fixture"]:
+        print(f"Fixtures differ, ratios are not comparable: {baseline['fixture']} vs {results['fixture']}")
+    print(f"{'scenario':<48} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for name, timings in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<48} {'-':>12} {timings['median'] * 1000:12.2f} {'-':>7}")
+            continue
+        print(f"{name:<48} {before['median'] * 1000:12.2f} {timings['median'] * 1000:12.2f} {timings['median'] / before['median']:7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--roster-size', type=int, default=25)
+    parser.add_argument('--seasons', type=int, default=3)
+    parser.add_argument('--games', type=int, default=17, help='gamelog rows per season')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scenario', action='append', help='only run this scenario, can be given more than once')
+    parser.add_argument('--output', default=RESULTS_FILE, help='json file the results are written to')
+    parser.add_argument('--compare', help='results json of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    results = run(args)
+    write_json(args.output, results)
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            compare(results, json.load(file))
+    return results
+
+
+if __name__ == '__main__':
+    main()
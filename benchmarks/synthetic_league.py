@@ -0,0 +1,137 @@
+# Generates synthetic league databases in the same shape generate_league_database() writes.
+import random
+
+# Columns every PFR gamelog has, before the position specific stats.
+GAME_COLUMNS = ['Rk', 'Year', 'Date', 'G#', 'Week', 'Age', 'Tm', '1', 'Opp', 'Result', 'GS']
+OFFENSE_COLUMNS = [
+    'Passing_Cmp', 'Passing_Att', 'Passing_Cmp%', 'Passing_Yds', 'Passing_TD', 'Passing_Int', 'Passing_Rate', 'Passing_Sk',
+    'Passing_Yds.1', 'Passing_Y/A', 'Passing_AY/A', 'Rushing_Att', 'Rushing_Yds', 'Rushing_Y/A', 'Rushing_TD',
+    'Receiving_Tgt', 'Receiving_Rec', 'Receiving_Yds', 'Receiving_Y/R', 'Receiving_TD', 'Receiving_Ctch%', 'Receiving_Y/Tgt',
+    'Scoring_2PM', 'Scoring_TD', 'Scoring_Pts', 'Fumbles_Fmb', 'Fumbles_FL', 'Off. Snaps_Num', 'Off. Snaps_Pct',
+    'ST Snaps_Num', 'ST Snaps_Pct',
+]
+DEFENSE_COLUMNS = [
+    'Def Interceptions_Int', 'Def Interceptions_Yds', 'Def Interceptions_TD', 'Def Interceptions_PD', 'Sk', 'Tackles_Comb',
+    'Tackles_Solo', 'Tackles_Ast', 'Tackles_TFL', 'Tackles_QBHits', 'Fumbles_FF', 'Fumbles_FR', 'Fumbles_Yds', 'Fumbles_TD',
+    'Scoring_Sfty', 'Def. Snaps_Num', 'Def. Snaps_Pct', 'ST Snaps_Num', 'ST Snaps_Pct',
+]
+POSITIONS = {'QB': OFFENSE_COLUMNS, 'RB': OFFENSE_COLUMNS, 'WR': OFFENSE_COLUMNS, 'TE': OFFENSE_COLUMNS,
+             'DL': DEFENSE_COLUMNS, 'LB': DEFENSE_COLUMNS, 'DB': DEFENSE_COLUMNS}
+TEAMS = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GNB', 'HOU', 'IND', 'JAX', 'KAN']
+# Share of games a player missed, those rows hold "Inactive" instead of stats.
+INACTIVE_RATE = 0.08
+
+
+class SyntheticLeague:
+    """
+    A league database with made up players and gamelogs.
+
+    Attributes:
+        league_data (list): The league database, same shape as the json file.
+        player_data (dict): Sleeper player_id -> player details, like the player store.
+    """
+
+    def __init__(self, teams=12, roster_size=25, seasons=3, last_season=2023, games_per_season=17, stat_columns=None, seed=0):
+        """
+        :param teams: number of rosters
+        :param roster_size: players per roster, taxi and reserve included
+        :param seasons: seasons of gamelogs per player, ending at last_season
+        :param games_per_season: gamelog rows per season
+        :param stat_columns: list of stat columns every player gets, optional, defaults to the columns of their position
+        :param seed: random seed, the same arguments always build the same league
+        """
+        self.random = random.Random(seed)
+        self.seasons = list(range(last_season - seasons + 1, last_season + 1))
+        self.games_per_season = games_per_season
+        self.stat_columns = stat_columns
+        self.player_data = {}
+        self.league_data = []
+        player_id = 1000
+        for team in range(teams):
+            owner_id = str(700000000000000000 + team)
+            players_data = []
+            for _ in range(roster_size):
+                player_id += 1
+                details = self.player_details(str(player_id))
+                self.player_data[details['player_id']] = details
+                stats = [{f"{season}_stats": self.gamelogs(details, season)} for season in self.seasons]
+                players_data.append({details['full_name']: [details] + stats})
+            self.league_data.append({
+                "owner_id": owner_id,
+                "display_name": f"owner_{team}",
+                "team_name": f"Team {team}",
+                "players_data": players_data,
+            })
+
+    def player_details(self, player_id):
+        position = self.random.choice(list(POSITIONS))
+        first_name, last_name = f"First{player_id}", f"Last{player_id}"
+        return {
+            "player_id": player_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "full_name": f"{first_name} {last_name}",
+            "birth_date": f"{self.random.randint(1988, 2002)}-0{self.random.randint(1, 9)}-1{self.random.randint(0, 9)}",
+            "position": position,
+            "fantasy_positions": [position],
+            "team": self.random.choice(TEAMS),
+            "number": self.random.randint(1, 99),
+            "height": str(self.random.randint(68, 79)),
+            "weight": str(self.random.randint(180, 320)),
+            "age": self.random.randint(21, 36),
+            "years_exp": self.random.randint(0, 14),
+            "status": "Active",
+            "injury_status": None,
+        }
+
+    def gamelogs(self, details, season):
+        """
+        :return: {stat: {row: value}} like normalize_game_log_data() produces, after the json round trip
+        """
+        columns = self.stat_columns or POSITIONS[details['position']]
+        table = {column: {} for column in GAME_COLUMNS + columns}
+        for game in range(self.games_per_season):
+            row = str(game)
+            inactive = self.random.random() < INACTIVE_RATE
+            table['Rk'][row] = game + 1
+            table['Year'][row] = season
+            table['Date'][row] = f"{season}-09-{game + 10}"
+            table['G#'][row] = "null" if inactive else game + 1
+            table['Week'][row] = game + 1
+            table['Age'][row] = float(details['age'])
+            table['Tm'][row] = details['team']
+            table['1'][row] = self.random.choice(["@", "null"])
+            table['Opp'][row] = self.random.choice(TEAMS)
+            table['Result'][row] = f"W {self.random.randint(14, 42)}-{self.random.randint(3, 35)}"
+            table['GS'][row] = "Inactive" if inactive else self.random.choice(["*", "null"])
+            for column in columns:
+                if inactive:
+                    table[column][row] = "Inactive"
+                elif column.endswith('%'):
+                    table[column][row] = f"{self.random.randint(0, 100)}%" if 'Snaps' in column else round(self.random.uniform(0, 100), 1)
+                else:
+                    table[column][row] = self.random.randint(0, 12) if self.random.random() < 0.7 else self.random.randint(0, 120)
+        return table
+
+    def churned_rosters(self, churn=0.1, trades=2):
+        """
+        Current rosters after a waiver run: each roster drops a share of its players for free agents, and a few pairs
+        of owners swap players.
+        :return: list of owner_data with players_data holding only player IDs, see FantasyLeagueDatabase.process_rosters()
+        """
+        rosters = [[details[0]['player_id'] for player in roster['players_data'] for details in player.values()]
+                   for roster in self.league_data]
+        next_id = max(int(player_id) for player_id in self.player_data) + 1
+        for roster in rosters:
+            for i in range(len(roster)):
+                if self.random.random() < churn:
+                    free_agent = self.player_details(str(next_id))
+                    self.player_data[free_agent['player_id']] = free_agent
+                    roster[i] = free_agent['player_id']
+                    next_id += 1
+        for _ in range(trades):
+            a, b = self.random.sample(range(len(rosters)), 2)
+            i, j = self.random.randrange(len(rosters[a])), self.random.randrange(len(rosters[b]))
+            rosters[a][i], rosters[b][j] = rosters[b][j], rosters[a][i]
+        return [{"owner_id": roster['owner_id'], "display_name": roster['display_name'], "team_name": roster['team_name'],
+                 "players_data": players} for roster, players in zip(self.league_data, rosters)]
@@ -0,0 +1,272 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from nfl.constants import DATA_DIRECTORY
+from nfl.stats_store import LeagueStatsStore
+
+# Aggregates per player, as (output column, aggregation, gamelog stat). Same as summarize_data() in r/cluster_analysis.R.
+_OFFENSE_SNAPS = [
+    ('totalSnaps', 'sum', 'Off. Snaps_Num'),
+    ('avgSnaps', 'mean', 'Off. Snaps_Num'),
+    ('avgSapsPct', 'mean', 'Off. Snaps_Pct'),
+    ('weight', 'max', 'weight'),
+    ('height', 'max', 'height'),
+    ('totalFP', 'sum', 'fantasy_points'),
+]
+_DEFENSE_SNAPS = [
+    ('totalSnaps', 'sum', 'Def. Snaps_Num'),
+    ('avgSnaps', 'mean', 'Def. Snaps_Num'),
+    ('avgSapsPct', 'mean', 'Def. Snaps_Pct'),
+    ('weight', 'max', 'weight'),
+    ('height', 'max', 'height'),
+    ('totalFP', 'sum', 'fantasy_points'),
+]
+QB_SUMMARY = _OFFENSE_SNAPS + [
+    ('totalFumble', 'sum', 'Fumbles_Fmb'),
+    ('avgFumble', 'mean', 'Fumbles_Fmb'),
+    ('totalFumbleTO', 'sum', 'Fumbles_FL'),
+    ('avgFumbleTO', 'mean', 'Fumbles_FL'),
+    ('totalRushingAtt', 'sum', 'Rushing_Att'),
+    ('avgRushingAtt', 'mean', 'Rushing_Att'),
+    ('totalRushingYds', 'sum', 'Rushing_Yds'),
+    ('avgRushingYds', 'mean', 'Rushing_Yds'),
+    ('totalRushingTd', 'sum', 'Rushing_TD'),
+    ('avgRushingTd', 'mean', 'Rushing_TD'),
+    ('avgRushingYA', 'mean', 'Rushing_Y/A'),
+    ('totalPasses', 'sum', 'Passing_Cmp'),
+    ('avgPasses', 'mean', 'Passing_Cmp'),
+    ('totalPassAtt', 'sum', 'Passing_Att'),
+    ('avgPassAtt', 'mean', 'Passing_Att'),
+    ('avgCompPct', 'mean', 'Passing_Cmp%'),
+    ('totalPassYds', 'sum', 'Passing_Yds'),
+    ('avgPassYds', 'mean', 'Passing_Yds'),
+    ('totalPassingTd', 'sum', 'Passing_TD'),
+    ('avgPassingTd', 'mean', 'Passing_TD'),
+    ('totalPassingInt', 'sum', 'Passing_Int'),
+    ('avgPassingInt', 'mean', 'Passing_Int'),
+    ('avg', 'mean', 'Passing_Rate'),
+    ('avgsackedPct', 'mean', 'Passing_Sk'),
+    ('avgAdjAYdsAtt', 'mean', 'Passing_AY/A'),
+]
+RECEIVER_SUMMARY = _OFFENSE_SNAPS + [
+    ('totalTargets', 'sum', 'Receiving_Tgt'),
+    ('avgTargets', 'mean', 'Receiving_Tgt'),
+    ('totalReceptions', 'sum', 'Receiving_Rec'),
+    ('avgReceptions', 'mean', 'Receiving_Rec'),
+    ('totalYards', 'sum', 'Receiving_Yds'),
+    ('avgYards', 'mean', 'Receiving_Yds'),
+    ('avgY/R', 'mean', 'Receiving_Y/R'),
+    ('totalPts', 'sum', 'Scoring_Pts'),
+    ('avgCatchPct', 'mean', 'Receiving_Ctch%'),
+    ('avgY/Tgt', 'mean', 'Receiving_Y/Tgt'),
+    ('totalFl', 'sum', 'Fumbles_FL'),
+    ('avgRushingAtt', 'mean', 'Rushing_Att'),
+    ('totalRushingYds', 'sum', 'Rushing_Yds'),
+    ('avgRushingYds', 'mean', 'Rushing_Yds'),
+    ('avgRushingYA', 'mean', 'Rushing_Y/A'),
+]
+DEFENSE_SUMMARY = _DEFENSE_SNAPS + [
+    ('totalSacks', 'sum', 'Sk'),
+    ('totalTFL', 'sum', 'Tackles_TFL'),
+    ('totalQbHit', 'sum', 'Tackles_QBHits'),
+    ('totalFF', 'sum', 'Fumbles_FF'),
+    ('totalFR', 'sum', 'Fumbles_FR'),
+    ('totalYds', 'sum', 'Fumbles_Yds'),
+    ('totalFTd', 'sum', 'Fumbles_TD'),
+    ('totalTackSolo', 'sum', 'Tackles_Solo'),
+    ('avgTackSolo', 'mean', 'Tackles_Solo'),
+    ('totalTackAst', 'sum', 'Tackles_Ast'),
+    ('avgTackAst', 'mean', 'Tackles_Ast'),
+    ('totalInt', 'sum', 'Def Interceptions_Int'),
+    ('totalIntYds', 'sum', 'Def Interceptions_Yds'),
+    ('totalTd', 'sum', 'Def Interceptions_TD'),
+    ('totalPd', 'sum', 'Def Interceptions_PD'),
+    ('totalSaf', 'sum', 'Scoring_Sfty'),
+]
+
+
+class PositionGroup:
+    """
+    How one position is clustered.
+
+    Attributes:
+        position (str): Position name, used in output file names.
+        fantasy_positions (tuple): Sleeper fantasy_positions, joined with a space, that belong to the group.
+        summary (list): (output column, aggregation, gamelog stat) aggregates to cluster on.
+        percent_stats (tuple): Gamelog stats that are percentages and get divided by 100.
+        num_clusters (int): Clusters to cut the tree into.
+        index (dict): Cluster -> display index used to color the plots, clusters not in it keep their number.
+    """
+
+    def __init__(self, position, summary, percent_stats, num_clusters, index, fantasy_positions=None):
+        self.position = position
+        self.summary = summary
+        self.percent_stats = percent_stats
+        self.num_clusters = num_clusters
+        self.index = index
+        self.fantasy_positions = fantasy_positions or (position,)
+
+
+# The cluster -> index remaps were picked by hand in r/cluster_analysis.R, so similar tiers share a color across positions.
+POSITION_GROUPS = [
+    PositionGroup("WR", RECEIVER_SUMMARY, ('Off. Snaps_Pct', 'Receiving_Ctch%'), 4, {1: 3, 2: 1, 3: 2}),
+    PositionGroup("RB", RECEIVER_SUMMARY, ('Off. Snaps_Pct', 'Receiving_Ctch%'), 5, {4: 1, 1: 2, 2: 3, 3: 5, 5: 4}),
+    PositionGroup("QB", QB_SUMMARY, ('Off. Snaps_Pct', 'Passing_Cmp%'), 5, {2: 1, 1: 5, 5: 4, 4: 2}),
+    PositionGroup("TE", RECEIVER_SUMMARY, ('Off. Snaps_Pct', 'Receiving_Ctch%'), 4, {1: 3, 3: 2, 2: 1}, ("TE", "TE QB")),
+    PositionGroup("DL", DEFENSE_SUMMARY, ('Def. Snaps_Pct',), 4, {1: 3, 3: 4, 4: 2, 2: 1}, ("DL", "DE", "LB DL")),
+    PositionGroup("LB", DEFENSE_SUMMARY, ('Def. Snaps_Pct',), 4, {3: 4, 4: 3}),
+    PositionGroup("DB", DEFENSE_SUMMARY, ('Def. Snaps_Pct',), 6, {5: 6, 6: 5}, ("DB", "LB DB")),
+]
+
+OUTPUT_COLUMNS = ['playerName', 'avgSnaps', 'totalFP', 'cluster', 'index']
+
+
+def load_games(store, seasons=None):
+    """
+    Reads every stat the position summaries need from the stats store into one numeric frame, one row per game played.
+    Cells follow the R script's cleanup: "null" and stats a game doesn't have are 0, "Inactive"/"Did Not Play" are NaN.
+    :param store: LeagueStatsStore
+    :param seasons: list of seasons, optional, defaults to all
+    :return: DataFrame with the player columns (sleeper_player_id, player_name, display_name, team_name, position,
+        height, weight) and one column per stat
+    """
+    stats = ['Week', 'G#'] + list(dict.fromkeys(
+        stat for group in POSITION_GROUPS for _, _, stat in group.summary if stat not in ('weight', 'height')))
+    cells = pd.DataFrame(store.stat_cells(stats, seasons=seasons), columns=['player_id', 'season', 'row', 'stat', 'num', 'value'])
+    cells['num'] = cells['num'].where(cells['value'] != 'null', 0.0).astype(float)
+    games = cells.pivot(index=['player_id', 'season', 'row'], columns='stat', values='num')
+    present = cells.assign(present=True).pivot(index=['player_id', 'season', 'row'], columns='stat', values='present')
+    games = games.where(present.notna(), 0.0).reindex(columns=stats, fill_value=0.0)
+    # Drop the season total rows and the games the player didn't play in.
+    games = games[(games['Week'] != 0) & (games['G#'].fillna(0) != 0)]
+
+    players = pd.DataFrame([
+        {
+            'sleeper_player_id': player_id,
+            'player_name': player_name,
+            'display_name': roster['display_name'],
+            'team_name': roster['team_name'],
+            'position': ' '.join(details.get('fantasy_positions') or []),
+            'height': pd.to_numeric(details.get('height'), errors='coerce'),
+            'weight': pd.to_numeric(details.get('weight'), errors='coerce'),
+        }
+        for roster in store.rosters() for player_id, player_name, details in roster['players']
+    ], columns=['sleeper_player_id', 'player_name', 'display_name', 'team_name', 'position', 'height', 'weight'])
+    games = games.reset_index(level=['season', 'row'], drop=True).rename_axis('sleeper_player_id').reset_index()
+    return players.merge(games, on='sleeper_player_id', how='inner')
+
+
+def summarize_position(games, group):
+    """
+    Aggregates the games of one position group per player.
+    :return: DataFrame, sleeper_player_id, ID, playerName, human, team, then the group's summary columns. Sorted by player ID
+    """
+    games = games[games['position'].isin(group.fantasy_positions)].copy()
+    for stat in group.percent_stats:
+        games[stat] = games[stat] / 100
+    aggregations = {
+        'ID': ('sleeper_player_id', 'max'),
+        'playerName': ('player_name', 'max'),
+        'human': ('display_name', 'max'),
+        'team': ('team_name', 'max'),
+    }
+    aggregations.update({column: (stat, aggregation) for column, aggregation, stat in group.summary})
+    return games.groupby('sleeper_player_id', sort=True).agg(**aggregations).reset_index()
+
+
+def _distances(features):
+    """
+    Euclidean distances between rows, where a pair's sum of squares only covers the columns both have and is scaled up by
+    columns / columns used, same as R's agnes() does with NAs.
+    :return: np.ndarray, n x n
+    """
+    valid = ~np.isnan(features)
+    filled = np.where(valid, features, 0.0)
+    both = valid[:, None, :] & valid[None, :, :]
+    squares = np.where(both, (filled[:, None, :] - filled[None, :, :]) ** 2, 0.0).sum(axis=2)
+    used = both.sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distances = np.sqrt(squares * features.shape[1] / used)
+    return np.nan_to_num(distances, nan=0.0)
+
+
+def ward_clusters(features, num_clusters):
+    """
+    Ward hierarchical clustering cut into num_clusters, numbered like R's cutree(): by the order each cluster's first
+    row appears in.
+    :param features: np.ndarray, one row per player
+    :return: np.ndarray of cluster numbers starting at 1
+    """
+    if len(features) < 2:
+        return np.ones(len(features), dtype=int)
+    tree = linkage(squareform(_distances(features), checks=False), method='ward')
+    labels = fcluster(tree, t=min(num_clusters, len(features)), criterion='maxclust')
+    order = {}
+    return np.array([order.setdefault(label, len(order) + 1) for label in labels])
+
+
+def cluster_position(games, group):
+    """
+    :return: DataFrame of the position summary with a cluster and an index column
+    """
+    summary = summarize_position(games, group)
+    features = summary.iloc[:, 5:].to_numpy(dtype=float)
+    summary['cluster'] = ward_clusters(features, group.num_clusters)
+    summary['index'] = summary['cluster'].map(lambda cluster: group.index.get(cluster, cluster))
+    logging.info(f"Clustered {len(summary)} {group.position}s into {summary['cluster'].nunique()} clusters")
+    return summary
+
+
+def plot_position(clusters, title, svg_file):
+    """
+    Fantasy points against average snaps, colored by cluster index with a dashed linear fit.
+    """
+    figure, axes = plt.subplots(figsize=(22, 13))
+    for index, points in clusters.groupby('index'):
+        axes.scatter(points['totalFP'], points['avgSnaps'], label=str(index))
+    fit = clusters[['totalFP', 'avgSnaps']].dropna()
+    if len(fit) > 1:
+        slope, intercept = np.polyfit(fit['totalFP'], fit['avgSnaps'], 1)
+        x = np.linspace(fit['totalFP'].min(), fit['totalFP'].max(), 100)
+        axes.plot(x, slope * x + intercept, linestyle='--', color='black')
+    for _, player in clusters.iterrows():
+        axes.annotate(player['playerName'], (player['totalFP'], player['avgSnaps']), fontsize=10)
+    axes.set_title(title)
+    axes.set_xlabel("Fantasy Points")
+    axes.set_ylabel("Average Snaps")
+    axes.legend(title="Clusters")
+    axes.grid(True, color='0.8')
+    figure.savefig(svg_file, format='svg')
+    plt.close(figure)
+
+
+def run_cluster_analysis(database_file, output_directory=DATA_DIRECTORY, seasons=None):
+    """
+    Clusters every position group of a league straight from its stats store, replacing the CSV export and
+    r/cluster_analysis.R. Writes cluster_output.csv and a <position>_Cluster.svg per position to output_directory.
+    :param database_file: path to the league database file, its stats store is read
+    :param seasons: list of seasons, optional, defaults to all
+    :return: dict, position -> DataFrame of playerName, avgSnaps, totalFP, cluster, index
+    """
+    with LeagueStatsStore.for_database(database_file) as store:
+        games = load_games(store, seasons=seasons)
+
+    os.makedirs(output_directory, exist_ok=True)
+    results = {}
+    for group in POSITION_GROUPS:
+        clusters = cluster_position(games, group)[OUTPUT_COLUMNS]
+        results[group.position] = clusters
+        if len(clusters):
+            plot_position(clusters, f"{group.position} Cluster Analysis", os.path.join(output_directory, f"{group.position}_Cluster.svg"))
+
+    pd.concat(results.values(), ignore_index=True).to_csv(os.path.join(output_directory, "cluster_output.csv"), index=False)
+    return results
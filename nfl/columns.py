@@ -0,0 +1,92 @@
+# Canonical names for the columns of PFR's gamelog tables, shared by the ingest path and the web app.
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def canonical_column_name(column):
+    """
+    Flattens one of PFR's two level gamelog headers into the name stored in the league database, e.g. ("Passing", "Yds")
+    becomes "Passing_Yds". Headers pandas couldn't name, like ("Unnamed: 0_level_0", "Rk"), keep only their last part, "Rk".
+    Each header is resolved once and then served from the cache, so this can run on every table that's ingested.
+    :param column: tuple of header levels, or an already flat str
+    :return: str
+    """
+    name = '_'.join(map(str, column)).strip() if isinstance(column, tuple) else column
+    if name.startswith("Unnamed"):
+        return name.split('_')[-1]
+    return name
+
+
+def canonical_column_names(columns):
+    """
+    :param columns: iterable of headers, e.g. DataFrame.columns
+    :return: list of canonical names, in the same order
+    """
+    return [canonical_column_name(column) for column in columns]
+
+
+# Canonical column names -> names shown on the player pages. Matched exactly, in one pass.
+COLUMN_DISPLAY_NAMES = {
+    'Rk': 'Index',
+    'G#': 'Game',
+    'Tm': 'Team',
+    '1': '',  # The home/away '@' column
+    'Opp': 'Opponent',
+    'GS': 'Starter',
+    'Off. Snaps_Num': '# Offensive Snaps',
+    'Off. Snaps_Pct': '% Offensive Snaps',
+    'Def. Snaps_Pct': '% Defensive Snaps',
+    'Def. Snaps_Num': '# Defensive Snaps',
+    'ST Snaps_Num': '# Special Teams Snaps',
+    'ST Snaps_Pct': '% Special Teams Snaps',
+    'Receiving_Tgt': 'Receiving Targets',
+    'Receiving_Yds': 'Receiving Yards',
+    'Receiving_Y/R': 'Receiving Yards/Reception',
+    'Receiving_TD': 'Receiving TD',
+    'Receiving_Ctch%': 'Receiving Catch %',
+    'Receiving_Y/Tgt': 'Receiving Yards/Target',
+    'Kick Returns_Rt': 'Kick Return Tries',
+    'Kick Returns_Yds': 'Kick Return Yards',
+    'Kick Returns_Y/R': 'Kick Return Yards/Return',
+    'Kick Returns_TD': 'Kick Return TD',
+    'Scoring_2PM': '2pt Conversion',
+    'Scoring_TD': 'Scoring TD (any)',
+    'Scoring_Pts': 'Points Scored',
+    'Fumbles_Fmb': 'Fumbles',
+    'Fumbles_FL': 'Fumbles Lost',
+    'Fumbles_FF': 'Fumbles Forced',
+    'Fumbles_FR': 'Fumbles Recovered',
+    'Fumbles_Yds': 'Fumble Yards Returned',
+    'Fumbles_TD': 'Fumble Return TD',
+    'fantasy_points': 'Fantasy Points',
+    'Sk': 'Sacks',
+    'Tackles_Solo': 'Solo Tackles',
+    'Tackles_Ast': 'Assisted Tackles',
+    'Tackles_Comb': 'Combined Tackles',
+    'Tackles_TFL': 'Tackles for Loss',
+    'Tackles_QBHits': 'QB Hits',
+    'Def Interceptions_Int': 'Def. Interceptions',
+    'Def Interceptions_Yds': 'Def. Interception Yards',
+    'Def Interceptions_TD': 'Def. Interception TD',
+    'Def Interceptions_PD': 'Passes Defended',
+    'Rushing_Att': 'Rush Attempts',
+    'Rushing_Yds': 'Rush Yards',
+    'Rushing_Y/A': 'Rush Yards/Attempt',
+    'Rushing_TD': 'Rush TD',
+    'Passing_Cmp': 'Pass Completions',
+    'Passing_Att': 'Pass Attempts',
+    'Passing_Cmp%': 'Pass Completion %',
+    'Passing_Yds': 'Passing Yards',
+    'Passing_TD': 'Passing TD',
+    'Passing_Int': 'Passing INT',
+    'Passing_Rate': 'Pass Rate',
+    'Passing_Sk': 'Sacked',
+    'Passing_Yds.1': 'Yards Lost to Sacks',
+    'Passing_Y/A': 'Pass Yards/Attempt',
+    'Passing_AY/A': 'Adjusted Pass Yards/Attempt*',
+    'Punt Returns_Ret': 'Punt Return Tries',
+    'Punt Returns_Yds': 'Punt Return Yards',
+    'Punt Returns_Y/R': 'Punt Return Yards/Return',
+    'Punt Returns_TD': 'Punt Return TD',
+    'Scoring_Sfty': 'Safety',
+}
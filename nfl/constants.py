@@ -1,8 +1,31 @@
+import os
+
 DATABASE_DIRECTORY = "../json"
 DATA_DIRECTORY = "../data"
 TRANSACTIONS_DIRECTORY = f"{DATA_DIRECTORY}/transactions/"
-GLOBAL_SLEEPER_PLAYER_DATA_FILE = f"{DATABASE_DIRECTORY}/player_data.json"
+GLOBAL_SLEEPER_PLAYER_DATA_FILE = f"{DATABASE_DIRECTORY}/player_data.jsonl"
 GLOBAL_NFL_PLAYER_ID_FILE = f"{DATABASE_DIRECTORY}/player_id_table.csv"
+GLOBAL_NFL_PLAYER_ID_INDEX_FILE = f"{DATABASE_DIRECTORY}/player_id_index.pickle"
+GLOBAL_PFR_ID_OVERRIDES_FILE = f"{DATABASE_DIRECTORY}/pfr_id_overrides.json"
 APP_LOG_DIRECTORY = '../application_logs/'
 LEAGUE_ID = "1075600889420845056"
 
+# Where the PFR fetchers send requests. Point it at a stand-in like nfl.pfr_standin to crawl offline.
+PFR_BASE_URL = os.environ.get("PFR_BASE_URL", "https://www.pro-football-reference.com").rstrip("/")
+
+# pro-football-reference asks scrapers to stay under 20 requests a minute per host.
+PFR_MAX_REQUESTS_PER_MINUTE = 20
+CRAWLER_MAX_WORKERS = 4
+HTTP_CACHE_DIRECTORY = f"{DATA_DIRECTORY}/http_cache"
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Set True to replay only from the response cache and fail on anything that would need the network.
+HTTP_CACHE_OFFLINE = False
+HTTP_TIMEOUT_SECONDS = 30
+# Parsed PFR profiles are reused for this long, long running processes pick up new seasons after it.
+PLAYER_PROFILE_TTL_SECONDS = 24 * 60 * 60
+HTTP_MAX_RETRIES = 5
+# Units in a crawl journal older than this are fetched again when a crawl resumes.
+CRAWL_JOURNAL_MAX_AGE_SECONDS = 24 * 60 * 60
+REFRESH_SCHEDULE_FILE = f"{DATABASE_DIRECTORY}/refresh_schedule.json"
+# Minutes between polls of Sleeper's transactions feed.
+TRANSACTIONS_POLL_MINUTES = 5
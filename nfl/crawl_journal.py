@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from nfl.constants import CRAWL_JOURNAL_MAX_AGE_SECONDS
+
+
+class CrawlJournal:
+    """
+    Append only checkpoint of a crawl. Every finished (pfr_id, season) unit is written as one json line as soon as it's
+    fetched, so when a crawl dies halfway (429s, a crash, Ctrl-C) the next run only fetches what's left.
+
+    Lines look like {"pfr_id": "AlleJo02", "year": "2023", "stats": {"2023_stats": {...}} or null, "fetched_at": epoch seconds}.
+    A null stats means PFR has no gamelog page for that season. Delete the journal with clear() once the crawl's results
+    have been committed.
+    """
+
+    def __init__(self, journal_file, max_age=CRAWL_JOURNAL_MAX_AGE_SECONDS):
+        """
+        :param journal_file: path of the journal
+        :param max_age: seconds, units fetched longer ago than this are fetched again
+        """
+        self.journal_file = journal_file
+        self.units = {}
+        self._lock = threading.Lock()
+        if os.path.exists(journal_file):
+            oldest = time.time() - max_age
+            with open(journal_file, "r") as file:
+                for line in file:
+                    try:
+                        unit = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line is cut short when the process was killed mid write.
+                        logging.info(f"Skipping a partial line in {journal_file=}")
+                        continue
+                    if unit["fetched_at"] >= oldest:
+                        self.units[(unit["pfr_id"], unit["year"])] = unit["stats"]
+            logging.info(f"Resuming crawl from {journal_file=}, {len(self.units)} units already fetched")
+
+    @staticmethod
+    def for_database(database_file):
+        """
+        :param database_file: path to the league database file
+        :return: CrawlJournal stored alongside it
+        """
+        return CrawlJournal(f"{os.path.splitext(database_file)[0]}_crawl_journal.jsonl")
+
+    def get(self, pfr_id, year):
+        """
+        :return: tuple, (done, stats). done is False when the unit still has to be fetched
+        """
+        key = (pfr_id, str(year))
+        return key in self.units, self.units.get(key)
+
+    def record(self, pfr_id, year, stats):
+        """
+        Appends a finished unit to the journal and flushes it to disk. Safe to call from the crawler's worker threads.
+        :param stats: dict, the normalized {"YYYY_stats": {...}} gamelogs, or None if the season has no gamelog page
+        """
+        line = json.dumps({"pfr_id": pfr_id, "year": str(year), "stats": stats, "fetched_at": time.time()})
+        with self._lock:
+            self.units[(pfr_id, str(year))] = stats
+            with open(self.journal_file, "a") as file:
+                file.write(line + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+    def clear(self):
+        """
+        Deletes the journal, call it once the crawl's results are safely written.
+        """
+        with self._lock:
+            self.units = {}
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+                logging.info(f"Removed crawl journal {self.journal_file=}")
+
+    def __len__(self):
+        return len(self.units)
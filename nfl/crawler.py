@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from nfl.constants import PFR_MAX_REQUESTS_PER_MINUTE, CRAWLER_MAX_WORKERS
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket. Tokens refill continuously at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        # _updated is in the future while the bucket is paused, no tokens accrue until then.
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        return now
+
+    def _take(self):
+        """
+        Takes a token if one is available. Call with the lock held.
+        :return: float, 0 if a token was taken, otherwise seconds until one will be
+        """
+        now = self._refill()
+        if now >= self._updated and self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return max(0.0, self._updated - now) + max(0.0, 1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """
+        Blocks until a token is available, then takes it.
+        :return: float, seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._take()
+            if not wait:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def try_acquire(self):
+        """
+        Takes a token if one is available, without blocking.
+        :return: float, 0 if a token was taken, otherwise seconds until one will be
+        """
+        with self._lock:
+            return self._take()
+
+    def available(self):
+        """
+        :return: float, tokens available right now
+        """
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def restore(self, tokens, elapsed=0.0):
+        """
+        Picks up where a bucket from an earlier process left off.
+        :param tokens: float, what available() returned back then
+        :param elapsed: float, seconds since, refilled on top
+        """
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, tokens + max(0.0, elapsed) * self.rate)
+
+    def pause(self, seconds):
+        """
+        Hands out no tokens for the next `seconds`, then a single one, like a server's Retry-After asks for.
+        A shorter pause than one already in effect changes nothing.
+        """
+        with self._lock:
+            resume = self._refill() + seconds
+            if resume > self._updated:
+                self.tokens = min(self.capacity, 1)
+                self._updated = resume
+
+
+class HostRateLimiter:
+    """
+    Keeps one token bucket per host so every request to the same site shares a single budget, no matter which thread sends it.
+    """
+
+    def __init__(self, requests_per_minute=PFR_MAX_REQUESTS_PER_MINUTE, burst=1):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(rate=self.requests_per_minute / 60, capacity=self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url):
+        waited = self.bucket(url).acquire()
+        if waited:
+            logging.debug(f"HostRateLimiter waited {waited:.2f}s before requesting {url=}")
+        return waited
+
+    def pause(self, url, seconds):
+        """
+        Holds every request to url's host for `seconds`, whichever thread sends it.
+        """
+        self.bucket(url).pause(seconds)
+        logging.info(f"HostRateLimiter pausing {urlparse(url).netloc} for {seconds:.1f}s")
+
+
+# One per process, every thread that requests PFR must draw from the same per host budget.
+rate_limiter = HostRateLimiter()
+
+
+class Crawler:
+    """
+    Runs queued (pfr_player_id, year) jobs on a thread pool. Request pacing is left to the shared host rate limiter,
+    so wall clock time is bounded by the allowed request rate instead of serial sleeps.
+
+    Results are handed to their callbacks on the calling thread in submission order as soon as they and every job
+    before them have finished, which keeps merges into the owner_data structures deterministic. A job whose fetch
+    raises is logged and skipped, its callback never runs. A KeyboardInterrupt, or an exception raised by a callback,
+    cancels the jobs that haven't started yet and is raised out of run().
+    """
+
+    def __init__(self, fetch, max_workers=CRAWLER_MAX_WORKERS):
+        """
+        :param fetch: callable(pfr_player_id, year) -> result for one job
+        :param max_workers: int, number of concurrent fetches
+        """
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self._queue = []
+
+    def submit(self, pfr_player_id, year, on_result):
+        """
+        Queues a job. on_result(result) is called by run() once the job and the ones queued before it have been fetched.
+        """
+        self._queue.append(((pfr_player_id, year), on_result))
+
+    def then(self, callback):
+        """
+        Queues a callback with no fetch, run in order with the job callbacks. Use it to finish up a player once all of its seasons are merged.
+        """
+        self._queue.append((None, callback))
+
+    def __len__(self):
+        return sum(1 for job, _ in self._queue if job is not None)
+
+    def run(self):
+        """
+        Fetches every queued job concurrently, running the callbacks in submission order. The queue is emptied.
+        :return: list of the (pfr_player_id, year) jobs whose fetch raised
+        """
+        queue, self._queue = self._queue, []
+        jobs = [job for job, _ in queue if job is not None]
+        logging.info(f"Crawler running {len(jobs)} jobs with {self.max_workers} workers")
+
+        failed = []
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {job: executor.submit(self.fetch, *job) for job in dict.fromkeys(jobs)}
+            for job, callback in queue:
+                if job is None:
+                    callback()
+                    continue
+                try:
+                    result = futures[job].result()
+                except Exception as e:
+                    logging.error(f"Crawler job {job} failed, skipping it. {e=}")
+                    failed.append(job)
+                    continue
+                callback(result)
+        except BaseException:
+            # Don't wait on the rest of the queue, fetches already running finish in the background.
+            logging.info("Crawler stopped, cancelling the jobs that haven't started")
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+        if failed:
+            logging.error(f"Crawler finished with {len(failed)} failed jobs: {failed}")
+        return failed
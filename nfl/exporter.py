@@ -0,0 +1,187 @@
+import csv
+import json
+import logging
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nfl.stats_store import LeagueStatsStore
+
+PLAYER_COLUMNS = ['player_name', 'display_name', 'team_name', 'position', 'sleeper_player_id', 'height', 'weight', 'season']
+PARQUET_BATCH_ROWS = 10000
+# Placeholders PFR tables are filled with, written as empty cells in Parquet.
+MISSING_VALUES = (None, "null", "")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class GamelogExporter:
+    """
+    Flattens a league database into one row per game, with one column per stat across every season, so seasons with
+    different stat columns line up. Rows are produced one player season at a time and written straight out, nothing the
+    size of the export is ever held in memory. Read from the league's stats store instead of a json object, only the
+    player being written is loaded at all.
+
+    Columns: PLAYER_COLUMNS, then the union of every season's stat columns in the order they're first seen.
+    """
+
+    def __init__(self, league_data=None, seasons=None, store_file=None):
+        """
+        :param league_data: league database as json object
+        :param seasons: iterable of seasons to export, optional, default is None (every season)
+        :param store_file: path of a LeagueStatsStore to read instead of league_data
+        """
+        self.league_data = league_data
+        self.store_file = store_file
+        self.seasons = {int(season) for season in seasons} if seasons else None
+        self._schema = None
+
+    @staticmethod
+    def from_file(json_file, seasons=None):
+        """
+        :param json_file: path to the league database file. Its stats store is read when there is one, the json otherwise
+        """
+        store_file = LeagueStatsStore.store_file_for(json_file)
+        if os.path.exists(store_file):
+            return GamelogExporter(seasons=seasons, store_file=store_file)
+        with open(json_file) as file:
+            return GamelogExporter(json.load(file), seasons=seasons)
+
+    @staticmethod
+    def _player_columns(player_name, roster, details):
+        return {
+            'player_name': player_name,
+            'display_name': roster['display_name'],
+            'team_name': roster['team_name'],
+            'position': ' '.join(details.get('fantasy_positions') or []),
+            'sleeper_player_id': details['player_id'],
+            'height': details.get('height'),
+            'weight': details.get('weight'),
+        }
+
+    def player_seasons(self):
+        """
+        :return: generator of (player columns dict, season, {stat: {row: value}} gamelog table)
+        """
+        if self.store_file is not None:
+            yield from self._stored_player_seasons()
+            return
+        for entry in self.league_data:
+            for player in entry['players_data']:
+                for player_name, player_details in player.items():
+                    player_columns = self._player_columns(player_name, entry, player_details[0])
+                    for player_stats in player_details[1:]:
+                        for stats_key, stats_table in player_stats.items():
+                            if not stats_key.endswith('_stats'):
+                                continue
+                            season = int(stats_key.split('_')[0])
+                            if self.seasons is None or season in self.seasons:
+                                yield player_columns, season, stats_table
+
+    def _stored_player_seasons(self):
+        with LeagueStatsStore(self.store_file) as store:
+            for roster in store.rosters():
+                for player_id, player_name, details in roster['players']:
+                    player_columns = self._player_columns(player_name, roster, details)
+                    for stats_key, stats_table in store.player_seasons(player_id, seasons=self.seasons).items():
+                        yield player_columns, int(stats_key.split('_')[0]), stats_table
+
+    def schema(self):
+        """
+        First pass over the database, collects the stat columns and which of them only hold numbers.
+        :return: tuple, (list of stat columns, set of the numeric ones)
+        """
+        if self._schema is None:
+            stat_columns = {}
+            not_numeric = set()
+            for _, _, stats_table in self.player_seasons():
+                for stat, values in stats_table.items():
+                    stat_columns.setdefault(stat, None)
+                    if stat not in not_numeric and any(value not in MISSING_VALUES and not _is_number(value) for value in values.values()):
+                        not_numeric.add(stat)
+            stat_columns = [stat for stat in stat_columns if stat not in PLAYER_COLUMNS]
+            self._schema = stat_columns, set(stat_columns) - not_numeric
+        return self._schema
+
+    def columns(self):
+        return PLAYER_COLUMNS + self.schema()[0]
+
+    def rows(self):
+        """
+        Second pass, one list per game in columns() order. Stats a season doesn't have are None.
+        :return: generator of lists
+        """
+        stat_columns = self.schema()[0]
+        for player_columns, season, stats_table in self.player_seasons():
+            player_values = [player_columns[column] for column in PLAYER_COLUMNS[:-1]] + [season]
+            games = dict.fromkeys(row for values in stats_table.values() for row in values)
+            for row in games:
+                yield player_values + [stats_table.get(stat, {}).get(row) for stat in stat_columns]
+
+    def to_csv(self, output_file):
+        """
+        Streams the export into a CSV file, written to a temp file first and renamed into place.
+        :return: int, number of rows written
+        """
+        temp_file = f"{output_file}.tmp"
+        count = 0
+        with open(temp_file, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.columns())
+            for row in self.rows():
+                writer.writerow(row)
+                count += 1
+        os.replace(temp_file, output_file)
+        logging.info(f"Exported {count} games to {output_file=}")
+        return count
+
+    def to_parquet(self, output_file, batch_rows=PARQUET_BATCH_ROWS):
+        """
+        Streams the export into a Parquet file, batch_rows rows at a time. Stat columns that only hold numbers are
+        float64, the rest are strings.
+        :return: int, number of rows written
+        """
+        stat_columns, numeric = self.schema()
+        fields = [pa.field(column, pa.string()) for column in PLAYER_COLUMNS[:-1]] + [pa.field('season', pa.int64())]
+        fields += [pa.field(stat, pa.float64() if stat in numeric else pa.string()) for stat in stat_columns]
+        schema = pa.schema(fields)
+
+        def cell(field, value):
+            if value in MISSING_VALUES:
+                return None
+            if pa.types.is_string(field.type):
+                return str(value)
+            return value
+
+        def write_batch(writer, batch):
+            columns = [[cell(field, row[i]) for row in batch] for i, field in enumerate(schema)]
+            writer.write_table(pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+
+        temp_file = f"{output_file}.tmp"
+        count = 0
+        batch = []
+        with pq.ParquetWriter(temp_file, schema) as writer:
+            for row in self.rows():
+                batch.append(row)
+                if len(batch) >= batch_rows:
+                    write_batch(writer, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                write_batch(writer, batch)
+                count += len(batch)
+        os.replace(temp_file, output_file)
+        logging.info(f"Exported {count} games to {output_file=}")
+        return count
+
+    def export(self, output_file):
+        """
+        Writes Parquet for .parquet files, CSV otherwise.
+        :return: int, number of rows written
+        """
+        if output_file.endswith('.parquet'):
+            return self.to_parquet(output_file)
+        return self.to_csv(output_file)
@@ -0,0 +1,159 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+
+from nfl.constants import HTTP_CACHE_DIRECTORY, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_OFFLINE
+from nfl.utils import current_nfl_season
+
+CURRENT_SEASON_TTL = 6 * 60 * 60
+PLAYER_PAGE_TTL = 24 * 60 * 60
+DEFAULT_TTL = 24 * 60 * 60
+
+GAMELOG_URL_PATTERN = re.compile(r"/gamelog/(\d{4})/?$")
+
+
+class OfflineCacheMiss(Exception):
+    """
+    Raised in offline mode when a URL isn't in the cache and would have to be fetched.
+    """
+
+
+def pfr_ttl(url):
+    """
+    How long a pro-football-reference page stays fresh. Gamelogs of finished seasons never change so they are kept forever.
+    :param url: str
+    :return: int seconds, or None to never expire
+    """
+    match = GAMELOG_URL_PATTERN.search(url)
+    if match:
+        if int(match.group(1)) < current_nfl_season():
+            return None
+        return CURRENT_SEASON_TTL
+    if "/players/" in url:
+        return PLAYER_PAGE_TTL
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    """
+    On disk cache of response bodies. Bodies are zlib compressed and stored under the sha256 of their URL, an index.json
+    keeps the url, store time, expiry and size of every entry. The expiry is worked out when a page is stored, so a page
+    fetched while its season was running still expires after the season is over. The least recently used entries are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIRECTORY, max_bytes=HTTP_CACHE_MAX_BYTES, ttl_policy=pfr_ttl, offline=HTTP_CACHE_OFFLINE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_policy = ttl_policy
+        self.offline = offline
+        self._index = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @property
+    def index_file(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.zlib")
+
+    def _load_index(self):
+        if self._index is None:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, "r") as file:
+                    self._index = json.load(file)
+            else:
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_file = f"{self.index_file}.tmp"
+        with open(temp_file, "w") as file:
+            json.dump(self._index, file)
+        os.replace(temp_file, self.index_file)
+
+    def get(self, url):
+        """
+        Returns the cached body for url, or None if it isn't cached or has expired.
+        :raises OfflineCacheMiss: in offline mode instead of returning None
+        """
+        key = self.key(url)
+        with self._lock:
+            entry = self._load_index().get(key)
+            now = time.time()
+            if entry is not None:
+                # Entries stored before expiries were kept have none and are fetched again.
+                expires_at = entry.get("expires_at", entry["stored_at"])
+                if self.offline or expires_at is None or now < expires_at:
+                    try:
+                        with open(self._path(key), "rb") as file:
+                            body = zlib.decompress(file.read()).decode("utf-8")
+                        entry["accessed_at"] = now
+                        logging.debug(f"ResponseCache hit {url=}")
+                        return body
+                    except (OSError, zlib.error) as e:
+                        logging.error(f"ResponseCache entry for {url=} is unreadable, dropping it. {e=}")
+                        self._drop(key)
+                        self._save_index()
+                else:
+                    logging.debug(f"ResponseCache entry for {url=} has expired")
+
+        if self.offline:
+            raise OfflineCacheMiss(f"{url} is not in the response cache and offline mode is on.")
+        return None
+
+    def put(self, url, body):
+        key = self.key(url)
+        data = zlib.compress(body.encode("utf-8"))
+        path = self._path(key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+            now = time.time()
+            ttl = self.ttl_policy(url)
+            expires_at = None if ttl is None else now + ttl
+            self._load_index()[key] = {"url": url, "stored_at": now, "expires_at": expires_at, "accessed_at": now, "size": len(data)}
+            self._evict()
+            self._save_index()
+
+    def _drop(self, key):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["accessed_at"]):
+            if total <= self.max_bytes:
+                break
+            logging.debug(f"ResponseCache evicting {entry['url']=}")
+            total -= entry["size"]
+            self._drop(key)
+
+    def flush(self):
+        """
+        Writes the latest access times to the index. Only needed to keep LRU order across runs, entries are persisted on put().
+        """
+        with self._lock:
+            if self._index:
+                self._save_index()
+
+
+# A single instance owns the index file, a second one would overwrite its entries on save.
+response_cache = ResponseCache()
+atexit.register(response_cache.flush)
@@ -0,0 +1,128 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nfl.constants import CRAWLER_MAX_WORKERS, HTTP_TIMEOUT_SECONDS, HTTP_MAX_RETRIES
+from nfl.crawler import rate_limiter
+from nfl.http_cache import response_cache
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header, which is either a number of seconds or an HTTP date.
+    :param value: str, header value
+    :return: float seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HTTPClient:
+    """
+    Shared HTTP client for the PFR fetch path. One pooled requests.Session keeps connections alive across pages,
+    every request waits on the per host rate limiter, and 429/5xx responses and connection errors are retried with
+    exponential backoff and full jitter, honoring Retry-After when the server sends one. A Retry-After also pauses the
+    host in the limiter, so the other workers hold off too instead of spending their own requests on more 429s.
+    """
+
+    def __init__(self, max_retries=HTTP_MAX_RETRIES, backoff_base=2.0, backoff_max=120.0, timeout=HTTP_TIMEOUT_SECONDS,
+                 pool_maxsize=CRAWLER_MAX_WORKERS, limiter=rate_limiter, cache=response_cache):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.limiter = limiter
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._counters = {"requests": 0, "retries": 0, "backoff_seconds": 0.0, "cache_hits": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def counters(self):
+        """
+        :return: dict, snapshot of requests sent, retries, seconds spent backing off and cache hits
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Seconds to wait before the given retry attempt (0 based).
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            # Never retry earlier than the server asked, the jitter only spreads the workers out after that.
+            delay = retry_after + random.uniform(0, self.backoff_base)
+        return delay
+
+    def get(self, url):
+        """
+        GETs url, retrying on 429/5xx and connection errors.
+        :return: requests.Response with a successful status
+        :raises HTTPError: for other bad statuses, or once the retries are used up
+        """
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(url)
+            self._count("requests")
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                logging.error(f"HTTPClient {err=} for {url=}. Retrying {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    # The server asked the whole host to back off, not just this worker.
+                    self.limiter.pause(url, retry_after)
+                delay = self.backoff(attempt, retry_after)
+                logging.error(f"HTTPClient {response.status_code=} for {url=}. Retrying {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            self._count("retries")
+            self._count("backoff_seconds", delay)
+            time.sleep(delay)
+
+    def get_text(self, url):
+        """
+        Returns the body of url, from the response cache when possible.
+        :raises OfflineCacheMiss: when the page isn't cached and the cache is in offline mode
+        """
+        text = self.cache.get(url)
+        if text is not None:
+            self._count("cache_hits")
+            return text
+        text = self.get(url).text
+        self.cache.put(url, text)
+        return text
+
+
+# Shared by every PFR fetch in the process, so they all reuse one connection pool, limiter and cache.
+http_client = HTTPClient()
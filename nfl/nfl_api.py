@@ -3,13 +3,28 @@ import json
 import nfl_data_py as nfl
 import pandas as pd
 from nfl.constants import GLOBAL_NFL_PLAYER_ID_FILE
+from nfl.player_id_index import PlayerIdIndex
 
 
 def create_player_id_table():
     ids = nfl.import_ids()
     file_name = GLOBAL_NFL_PLAYER_ID_FILE
     ids.to_csv(file_name, index=False)
+    PlayerIdIndex.from_table(ids).save()
     return ids
 
+
+def load_player_id_index():
+    """
+    Loads the Sleeper ID cross reference, building it from the csv if it hasn't been built yet.
+    :return: PlayerIdIndex
+    """
+    try:
+        return PlayerIdIndex.load()
+    except FileNotFoundError:
+        index = PlayerIdIndex.from_table(pd.read_csv(GLOBAL_NFL_PLAYER_ID_FILE))
+        index.save()
+        return index
+
 class NFLData:
     pass
\ No newline at end of file
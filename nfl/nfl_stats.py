@@ -3,9 +3,9 @@ import os.path
 
 from bs4 import BeautifulSoup
 from requests.exceptions import HTTPError
-import requests
 import json
 import logging
+import threading
 import time
 import pandas as pd
 from sleeper.model import League
@@ -13,11 +13,137 @@ from sleeper.model import League
 import re
 
 from nfl import utils
-from nfl.constants import GLOBAL_NFL_PLAYER_ID_FILE
+from nfl.columns import canonical_column_names
+from nfl.constants import GLOBAL_NFL_PLAYER_ID_FILE, PFR_BASE_URL, PLAYER_PROFILE_TTL_SECONDS
+from nfl.crawler import Crawler
+from nfl.http_cache import OfflineCacheMiss
+from nfl.http_client import http_client
+from nfl.pfr_id_overrides import pfr_id_overrides, UNIQUE_CASES
+from nfl.scoring import ScoringEngine, stat_weight_from_scoring_settings
+from nfl.stats_store import LeagueStatsStore
 from nfl.utils import create_backup
 from nfl.utils import logging_steup
 
 
+class PlayerProfile:
+    """
+    A player's PFR profile page, parsed once and memoized per PFR ID for PLAYER_PROFILE_TTL_SECONDS.
+
+    Attributes:
+        pfr_player_id (str): The Pro-Football-Reference player ID.
+        name (str): The headline name on the page.
+        position (str): The position listed under the headline.
+        birth_date (str): ISO formatted birth date, as the page's data-birth attribute has it.
+        seasons (list): Years of service, as str.
+    """
+
+    # pfr_player_id -> (fetched_at, PlayerProfile or None)
+    _profiles = {}
+    # pfr_player_id -> Lock held while that profile is fetched, so different players are fetched concurrently.
+    _fetch_locks = {}
+    _lock = threading.Lock()
+    ttl = PLAYER_PROFILE_TTL_SECONDS
+
+    def __init__(self, pfr_player_id, name=None, position=None, birth_date=None, seasons=None):
+        self.pfr_player_id = pfr_player_id
+        self.name = name
+        self.position = position
+        self.birth_date = birth_date
+        self.seasons = seasons or []
+
+    def __repr__(self):
+        return f"PlayerProfile({self.pfr_player_id=}, {self.name=}, {self.position=}, {self.birth_date=}, {self.seasons=})"
+
+    @staticmethod
+    def url(pfr_player_id):
+        return f"{PFR_BASE_URL}/players/{pfr_player_id[0]}/{pfr_player_id}.htm"
+
+    @classmethod
+    def _memoized(cls, pfr_player_id):
+        """
+        :return: tuple, (found, profile). found is False if the profile was never fetched or is older than ttl
+        """
+        with cls._lock:
+            entry = cls._profiles.get(pfr_player_id)
+        if entry is not None and time.time() - entry[0] < cls.ttl:
+            return True, entry[1]
+        return False, None
+
+    @classmethod
+    def fetch(cls, pfr_player_id):
+        """
+        Returns the parsed profile for pfr_player_id. The page is downloaded the first time it's asked for and again
+        once the memoized profile is older than ttl. Threads asking for the same player wait for one download, threads
+        asking for different players don't wait on each other.
+        :return: PlayerProfile, or None if the page doesn't exist
+        :raises HTTPError: for bad responses other than 404, these aren't memoized so the next call tries again
+        """
+        found, profile = cls._memoized(pfr_player_id)
+        if found:
+            return profile
+        with cls._lock:
+            fetch_lock = cls._fetch_locks.setdefault(pfr_player_id, threading.Lock())
+        with fetch_lock:
+            # Another thread may have fetched it while this one waited.
+            found, profile = cls._memoized(pfr_player_id)
+            if found:
+                return profile
+            url = cls.url(pfr_player_id)
+            logging.info(f"Getting player profile for {url=}")
+            try:
+                profile = cls.parse(pfr_player_id, Stats.get_page(url))
+            except HTTPError as http_err:
+                if http_err.response is None or http_err.response.status_code != 404:
+                    raise
+                logging.error(f"HTTP error 404 occurred: {http_err}. {url=} is not valid.")
+                profile = None
+            with cls._lock:
+                cls._profiles[pfr_player_id] = (time.time(), profile)
+            return profile
+
+    @classmethod
+    def parse(cls, pfr_player_id, page):
+        """
+        Parses a profile page. Only the first table (the player's season summary) goes through pandas.
+        :return: PlayerProfile
+        """
+        soup = BeautifulSoup(page, 'html.parser')
+
+        headline = soup.find('h1')
+        name = headline.get_text(strip=True) if headline else None
+
+        position_match = re.search(r'Position\s*:\s*([A-Z/-]+)', soup.get_text(" "))
+        position = position_match.group(1) if position_match else None
+
+        birth_date_element = soup.find('span', {'data-birth': True})
+        birth_date = birth_date_element.get('data-birth') if birth_date_element else None
+
+        seasons = []
+        table = soup.find('table')
+        if table is not None:
+            df = pd.read_html(io.StringIO(str(table)))[0]
+            logging.debug(f"PlayerProfile.parse() {df=}")
+            if ('Unnamed: 0_level_0', 'Year') in df.columns:
+                seasons = df[('Unnamed: 0_level_0', 'Year')].tolist()
+            elif 'Year' in df.columns:
+                seasons = df['Year'].tolist()
+
+            # Extract only numeric parts of the year values and filter out data that isn't a year
+            seasons = [re.sub(r'\D', '', str(item)) for item in seasons]
+            seasons = list(dict.fromkeys(item for item in seasons if item.isdigit() and int(item) > 1000))
+
+        return cls(pfr_player_id, name=name, position=position, birth_date=birth_date, seasons=seasons)
+
+    @classmethod
+    def clear(cls):
+        """
+        Forgets every memoized profile.
+        """
+        with cls._lock:
+            cls._profiles.clear()
+            cls._fetch_locks.clear()
+
+
 class Stats:
     """
     Base class for NFL player stats.
@@ -40,84 +166,67 @@ class Stats:
         self.pfr_player_id = pfr_player_id
 
     def check_players_birthday(self):
-        try:
-            pfr_player_page_url = f"https://www.pro-football-reference.com/players/{self.pfr_player_id[0]}/{self.pfr_player_id}.htm"
-            logging.info(f"Getting birth date for {pfr_player_page_url=}")
-            response = requests.get(pfr_player_page_url)
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            birth_date_element = soup.find('span\"', {'data-birth': True})
-
-            if birth_date_element:
-                return birth_date_element.get('data-birth')
-            else:
-                return None
-        except requests.exceptions.HTTPError as http_err:
-            print(f"HTTP error occurred: {http_err}")
-        except Exception as err:
-            print(f"An error occurred: {err}")
+        """
+        :return: str, ISO birth date on the player's PFR page. None if the page doesn't exist or has no birth date
+        :raises HTTPError: when the page couldn't be fetched, so a transient error is never mistaken for a wrong guess
+        """
+        profile = PlayerProfile.fetch(self.pfr_player_id)
+        if profile:
+            return profile.birth_date
+        return None
 
     def get_years_of_service(self):
         """
         Get the years of service for a player.
         return: list -> years of service
         """
-        pfr_player_page_url = f"https://www.pro-football-reference.com/players/{self.pfr_player_id[0]}/{self.pfr_player_id}.htm"
-        logging.info(f"Getting years of service for {pfr_player_page_url=}")
-        df = self.query_pfr(pfr_player_page_url)
-        logging.debug(f"get_years_of_service() {df=}")
-        if df is not None:
-            if ('Unnamed: 0_level_0', 'Year') in df.columns:
-                years_of_service = df[('Unnamed: 0_level_0', 'Year')].tolist()
-            elif 'Year' in df.columns:
-                years_of_service = df['Year'].tolist()
-            else:
-                years_of_service = []
-
-            # Extract only numeric parts of the year values and filter out data that isn't a year
-            years_of_service = [re.sub(r'\D', '', item) for item in years_of_service if re.sub(r'\D', '', item).isdigit() and int(re.sub(r'\D', '', item)) > 1000]
-            logging.info(f"Years of service for {self.pfr_player_id}: {years_of_service}")
-
-            return years_of_service
+        profile = PlayerProfile.fetch(self.pfr_player_id)
+        if profile is not None:
+            logging.info(f"Years of service for {self.pfr_player_id}: {profile.seasons}")
+            return profile.seasons
         return []
 
     @staticmethod
-    def query_pfr(url, max_retries=5, retry_delay=5):
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url)
-                response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
-
-                df = pd.read_html(io.StringIO(response.text))[0]
-                df = df.fillna("null")
-                return df
-
-            except HTTPError as http_err:
-                if response.status_code in [503, 504]:  # Check for Service Unavailable or Gateway Timeout
-                    logging.error(f"HTTP error {response.status_code} occurred: {http_err}. Retrying {attempt + 1}/{max_retries}")
-                    print(f"HTTP error {response.status_code} occurred: {http_err}. Retrying {attempt + 1}/{max_retries}")
-                    time.sleep(retry_delay)
-                elif response.status_code == 404:
-                    logging.error(f"HTTP error {response.status_code} occurred: {http_err}. {url=} is not valid.")
-                    break
-                elif response.status_code == 429:
-                    logging.error(f"HTTP error {response.status_code} occurred: {http_err}. Too many requests. Wait for a while.")
-                    break
-
-            except ValueError as val_err:
-                logging.error(f"query_pfr() Value error occurred: {val_err}. {url=} contains no tables.")
-                df = pd.DataFrame()
-                return df
+    def get_page(url):
+        """
+        Returns the body of a PFR page through the shared http_client, from the response cache when possible.
+        :raises HTTPError: for bad responses, 429s and 5xx only after the client has used up its retries
+        :raises OfflineCacheMiss: when the page isn't cached and the cache is in offline mode
+        """
+        return http_client.get_text(url)
 
-            except KeyboardInterrupt:
-                logging.info("Process interrupted by user.")
-                print("Process interrupted by user.")
+    @staticmethod
+    def query_pfr(url):
+        """
+        Returns the first table on a PFR page.
+        :return: DataFrame, empty if the page has no tables. None if the page doesn't exist (404)
+        :raises HTTPError: if the page couldn't be fetched after retrying, so a player is never silently left without stats
+        """
+        try:
+            page = Stats.get_page(url)
+            df = pd.read_html(io.StringIO(page))[0]
+            df = df.fillna("null")
+            return df
+
+        except HTTPError as http_err:
+            if http_err.response is not None and http_err.response.status_code == 404:
+                logging.error(f"HTTP error 404 occurred: {http_err}. {url=} is not valid.")
                 return None
-
-        logging.error(f"Failed to retrieve data from {url} {response.status_code}")
-        print(f"Failed to retrieve data from {url} {response.status_code}")
-        return None
+            logging.error(f"Failed to retrieve data from {url} {http_err}")
+            print(f"Failed to retrieve data from {url} {http_err}")
+            raise
+
+        except ValueError as val_err:
+            logging.error(f"query_pfr() Value error occurred: {val_err}. {url=} contains no tables.")
+            df = pd.DataFrame()
+            return df
+
+        except KeyboardInterrupt:
+            # Don't pass this off as a missing page. Only reached when query_pfr runs on the main thread, a crawl's fetches run
+            # on worker threads and the interrupt lands in Crawler.run() instead, which cancels the fetches still queued.
+            logging.info("Process interrupted by user.")
+            print("Process interrupted by user.")
+            raise
 
     def gamelogs_data(self, rookie_year=None):
         """
@@ -129,21 +238,62 @@ class Stats:
         """
         year = self.year
         pfr_player_id = self.pfr_player_id
-        url = f"https://www.pro-football-reference.com/players/{pfr_player_id[0]}/{pfr_player_id}/gamelog/{year}/"
+        url = f"{PFR_BASE_URL}/players/{pfr_player_id[0]}/{pfr_player_id}/gamelog/{year}/"
         logging.info(f"Getting gamelogs for {url=}")
         print(f"Getting gamelogs for {url=}")
 
         return self.query_pfr(url)
 
     @staticmethod
-    def fetch_game_log_data(owner_data, player_data, player_id, player_id_table, update_years=None):
+    def normalize_game_log_data(game_log_data, year):
+        """
+        Normalizes the game log data by converting tuples to lists and renaming columns to their canonical names for json serialization
+        Args:
+            game_log_data (pd.DataFrame): The game log data to be normalized.
+            year (str): The year for which the data is being normalized.
+        Returns:
+            dict: The normalized game log data.
+        """
+        game_log_data = game_log_data.apply(lambda col: col.map(lambda x: list(x) if isinstance(x, tuple) else x))
+        game_log_data.columns = canonical_column_names(game_log_data.columns.values)
+        stats = {f"{year}_stats": game_log_data.to_dict()}
+        return stats
+
+    @staticmethod
+    def gamelog_crawler(journal=None):
+        """
+        Creates a Crawler whose jobs fetch one season of gamelogs for one player. Pass it to fetch_game_log_data() for
+        every player to crawl, then call run() to fetch them all concurrently.
+        :param journal: CrawlJournal, optional. Seasons already in it aren't fetched again, and each fetched season is
+            checkpointed to it as soon as it arrives.
+        :return: Crawler, its jobs return the normalized {"YYYY_stats": {...}} dict, or None if there's no gamelog page
+        """
+        def fetch(pfr_player_id, year):
+            if journal is not None:
+                done, stats = journal.get(pfr_player_id, year)
+                if done:
+                    return stats
+            game_log_data = Stats(year=int(year), pfr_player_id=pfr_player_id).gamelogs_data()
+            stats = None if game_log_data is None else Stats.normalize_game_log_data(game_log_data, year)
+            if journal is not None:
+                journal.record(pfr_player_id, year, stats)
+            return stats
+
+        return Crawler(fetch=fetch)
+
+    @staticmethod
+    def fetch_game_log_data(owner_data, player_data, player_id, player_id_index, update_years=None, crawler=None, fetched=None):
         """
         Gets the gamelogs data for each player from PFR on the roster and adds it to the owner_data dictionary.
         :param owner_data: dict w/ keys: owner_id, display_name, team_name, players_data (list)
         :param player_data: All NFL player data from sleeper's api as json object
         :param player_id: Sleeper player ID
-        :param player_id_table: from nfl api for mapping IDs to names
+        :param player_id_index: PlayerIdIndex from nfl api for mapping IDs to names
         :param update_years: str, int or list, List of year(s) to update
+        :param crawler: Crawler, optional. When passed, the gamelog fetches are only queued and merged into owner_data when
+            crawler.run() is called, so many players can be crawled concurrently. Otherwise they are fetched before returning.
+        :param fetched: set, optional. (player_id, year) of every season that came back with gamelogs is added to it once
+            merged, seasons whose fetch failed or found no page are left out
         :return:
         """
         if update_years:
@@ -152,19 +302,9 @@ class Stats:
             if type(update_years) is int:
                 update_years = [str(update_years)]
 
-        def normalize_game_log_data(game_log_data, year):
-            """
-            Normalizes the game log data by converting tuples to lists and renaming columns for json serialization
-            Args:
-                game_log_data (pd.DataFrame): The game log data to be normalized.
-                year (str): The year for which the data is being normalized.
-            Returns:
-                dict: The normalized game log data.
-            """
-            game_log_data = game_log_data.apply(lambda col: col.map(lambda x: list(x) if isinstance(x, tuple) else x))
-            game_log_data.columns = ['_'.join(map(str, col)).strip() for col in game_log_data.columns.values]
-            stats = {f"{year}_stats": game_log_data.to_dict()}
-            return stats
+        run_crawler = crawler is None
+        if run_crawler:
+            crawler = Stats.gamelog_crawler()
 
         def update_stats(owner_data, player_name, stats):
             """
@@ -195,7 +335,8 @@ class Stats:
         def sort_players_data(unsorted_data):
             def sort_key(item):
                 key = list(item.keys())[0]
-                if key == "hashtag":
+                # The player's Sleeper details go first, whatever their first field is.
+                if key == "hashtag" or "player_id" in item:
                     return 0, key
                 elif key.endswith("_stats"):
                     year = int(key.split("_")[0])
@@ -205,37 +346,62 @@ class Stats:
 
             unsorted_data.sort(key=sort_key)
 
+        def merge_game_logs(stats, year, owner_data, player_name):
+            if stats is None:
+                logging.error(f"No gamelogs for {player_name} for {year}, skipping.")
+                return
+            if fetched is not None:
+                fetched.add((player_id, str(year)))
+            player_exists = any(player_name in player for player in owner_data["players_data"])
+            if player_exists:
+                # Update stats if player_name exists
+                update_stats(owner_data["players_data"], player_name, stats)
+            else:
+                # Append new player data if player_name does not exist
+                owner_data["players_data"].append({player_name: [stats]})
+
         def fetch_and_process_game_logs(pfr_player_id, update_years, owner_data, player_name):
             if update_years:
                 years = update_years
             else:
                 years = Stats(pfr_player_id=pfr_player_id).get_years_of_service()
             for year in years:
-                game_log_data = Stats(year=int(year), pfr_player_id=pfr_player_id).gamelogs_data()
-                stats = normalize_game_log_data(game_log_data, year)
-                player_exists = any(player_name in player for player in owner_data["players_data"])
-                if player_exists:
-                    # Update stats if player_name exists
-                    update_stats(owner_data["players_data"], player_name, stats)
-                else:
-                    # Append new player data if player_name does not exist
-                    owner_data["players_data"].append({player_name: [stats]})
-                time.sleep(5)  # respectfully wait
+                crawler.submit(pfr_player_id, year, lambda stats, year=year: merge_game_logs(stats, year, owner_data, player_name))
+
+        def finish_player(player_info):
+            # Replace stale Sleeper details w/ updated data
+            for p in owner_data["players_data"]:
+                for p_n, d in p.items():
+                    try:
+                        if d[0]['player_id'] == player_id:
+                            d.pop(0)
+                            d.insert(0, player_info)
+                    except KeyError:
+                        # This is a fresh database w/o details for each player
+                        d.insert(0, player_info)
 
-        unique_cases = {
-            "5840": "AlleJo03",  # Josh Allen changed his name so his PFR ID is different than what I'd guess.
-        }
+            for player in owner_data["players_data"]:
+                for player_name, data in player.items():
+                    if data[0]['player_id'] == player_id:
+                        sort_players_data(data)
 
         if player_id in player_data:
-            player_name = player_id_table.loc[player_id_table['sleeper_id'] == int(player_id), 'name'].values[0]
-            pfr_player_id = player_id_table.loc[player_id_table['sleeper_id'] == int(player_id), 'pfr_id'].values[0]
             player_info = player_data[player_id]
-            if player_id in unique_cases:
+            player_name = player_id_index.name(player_id) or f"{player_info['first_name']} {player_info['last_name']}"
+            pfr_player_id = player_id_index.pfr_id(player_id)
+            override_known, override_pfr_id = pfr_id_overrides.lookup(player_id)
+            if player_id in UNIQUE_CASES:
                 logging.info(f"Unique case for {player_name=} {player_id=}")
-                pfr_player_id = unique_cases[player_id]
-                fetch_and_process_game_logs(pfr_player_id, update_years, owner_data, player_name)
-            # In the event a player's sleeper ID isn't in the player_id_table, try to guess the player's gamelogs page.
-            elif type(pfr_player_id) is float:
+                fetch_and_process_game_logs(override_pfr_id, update_years, owner_data, player_name)
+            # A previous run already guessed this player's PFR ID, or found that there isn't one.
+            elif pfr_player_id is None and override_known:
+                if override_pfr_id:
+                    logging.info(f"Using remembered PFR ID {override_pfr_id} for {player_name=} {player_id=}")
+                    fetch_and_process_game_logs(override_pfr_id, update_years, owner_data, player_name)
+                else:
+                    logging.info(f"{player_name=} {player_id=} wasn't found on PFR recently, not guessing again.")
+            # In the event a player's sleeper ID isn't in the player_id_index, try to guess the player's gamelogs page.
+            elif pfr_player_id is None:
                 logging.error(f"{player_id=} doesn't have a PFR ID in the {GLOBAL_NFL_PLAYER_ID_FILE} file. Trying to find the gamelogs page by hand...")
                 first_name = player_info["first_name"]
                 last_name = player_info["last_name"]
@@ -244,41 +410,37 @@ class Stats:
                 pfr_player_id_chars = last_name[:4] + first_name[:2]
                 pfr_player_id_char_list = [pfr_player_id_chars + str(i).zfill(2) for i in range(10)]
                 logging.info(f"{pfr_player_id_char_list=}")
-                valid_url_found = False  # flag to stop checking once a valid URL is found
+                valid_url_found = False
+                # Only remember a miss when every guess was actually checked, a failed request says nothing about the ID.
+                probe_failed = False
+                if birthday is None:
+                    # Nothing to check a guess against, a missing page would "match" a missing birthday.
+                    logging.error(f"{player_name=} {player_id=} has no birth date on Sleeper, can't verify a guessed PFR ID.")
+                    pfr_player_id_char_list = []
                 for id_no in pfr_player_id_char_list:
-                    if valid_url_found:
-                        break
                     try:
                         # This query is needed to see if this is the right player page.
                         check_bday = Stats(pfr_player_id=id_no).check_players_birthday()
-                        if check_bday == birthday:
-                            valid_url_found = True
-                        else:
-                            raise ValueError(f"{player_id} {birthday=} {id_no} {check_bday} Birthday doesn't match.")
-                        fetch_and_process_game_logs(id_no, update_years, owner_data, player_name)
                     except Exception as e:
-                        logging.error(f"The URL for {id_no} is not valid. {e=}")
-                        print(f'URL for {id_no} is not valid, trying next...')
-                        time.sleep(1)
-            # The player's sleeper ID is in the player_id_table, use it to get the player's gamelogs pages.
+                        probe_failed = True
+                        logging.error(f"Couldn't check {id_no} for {player_id=}, trying next... {e=}")
+                        continue
+                    if check_bday == birthday:
+                        valid_url_found = True
+                        pfr_id_overrides.resolve(player_id, id_no)
+                        fetch_and_process_game_logs(id_no, update_years, owner_data, player_name)
+                        break
+                    logging.error(f"{player_id} {birthday=} {id_no} {check_bday} Birthday doesn't match.")
+                    print(f'URL for {id_no} is not valid, trying next...')
+                if not valid_url_found and not probe_failed:
+                    pfr_id_overrides.miss(player_id)
+            # The player's sleeper ID is in the player_id_index, use it to get the player's gamelogs pages.
             else:
                 fetch_and_process_game_logs(pfr_player_id, update_years, owner_data, player_name)
 
-            # Replace stale Sleeper details w/ updated data
-            for p in owner_data["players_data"]:
-                for p_n, d in p.items():
-                    try:
-                        if d[0]['player_id'] == player_id:
-                            d.pop(0)
-                            d.insert(0, player_info)
-                    except KeyError:
-                        # This is a fresh database w/o details for each player
-                        d.insert(0, player_info)
-
-            for player in owner_data["players_data"]:
-                for player_name, data in player.items():
-                    if data[0]['player_id'] == player_id:
-                        sort_players_data(data)
+            crawler.then(lambda: finish_player(player_info))
+            if run_crawler:
+                crawler.run()
 
             return owner_data
 
@@ -291,125 +453,81 @@ class NFLStatsDatabase:
     def __init__(self, database_file, league: League):
         self.database_file = database_file
         self.League = league
-        # TODO: To make this scalable, I'll need to get EVERY possible Sleeper scoring stat from API. I only account for TLOOJ atm.
-        self.stat_weight = {
-            'Passing_Yds': league.scoring_settings.pass_yd,  # Passing_Yds.1 is due to yards lost due to sacks. We don't care about that.
-            'Passing_TD': league.scoring_settings.pass_td,
-            'Receiving_TD': league.scoring_settings.rec_td,
-            'Rushing_TD': league.scoring_settings.rush_td,
-            'Kick Returns_TD': league.scoring_settings.st_td,  # Might need to check this, kr_td is a different stat I think for D/ST?
-            'Punt Returns_TD': league.scoring_settings.st_td,
-            'Fumbles_TD': league.scoring_settings.idp_def_td,
-            'Def Interceptions_TD': league.scoring_settings.idp_def_td,
-            'Scoring_Sfty': league.scoring_settings.idp_safe,
-            'Receiving_Rec': league.scoring_settings.rec,
-            'Rushing_Yds': league.scoring_settings.rush_yd,
-            'Receiving_Yds': league.scoring_settings.rec_yd,
-            'Kick Returns_Yds': league.scoring_settings.kr_yd,
-            'Punt Returns_Yds': league.scoring_settings.pr_yd,
-            'Passing_Int': league.scoring_settings.pass_int,
-            'Sk': league.scoring_settings.idp_sack,
-            'Def Interceptions_Int': league.scoring_settings.idp_int,
-            'Def Interceptions_PD': league.scoring_settings.idp_pass_def,
-            'Tackles_QBHits': league.scoring_settings.idp_qb_hit,
-            'Tackles_TFL': league.scoring_settings.idp_tkl_loss,
-            'Tackles_Solo': league.scoring_settings.idp_tkl_solo,
-            'Tackles_Ast': league.scoring_settings.idp_tkl_ast,
-            'Fumbles_Fmb': league.scoring_settings.fum,
-            'Fumbles_FL': league.scoring_settings.fum_lost,
-            'Fumbles_Yds': league.scoring_settings.fum_ret_yd,
-            'Def Interceptions_Yds': league.scoring_settings.int_ret_yd,
-            "blocked_kick": league.scoring_settings.idp_blk_kick,  # PFR doesn't include this information. Maybe someday.
-            'Fumbles_FF': league.scoring_settings.idp_ff,
-            'Fumbles_FR': league.scoring_settings.idp_fum_rec,
-            'Scoring_2PM': league.scoring_settings.pass_2pt  # PFR doesn't specify if a 2 pt conversion was a pass or rush, but sleeper scores for it. Assume pass.
-        }
+        self.stat_weight = stat_weight_from_scoring_settings(league.scoring_settings)
 
     def calculate_fantasy_points(self):
         """
         Calculate the impact of a player's stats on their team by converting stats to fantasy points.
+        Every season of every player is stacked into one games x stats matrix and scored with a single product against the
+        stat_weight vector, the result is written to each season's "fantasy_points" column.
         """
-
-        def get_player_stats(database_data, player_data_dict, process_stats_func):
-            for roster in database_data:
-                for player_data in roster['players_data']:
-                    for player_name, stats in player_data.items():
-                        player_id = stats[0]['player_id']
-                        unique_key = f"{player_name}_{player_id}"
-                        player_data_dict.setdefault(unique_key, {})
-
-                        # Iterate through all stats dictionaries
-                        for stat_dict in stats[1:]:
-                            for year, stats_table in stat_dict.items():
-                                if year not in player_data_dict[unique_key]:
-                                    player_data_dict[unique_key][year] = []
-                                process_stats_func(unique_key, year, stats_table)
-
-        def get_points(unique_key, year, stats_table):
-            player_name, player_id = unique_key.rsplit('_', 1)
-            logging.info(f"Calculating fantasy points for {player_name} with ID {player_id} for year {year}")
-            for column_header, week_stats in stats_table.items():
-                logging.debug(f"{column_header=}, {week_stats=}")
-                stat_key = column_header
-                logging.debug(f"{stat_key=}")
-                stats_dict = {}
-                if stat_key in self.stat_weight:
-                    for index, stat_value in week_stats.items():
-                        try:
-                            fantasy_points = self.stat_weight[stat_key] * float(stat_value)
-                        except (ValueError, TypeError):
-                            fantasy_points = 0
-                        stats_dict[index] = round(fantasy_points, 2)
-                        logging.debug(f"{index=}, {stat_key=}, {stat_value=}, {fantasy_points=}")
-                if stats_dict:
-                    player_data_dict[unique_key][year].append({stat_key: stats_dict})
-
-        def write_points_to_file(unique_key, year, stats_table):
-            if unique_key in player_data_dict and year in player_data_dict[unique_key]:
-                if isinstance(player_data_dict[unique_key][year], dict):  # Check if the object is a dictionary
-                    fantasy_points_dict = player_data_dict[unique_key][year]
-                    if 'combined_stats' in fantasy_points_dict and fantasy_points_dict['combined_stats']:  # Check if combined_stats is not empty
-                        stats_table["fantasy_points"] = fantasy_points_dict['combined_stats']
-                    else:
-                        logging.warning(f"Combined stats are empty for {unique_key} in year {year}")
-                else:
-                    logging.warning(f"Expected a dictionary but found {type(player_data_dict[unique_key][year])} for {unique_key} in year {year}")
-            else:
-                logging.warning(f"No stats found for {unique_key} in year {year}")
-
         with open(self.database_file) as file:
             database_data = json.load(file)
 
         # create_backup(os.path.abspath(file.name))
 
         logging.info(f"Calculating fantasy points for each player in {self.database_file}")
-        player_data_dict = {}
-
-        # Calculate fantasy points for each player, each section is scored based on the stat_weight dictionary
-        get_player_stats(database_data, player_data_dict, get_points)
+        seasons = []
+        for roster in database_data:
+            for player_data in roster['players_data']:
+                for player_name, stats in player_data.items():
+                    player_id = stats[0]['player_id']
+                    for stat_dict in stats[1:]:
+                        for year, stats_table in stat_dict.items():
+                            seasons.append((player_name, player_id, year, stats_table))
+
+        points = ScoringEngine(self.stat_weight).score([stats_table for *_, stats_table in seasons])
+
+        for (player_name, player_id, year, stats_table), season_points in zip(seasons, points):
+            if season_points:
+                stats_table["fantasy_points"] = season_points
+            else:
+                logging.warning(f"Combined stats are empty for {player_name}_{player_id} in year {year}")
 
-        logging.debug(f"Before combining stats {player_data_dict=}")
+        utils.atomic_write_json(self.database_file, database_data, indent=4)
 
-        # Add up all stats for each player to get total fantasy points for each year
-        for player_name, stats in player_data_dict.items():
-            for year, stat_columns in stats.items():
-                combined_stats = {}
-                for stat_column in stat_columns:
-                    for stat, value_dict in stat_column.items():
-                        for index, value in value_dict.items():
-                            if index in combined_stats:
-                                combined_stats[index] += round(value, 2)
-                            else:
-                                combined_stats[index] = round(value, 2)
-                player_data_dict[player_name][year] = {"combined_stats": combined_stats}
+        if os.path.exists(LeagueStatsStore.store_file_for(self.database_file)):
+            with LeagueStatsStore.for_database(self.database_file) as store:
+                store.upsert_stat("fantasy_points", (
+                    (player_id, year.split('_')[0], season_points)
+                    for (player_name, player_id, year, stats_table), season_points in zip(seasons, points)
+                    if season_points
+                ))
 
-        logging.debug(f"After combining stats {player_data_dict=}")
+    def score_what_if(self, scoring_configs):
+        """
+        Scores every player season in the database under each of the scoring configurations, e.g. PPR vs half PPR, without
+        writing anything back.
+        Reads only the weighted stats from the stats store when there is one, the json database otherwise.
+        :param scoring_configs: list of stat_weight dicts or sleeper ScoringSettings
+        :return: tuple (keys, WhatIfScores). keys is a list of (player_id, player_name, year) matching the first axis of the points.
+        """
+        store_file = LeagueStatsStore.store_file_for(self.database_file)
+        if os.path.exists(store_file):
+            stats = list(dict.fromkeys(stat for stat_weight in ScoringEngine.stat_weights(scoring_configs) for stat in stat_weight))
+            with LeagueStatsStore(store_file) as store:
+                names = {player_id: player_name for roster in store.rosters() for player_id, player_name, _ in roster['players']}
+                tables = {(player_id, season): stats_table for player_id, season, stats_table in store.season_tables(stats)}
+                season_keys = store.player_season_keys()
+            keys = [(player_id, names.get(player_id), f"{season}_stats") for player_id, season in season_keys]
+            stats_tables = [tables.get(season_key, {}) for season_key in season_keys]
+            return keys, ScoringEngine.score_what_if(stats_tables, scoring_configs)
 
-        # Write the fantasy points for each respective player to the existing json file from player_data_dict
-        get_player_stats(database_data, player_data_dict, write_points_to_file)
+        with open(self.database_file) as file:
+            database_data = json.load(file)
 
-        with open(self.database_file, 'w') as file:
-            json.dump(database_data, file, indent=4)
+        keys = []
+        stats_tables = []
+        for roster in database_data:
+            for player_data in roster['players_data']:
+                for player_name, stats in player_data.items():
+                    player_id = stats[0]['player_id']
+                    for stat_dict in stats[1:]:
+                        for year, stats_table in stat_dict.items():
+                            keys.append((player_id, player_name, year))
+                            stats_tables.append(stats_table)
+
+        return keys, ScoringEngine.score_what_if(stats_tables, scoring_configs)
 
 
 if __name__ == '__main__':
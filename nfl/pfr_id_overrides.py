@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from nfl.constants import GLOBAL_PFR_ID_OVERRIDES_FILE
+
+UNIQUE_CASES = {
+    "5840": "AlleJo03",  # Josh Allen changed his name so his PFR ID is different than what I'd guess.
+}
+
+# Players that couldn't be found are guessed again after this long, PFR may have added their page by then.
+MISS_EXPIRY_SECONDS = 7 * 24 * 60 * 60
+
+
+class PFRIdOverrides:
+    """
+    Sleeper ID -> PFR ID overrides for players the ID table has no PFR ID for. The hard coded UNIQUE_CASES always win,
+    on top of them the store remembers which guessed ID matched and which players couldn't be found at all,
+    so the guesses only have to be probed once.
+
+    Stored as json: {sleeper_id: {"pfr_id": str or null, "checked_at": epoch seconds}}
+    """
+
+    def __init__(self, overrides_file=GLOBAL_PFR_ID_OVERRIDES_FILE, miss_expiry=MISS_EXPIRY_SECONDS):
+        self.overrides_file = overrides_file
+        self.miss_expiry = miss_expiry
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._data is None:
+            if os.path.exists(self.overrides_file):
+                with open(self.overrides_file, "r") as file:
+                    self._data = json.load(file)
+            else:
+                self._data = {}
+        return self._data
+
+    def lookup(self, sleeper_id):
+        """
+        :param sleeper_id: Sleeper player ID
+        :return: tuple (known, pfr_id). known is False if the player has to be guessed. pfr_id is None for a remembered miss.
+        """
+        if sleeper_id in UNIQUE_CASES:
+            return True, UNIQUE_CASES[sleeper_id]
+        with self._lock:
+            entry = self._load().get(sleeper_id)
+        if entry is None:
+            return False, None
+        if entry["pfr_id"] is None and time.time() - entry["checked_at"] > self.miss_expiry:
+            return False, None
+        return True, entry["pfr_id"]
+
+    def resolve(self, sleeper_id, pfr_id):
+        """
+        Remembers the PFR ID that was found for a player.
+        """
+        self._set(sleeper_id, pfr_id)
+        logging.info(f"Remembered PFR ID {pfr_id} for {sleeper_id=}")
+
+    def miss(self, sleeper_id):
+        """
+        Remembers that none of the guesses for a player matched.
+        """
+        self._set(sleeper_id, None)
+        logging.info(f"Remembered that {sleeper_id=} has no PFR ID, not guessing again for {self.miss_expiry}s")
+
+    def _set(self, sleeper_id, pfr_id):
+        with self._lock:
+            self._load()[sleeper_id] = {"pfr_id": pfr_id, "checked_at": time.time()}
+            os.makedirs(os.path.dirname(self.overrides_file) or ".", exist_ok=True)
+            temp_file = f"{self.overrides_file}.tmp"
+            with open(temp_file, "w") as file:
+                json.dump(self._data, file, indent=4)
+            os.replace(temp_file, self.overrides_file)
+
+
+pfr_id_overrides = PFRIdOverrides()
@@ -0,0 +1,259 @@
+import argparse
+import html
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nfl.http_cache import ResponseCache
+from nfl.utils import logging_steup
+
+# Recorded pages in a response cache are keyed by their URL on the real site.
+RECORDED_ORIGIN = "https://www.pro-football-reference.com"
+PLAYER_PATH_PATTERN = re.compile(r"^/players/([A-Z])/([A-Za-z.'-]+\d{2})\.htm$")
+GAMELOG_PATH_PATTERN = re.compile(r"^/players/([A-Z])/([A-Za-z.'-]+\d{2})/gamelog/(\d{4})/?$")
+
+POSITIONS = ("QB", "RB", "WR", "TE")
+# Gamelog header groups, "" is a blank over header like PFR's game columns have.
+GAMELOG_COLUMNS = (
+    ("", ("Rk", "Year", "Date", "G#", "Week", "Age", "Tm", "Opp", "Result", "GS")),
+    ("Passing", ("Cmp", "Att", "Yds", "TD", "Int", "Sk")),
+    ("Rushing", ("Att", "Yds", "TD")),
+    ("Receiving", ("Tgt", "Rec", "Yds", "TD")),
+    ("Fumbles", ("Fmb", "FL")),
+)
+
+
+class PFRStandin:
+    """
+    Local stand-in for pro-football-reference.com. Serves player pages and gamelog tables at the real URL paths, from
+    recorded pages when there are any and synthetic ones otherwise, so the fetch path can be load tested offline. Set
+    PFR_BASE_URL to its url before nfl.nfl_stats is imported, or patch nfl.nfl_stats.PFR_BASE_URL.
+
+    Faults can be injected: a fixed or random latency on every response, and bursts of 429/503 responses with a
+    Retry-After header. IDs that aren't known get a 404, like a badly guessed PFR ID does on the real site.
+    """
+
+    def __init__(self, players=None, missing=(), recordings=None, latency=0.0, burst_every=0, burst_length=1,
+                 burst_status=429, retry_after=1, host="127.0.0.1", port=0):
+        """
+        :param players: dict, PFR ID -> dict with optional name, position, birth_date and seasons (list of int).
+            Optional, default is None and every well formed ID gets a synthetic player.
+        :param missing: iterable of PFR IDs that 404
+        :param recordings: ResponseCache, optional, pages recorded from the real site. Served as is when they hold the path
+        :param latency: float seconds, or callable returning seconds, slept before every response
+        :param burst_every: int, after this many requests the next burst_length requests fail. 0 turns bursts off
+        :param burst_status: int, status the failed requests get, 429 or 503
+        :param retry_after: int seconds sent in the Retry-After header of failed requests, None to leave it out
+        :param port: int, 0 picks a free port
+        """
+        self.players = players
+        self.missing = set(missing)
+        self.recordings = recordings
+        self.latency = latency
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.burst_status = burst_status
+        self.retry_after = retry_after
+        self._counters = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "statuses": {}}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.server = ThreadingHTTPServer((host, port), StandinRequestHandler)
+        self.server.daemon_threads = True
+        self.server.standin = self
+
+    @property
+    def url(self):
+        """
+        :return: str, base URL to use as PFR_BASE_URL
+        """
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def counters(self):
+        """
+        :return: dict, snapshot of requests served, responses per status and the most requests in flight at once
+        """
+        with self._lock:
+            return {**self._counters, "statuses": dict(self._counters["statuses"])}
+
+    def start(self):
+        """
+        Serves on a daemon thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.server.serve_forever, name="pfr-standin", daemon=True)
+            self._thread.start()
+            logging.info(f"PFR stand-in serving on {self.url}")
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _begin(self):
+        """
+        Counts a request in.
+        :return: bool, whether it falls in a failure burst
+        """
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["in_flight"] += 1
+            self._counters["max_in_flight"] = max(self._counters["max_in_flight"], self._counters["in_flight"])
+            if not self.burst_every:
+                return False
+            return (self._counters["requests"] - 1) % (self.burst_every + self.burst_length) >= self.burst_every
+
+    def _end(self, status):
+        with self._lock:
+            self._counters["in_flight"] -= 1
+            self._counters["statuses"][status] = self._counters["statuses"].get(status, 0) + 1
+
+    def respond(self, path):
+        """
+        :param path: str, request path
+        :return: tuple, (status, headers dict, body str)
+        """
+        in_burst = self._begin()
+        status = 500
+        try:
+            latency = self.latency() if callable(self.latency) else self.latency
+            if latency:
+                time.sleep(latency)
+            if in_burst:
+                status = self.burst_status
+                headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+                return status, headers, "Rate limited" if status == 429 else "Service unavailable"
+            status, body = self.page(path)
+            return status, {}, body
+        finally:
+            self._end(status)
+
+    def page(self, path):
+        """
+        :return: tuple, (status, body str)
+        """
+        if self.recordings is not None:
+            body = self.recordings.get(f"{RECORDED_ORIGIN}{path}")
+            if body is not None:
+                return 200, body
+
+        match = PLAYER_PATH_PATTERN.match(path) or GAMELOG_PATH_PATTERN.match(path)
+        player = self.player(match.group(2)) if match and match.group(1) == match.group(2)[0] else None
+        if player is None:
+            return 404, "Page Not Found (404 error)"
+        if len(match.groups()) == 2:
+            return 200, player_page(player)
+        return 200, gamelog_page(player, int(match.group(3)))
+
+    def player(self, pfr_player_id):
+        """
+        :return: dict of the player's details, None if the ID doesn't exist
+        """
+        if pfr_player_id in self.missing:
+            return None
+        if self.players is None:
+            return synthetic_player(pfr_player_id)
+        if pfr_player_id not in self.players:
+            return None
+        return {**synthetic_player(pfr_player_id), **self.players[pfr_player_id]}
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, headers, body = self.server.standin.respond(self.path.split("?")[0])
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.debug(f"PFR stand-in {self.address_string()} {format % args}")
+
+
+def synthetic_player(pfr_player_id):
+    """
+    The same ID always gets the same player.
+    """
+    rng = random.Random(pfr_player_id)
+    rookie_year = rng.randint(2012, 2022)
+    return {
+        "name": f"{pfr_player_id[4:-2]} {pfr_player_id[:4]}",
+        "position": rng.choice(POSITIONS),
+        "birth_date": f"{rookie_year - 22}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "seasons": list(range(rookie_year, min(rookie_year + rng.randint(1, 10), 2024))),
+    }
+
+
+def player_page(player):
+    """
+    :return: str, profile page with the parts PlayerProfile.parse() reads
+    """
+    rows = "".join(f"<tr><th>{season}</th><td>{random.Random(season).randint(1, 17)}</td></tr>" for season in player["seasons"])
+    return (
+        f"<html><body><div id=\"meta\"><h1><span>{html.escape(player['name'])}</span></h1>"
+        f"<p><strong>Position</strong>: {player['position']}</p>"
+        f"<p><strong>Born:</strong> <span id=\"necro-birth\" data-birth=\"{player['birth_date']}\"></span></p></div>"
+        f"<table id=\"stats\"><thead><tr><th>Year</th><th>G</th></tr></thead><tbody>{rows}"
+        f"<tr><th>Career</th><td></td></tr></tbody></table></body></html>"
+    )
+
+
+def gamelog_page(player, year):
+    """
+    :return: str, gamelog page whose first table has PFR's two header rows, no table if the player didn't play that season
+    """
+    if year not in player["seasons"]:
+        return "<html><body><p>No games found.</p></body></html>"
+    rng = random.Random(f"{player['name']}{year}")
+    over_header = "".join(f"<th colspan=\"{len(stats)}\">{group}</th>" for group, stats in GAMELOG_COLUMNS)
+    header = "".join(f"<th>{html.escape(stat)}</th>" for _, stats in GAMELOG_COLUMNS for stat in stats)
+    rows = []
+    for game in range(1, 18):
+        cells = [game, year, f"{year}-09-{game + 10}", game, game, year - int(player["birth_date"][:4]), "KAN",
+                 rng.choice(("DEN", "LVR", "LAC")), f"W {rng.randint(14, 42)}-{rng.randint(3, 35)}", rng.choice(("*", ""))]
+        cells += [rng.randint(0, 30) for _, stats in GAMELOG_COLUMNS[1:] for _ in stats]
+        rows.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    return (f"<html><body><table id=\"stats\"><thead><tr>{over_header}</tr><tr>{header}</tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table></body></html>")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serves a local stand-in of pro-football-reference.com.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds slept before every response")
+    parser.add_argument("--burst-every", type=int, default=0, help="fail a burst of requests after this many, 0 is never")
+    parser.add_argument("--burst-length", type=int, default=1)
+    parser.add_argument("--burst-status", type=int, default=429, choices=(429, 503))
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--recordings", help="response cache directory of recorded pages to serve")
+    args = parser.parse_args()
+
+    logging_steup()
+    recordings = ResponseCache(args.recordings, ttl_policy=lambda url: None) if args.recordings else None
+    standin = PFRStandin(recordings=recordings, latency=args.latency, burst_every=args.burst_every,
+                         burst_length=args.burst_length, burst_status=args.burst_status, retry_after=args.retry_after,
+                         port=args.port).start()
+    print(f"Serving, run the fetchers with PFR_BASE_URL={standin.url}")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        standin.stop()
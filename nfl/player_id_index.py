@@ -0,0 +1,108 @@
+import logging
+import os
+import pickle
+import threading
+
+from nfl.constants import GLOBAL_NFL_PLAYER_ID_INDEX_FILE
+
+
+def _clean_id(value):
+    """
+    The ID table comes out of pandas, so missing IDs are NaN floats and numeric IDs are floats like 4046.0
+    :return: str ID, or None if missing
+    """
+    if value is None or value != value or value == "":
+        return None
+    if isinstance(value, float):
+        return str(int(value))
+    return str(value)
+
+
+class PlayerIdIndex:
+    """
+    Sleeper ID -> (pfr_id, gsis_id, espn_id, name) cross reference built once from nfl_api.create_player_id_table()
+    and pickled next to the csv, so lookups are a dict access instead of a scan of the ~10k row DataFrame.
+    """
+
+    FIELDS = ("pfr_id", "gsis_id", "espn_id", "name")
+
+    _loaded = {}
+    _lock = threading.Lock()
+
+    def __init__(self, records):
+        """
+        :param records: dict, sleeper_id (str) -> tuple ordered like FIELDS
+        """
+        self.records = records
+
+    @classmethod
+    def from_table(cls, player_id_table):
+        """
+        :param player_id_table: DataFrame from nfl_api.create_player_id_table()
+        :return: PlayerIdIndex
+        """
+        records = {}
+        columns = ["sleeper_id", *cls.FIELDS]
+        for row in player_id_table[columns].itertuples(index=False):
+            sleeper_id = _clean_id(row[0])
+            if sleeper_id is None:
+                continue
+            records[sleeper_id] = tuple(_clean_id(value) for value in row[1:])
+        logging.info(f"Built player ID index with {len(records)} Sleeper IDs")
+        return cls(records)
+
+    def save(self, index_file=GLOBAL_NFL_PLAYER_ID_INDEX_FILE):
+        temp_file = f"{index_file}.tmp"
+        with open(temp_file, "wb") as file:
+            pickle.dump(self.records, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, index_file)
+        with self._lock:
+            self._loaded[index_file] = (os.path.getmtime(index_file), self)
+        logging.info(f"{index_file=} saved")
+
+    @classmethod
+    def load(cls, index_file=GLOBAL_NFL_PLAYER_ID_INDEX_FILE):
+        """
+        Loads the pickled index. The loaded index is kept for the rest of the run and only reread if the file changes.
+        :return: PlayerIdIndex
+        """
+        mtime = os.path.getmtime(index_file)
+        with cls._lock:
+            cached = cls._loaded.get(index_file)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(index_file, "rb") as file:
+                index = cls(pickle.load(file))
+            cls._loaded[index_file] = (mtime, index)
+            return index
+
+    def get(self, sleeper_id):
+        """
+        :return: dict with FIELDS as keys, or None if the Sleeper ID isn't in the table
+        """
+        record = self.records.get(str(sleeper_id))
+        if record is None:
+            return None
+        return dict(zip(self.FIELDS, record))
+
+    def _field(self, sleeper_id, position):
+        record = self.records.get(str(sleeper_id))
+        return record[position] if record else None
+
+    def pfr_id(self, sleeper_id):
+        return self._field(sleeper_id, 0)
+
+    def gsis_id(self, sleeper_id):
+        return self._field(sleeper_id, 1)
+
+    def espn_id(self, sleeper_id):
+        return self._field(sleeper_id, 2)
+
+    def name(self, sleeper_id):
+        return self._field(sleeper_id, 3)
+
+    def __contains__(self, sleeper_id):
+        return str(sleeper_id) in self.records
+
+    def __len__(self):
+        return len(self.records)
@@ -0,0 +1,152 @@
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+
+# The only Sleeper player fields the pipeline and the web app read.
+PLAYER_FIELDS = (
+    "player_id",
+    "first_name",
+    "last_name",
+    "full_name",
+    "birth_date",
+    "position",
+    "fantasy_positions",
+    "team",
+    "number",
+    "height",
+    "weight",
+    "age",
+    "years_exp",
+    "status",
+    "injury_status",
+)
+# Times open() rereads a store whose index and data file are from different writes, a writer is between its two replaces.
+OPEN_ATTEMPTS = 5
+
+
+class PlayerStoreMismatch(Exception):
+    """
+    Raised when a store's index and data file weren't written together.
+    """
+
+
+class PlayerStore(Mapping):
+    """
+    Read only, dict like view of the Sleeper player universe that doesn't load it into memory.
+
+    The data file holds one compact json record per line with only PLAYER_FIELDS, next to it an .idx json file maps each
+    player_id to the (offset, length) of its record. Reads slice the memory mapped data file and decode just that record,
+    so `player_id in player_data` and `player_data[player_id]` work as they did on the old json dict.
+
+    Every write stamps both files with the same generation, the data file in its first line, so a reader never pairs an
+    index with a data file from another write.
+    """
+
+    _opened = {}
+    _lock = threading.Lock()
+
+    def __init__(self, store_file):
+        """
+        :raises PlayerStoreMismatch: if the index and data file are from different writes
+        """
+        self.store_file = store_file
+        with open(self.index_file_for(store_file), "r") as file:
+            index = json.load(file)
+        self.generation = index.get("generation")
+        self._offsets = index.get("offsets", {})
+        self._records = {}
+        # The mapping stays valid once the file is closed, so a store holds no open file, only the mapping.
+        with open(store_file, "rb") as file:
+            try:
+                header = json.loads(file.readline() or b"{}")
+            except json.JSONDecodeError:
+                header = {}
+            if self.generation is None or header.get("generation") != self.generation:
+                raise PlayerStoreMismatch(f"{store_file=} generation {header.get('generation')} doesn't match its index's {self.generation}")
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def index_file_for(store_file):
+        return f"{store_file}.idx"
+
+    @classmethod
+    def open(cls, store_file):
+        """
+        Opens the store, reusing the already opened one for the rest of the run unless the file has been rewritten.
+        The store it replaces isn't closed, callers may still be reading it. Its mapping is released once nothing references it.
+        :return: PlayerStore
+        :raises PlayerStoreMismatch: if the index and data file still don't match after OPEN_ATTEMPTS tries
+        """
+        for attempt in range(OPEN_ATTEMPTS):
+            mtime = os.path.getmtime(cls.index_file_for(store_file))
+            with cls._lock:
+                opened = cls._opened.get(store_file)
+                if opened and opened[0] == mtime:
+                    return opened[1]
+                try:
+                    store = cls(store_file)
+                except PlayerStoreMismatch as e:
+                    if attempt == OPEN_ATTEMPTS - 1:
+                        raise
+                    logging.info(f"PlayerStore is being rewritten, retrying. {e}")
+                else:
+                    cls._opened[store_file] = (mtime, store)
+                    return store
+            time.sleep(0.05 * (attempt + 1))
+
+    def close(self):
+        self._data.close()
+
+    @staticmethod
+    def write(store_file, players, encoder=None):
+        """
+        Streams player records to disk one at a time, keeping only PLAYER_FIELDS.
+        :param store_file: path of the data file, the index is written next to it
+        :param players: iterable of (player_id, player dict)
+        :param encoder: json.JSONEncoder subclass for values like sleeper enums
+        :return: int, number of players written
+        """
+        offsets = {}
+        generation = uuid.uuid4().hex
+        temp_file = f"{store_file}.tmp"
+        temp_index_file = f"{PlayerStore.index_file_for(store_file)}.tmp"
+        with open(temp_file, "wb") as file:
+            header = json.dumps({"generation": generation}).encode("utf-8") + b"\n"
+            file.write(header)
+            offset = len(header)
+            for player_id, player in players:
+                record = {field: player.get(field) for field in PLAYER_FIELDS}
+                line = json.dumps(record, cls=encoder, separators=(",", ":")).encode("utf-8") + b"\n"
+                file.write(line)
+                offsets[player_id] = (offset, len(line) - 1)
+                offset += len(line)
+        with open(temp_index_file, "w") as file:
+            json.dump({"generation": generation, "offsets": offsets}, file, separators=(",", ":"))
+        os.replace(temp_file, store_file)
+        # The index goes last, readers key their cache off its mtime. One that opens in between sees mismatched
+        # generations and retries.
+        os.replace(temp_index_file, PlayerStore.index_file_for(store_file))
+        logging.info(f"Wrote {len(offsets)} players to {store_file=}")
+        return len(offsets)
+
+    def __getitem__(self, player_id):
+        record = self._records.get(player_id)
+        if record is None:
+            offset, length = self._offsets[player_id]
+            record = json.loads(self._data[offset:offset + length])
+            self._records[player_id] = record
+        return record
+
+    def __contains__(self, player_id):
+        return player_id in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+import time
+
+from nfl.utils import atomic_write_json, current_nfl_season
+
+
+class RefreshManifest:
+    """
+    Records, per player and season, when the gamelogs were fetched and whether that season was already over at the time.
+    Finished seasons can't change, so an incremental refresh only has to fetch seasons that were still open or never fetched.
+
+    Stored as json next to the league database: {player_id: {season: {"fetched_at": epoch seconds, "complete": bool}}}
+    """
+
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+        if os.path.exists(manifest_file):
+            with open(manifest_file, "r") as file:
+                self.data = json.load(file)
+        else:
+            self.data = {}
+
+    @staticmethod
+    def for_database(database_file):
+        """
+        :param database_file: path to the league database file
+        :return: RefreshManifest stored alongside it
+        """
+        return RefreshManifest(f"{os.path.splitext(database_file)[0]}_refresh_manifest.json")
+
+    def record(self, player_id, season, fetched_at=None):
+        """
+        Marks a player's season as fetched now.
+        """
+        self.data.setdefault(player_id, {})[str(season)] = {
+            "fetched_at": fetched_at or time.time(),
+            "complete": int(season) < current_nfl_season(),
+        }
+
+    def seasons_to_refresh(self, player_id, current_season=None):
+        """
+        Seasons of a player that still need fetching: the ones that were open when last fetched, plus any season
+        between the last one fetched and the current one.
+        :param player_id: Sleeper player ID
+        :param current_season: int, optional, defaults to the current NFL season
+        :return: sorted list of seasons as str, or None if the player was never fetched and needs a full refresh
+        """
+        seasons = self.data.get(player_id)
+        if not seasons:
+            return None
+        current_season = current_season or current_nfl_season()
+        refresh = {season for season, entry in seasons.items() if not entry["complete"]}
+        latest = max(int(season) for season in seasons)
+        refresh.update(str(season) for season in range(latest + 1, current_season + 1))
+        return sorted(refresh)
+
+    def save(self):
+        atomic_write_json(self.manifest_file, self.data)
+        logging.info(f"Saved refresh manifest {self.manifest_file=}")
@@ -0,0 +1,84 @@
+import logging
+from collections import defaultdict
+
+
+class RosterSnapshot:
+    """
+    Every roster of a league at one point in time, indexed as owner_id -> frozenset of Sleeper player IDs. The original
+    roster order is kept alongside, so diffs list players in the order they appear on the roster.
+    """
+
+    def __init__(self, rosters):
+        """
+        :param rosters: dict, owner_id -> iterable of Sleeper player IDs
+        """
+        self.order = {owner_id: tuple(dict.fromkeys(player_ids)) for owner_id, player_ids in rosters.items()}
+        self.rosters = {owner_id: frozenset(player_ids) for owner_id, player_ids in self.order.items()}
+        self.owners = {player_id: owner_id for owner_id, player_ids in self.rosters.items() for player_id in player_ids}
+
+    @staticmethod
+    def from_league_data(league_data):
+        """
+        :param league_data: league database as json object
+        """
+        return RosterSnapshot({
+            roster['owner_id']: [details[0]['player_id'] for player in roster['players_data'] for details in player.values()]
+            for roster in league_data
+        })
+
+    @staticmethod
+    def from_owner_data(owner_data):
+        """
+        :param owner_data: list of owner_data whose players_data only holds Sleeper player IDs, see FantasyLeagueDatabase.process_rosters()
+        """
+        return RosterSnapshot({owner['owner_id']: owner['players_data'] for owner in owner_data})
+
+    def __getitem__(self, owner_id):
+        return self.rosters.get(owner_id, frozenset())
+
+
+class RosterDiff:
+    """
+    Roster changes between two snapshots.
+
+    Attributes:
+        adds (dict): owner_id -> tuple of player IDs now on the roster that weren't before, in new roster order.
+        drops (dict): owner_id -> tuple of player IDs no longer on the roster, in old roster order.
+        moves (list): (player_id, from owner_id, to owner_id) for players that went straight from one roster to another.
+        trades (list): (owner_a, owner_b, player IDs a -> b, player IDs b -> a) for owners who moved players both ways.
+    Only owners in both snapshots get adds and drops.
+    """
+
+    def __init__(self, old, new):
+        """
+        :param old: RosterSnapshot
+        :param new: RosterSnapshot
+        """
+        self.adds = {}
+        self.drops = {}
+        for owner_id in old.rosters.keys() & new.rosters.keys():
+            added = new[owner_id] - old[owner_id]
+            dropped = old[owner_id] - new[owner_id]
+            self.adds[owner_id] = tuple(player_id for player_id in new.order[owner_id] if player_id in added)
+            self.drops[owner_id] = tuple(player_id for player_id in old.order[owner_id] if player_id in dropped)
+
+        self.moves = []
+        for player_id in new.owners.keys() & old.owners.keys():
+            if old.owners[player_id] != new.owners[player_id]:
+                self.moves.append((player_id, old.owners[player_id], new.owners[player_id]))
+        self.moves.sort()
+
+        between = defaultdict(list)
+        for player_id, from_owner, to_owner in self.moves:
+            between[(from_owner, to_owner)].append(player_id)
+        self.trades = []
+        for (owner_a, owner_b), players_a_to_b in sorted(between.items()):
+            players_b_to_a = between.get((owner_b, owner_a))
+            if players_b_to_a and owner_a < owner_b:
+                self.trades.append((owner_a, owner_b, tuple(players_a_to_b), tuple(players_b_to_a)))
+
+        logging.info(f"Roster diff: {sum(map(len, self.adds.values()))} adds, {sum(map(len, self.drops.values()))} drops, "
+                     f"{len(self.moves)} moves, {len(self.trades)} trades")
+
+    def __bool__(self):
+        return any(self.adds.values()) or any(self.drops.values())
@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from nfl.constants import LEAGUE_ID, DATABASE_DIRECTORY, REFRESH_SCHEDULE_FILE, TRANSACTIONS_POLL_MINUTES
+from nfl.crawler import TokenBucket
+from nfl.utils import atomic_write_json, current_nfl_season, logging_steup
+
+DAY = 24 * 60 * 60
+# Retry a failed job after this long, or its interval if that's shorter.
+FAILURE_RETRY_SECONDS = 15 * 60
+# PFR posts a game day's gamelogs overnight, refresh the morning after Thursday, Sunday and Monday games.
+GAME_DAY_REFRESH_WEEKDAYS = (4, 0, 1)
+GAME_DAY_REFRESH_HOUR = 6
+# Regular season and playoffs, September through the Super Bowl in February.
+GAME_DAY_REFRESH_MONTHS = (9, 10, 11, 12, 1, 2)
+
+
+def every(seconds):
+    """
+    :return: next_run function for a job that runs at a fixed interval
+    """
+    return lambda last_run: last_run + seconds
+
+
+def in_season(moment):
+    """
+    :param moment: datetime
+    :return: bool, whether NFL games are being played that month
+    """
+    return moment.month in GAME_DAY_REFRESH_MONTHS
+
+
+def after_game_days(last_run):
+    """
+    next_run function for jobs that should run the morning after each NFL game day. The offseason is skipped.
+    :param last_run: epoch seconds
+    :return: epoch seconds of the next GAME_DAY_REFRESH_HOUR on a GAME_DAY_REFRESH_WEEKDAYS day in GAME_DAY_REFRESH_MONTHS
+    """
+    moment = datetime.fromtimestamp(last_run)
+    candidate = moment.replace(hour=GAME_DAY_REFRESH_HOUR, minute=0, second=0, microsecond=0)
+    while candidate <= moment or candidate.weekday() not in GAME_DAY_REFRESH_WEEKDAYS or not in_season(candidate):
+        candidate += timedelta(days=1)
+    return candidate.timestamp()
+
+
+class RefreshJob:
+    """
+    A refresh the scheduler runs over and over.
+
+    Attributes:
+        name (str): Unique name, also the key its next run time is persisted under.
+        run (callable): Does the refresh, takes no arguments.
+        next_run (callable): last run epoch seconds -> next run epoch seconds, see every() and after_game_days().
+        priority (int): Lower runs first when several jobs are due at once.
+        budget (str): Optional name of the scheduler rate budget every run takes a token from.
+    """
+
+    def __init__(self, name, run, next_run, priority=10, budget=None):
+        self.name = name
+        self.run = run
+        self.next_run = next_run
+        self.priority = priority
+        self.budget = budget
+
+
+class RefreshScheduler:
+    """
+    Runs refresh jobs on a background thread so nothing else ever waits on a refresh. Due jobs sit in a priority queue
+    ordered by (due time, priority). A job is queued at most once, so asking for a run that's already queued does nothing.
+    Jobs tied to a rate budget wait for a token. Next run times and the budgets' tokens are saved after every run, so a
+    restart picks up where the last process left off instead of with full budgets.
+    """
+
+    def __init__(self, jobs, state_file=REFRESH_SCHEDULE_FILE, budgets=None, clock=time.time):
+        """
+        :param jobs: list of RefreshJob
+        :param state_file: json file the next run times are persisted to, the budgets go next to it
+        :param budgets: dict, budget name -> TokenBucket
+        :param clock: returns epoch seconds
+        """
+        self.jobs = {job.name: job for job in jobs}
+        self.state_file = state_file
+        self.budgets = budgets or {}
+        self._clock = clock
+        self._queue = []
+        self._queued = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        state = {}
+        if os.path.exists(state_file):
+            with open(state_file, "r") as file:
+                state = json.load(file)
+        if os.path.exists(self.budgets_file):
+            with open(self.budgets_file, "r") as file:
+                for name, saved in json.load(file).items():
+                    if name in self.budgets:
+                        self.budgets[name].restore(saved["tokens"], self._clock() - saved["saved_at"])
+        for job in jobs:
+            # Jobs that have never run, or came due while nothing was running, run right away.
+            self.schedule(job.name, state.get(job.name))
+
+    def schedule(self, name, when=None):
+        """
+        Queues a job to run at `when`, defaults to now. If it's already queued to run sooner, nothing changes.
+        :return: bool, whether the job was (re)queued
+        """
+        when = self._clock() if when is None else when
+        with self._lock:
+            queued = self._queued.get(name)
+            if queued is not None and queued <= when:
+                return False
+            self._queued[name] = when
+            heapq.heappush(self._queue, (when, self.jobs[name].priority, next(self._counter), name))
+        self._wakeup.set()
+        return True
+
+    def next_runs(self):
+        """
+        :return: dict, job name -> epoch seconds it's queued to run at
+        """
+        with self._lock:
+            return dict(self._queued)
+
+    def _pop_due(self, peek=False):
+        """
+        :param peek: bool, only look, leave a due job in the queue
+        :return: tuple, (name of the next job due, None) or (None, seconds until the next job is due, None if the queue is empty)
+        """
+        with self._lock:
+            while self._queue:
+                when, _, _, name = self._queue[0]
+                if self._queued.get(name) != when:
+                    # Superseded by an earlier schedule() of the same job.
+                    heapq.heappop(self._queue)
+                    continue
+                wait = when - self._clock()
+                if wait > 0 or peek:
+                    return None, max(wait, 0)
+                heapq.heappop(self._queue)
+                del self._queued[name]
+                return name, None
+            return None, None
+
+    def run_pending(self):
+        """
+        Runs every job that is due right now, in queue order.
+        :return: list of the names of the jobs that ran
+        """
+        ran = []
+        while True:
+            name, _ = self._pop_due()
+            if name is None:
+                return ran
+            job = self.jobs[name]
+            budget = self.budgets.get(job.budget)
+            if budget is not None:
+                wait = budget.try_acquire()
+                if wait:
+                    logging.info(f"Refresh job {name} is out of {job.budget} budget, retrying in {wait:.0f}s")
+                    self.schedule(name, self._clock() + wait)
+                    continue
+            self._run(job)
+            ran.append(name)
+
+    def _run(self, job):
+        started = self._clock()
+        logging.info(f"Running refresh job {job.name}")
+        try:
+            job.run()
+        except Exception as e:
+            retry = min(job.next_run(started) - started, FAILURE_RETRY_SECONDS)
+            logging.error(f"Refresh job {job.name} failed, retrying in {retry:.0f}s. {e=}")
+            self.schedule(job.name, started + retry)
+        else:
+            logging.info(f"Refresh job {job.name} finished in {self._clock() - started:.1f}s")
+            self.schedule(job.name, job.next_run(started))
+        self.save()
+
+    @property
+    def budgets_file(self):
+        return f"{os.path.splitext(self.state_file)[0]}_budgets.json"
+
+    def save(self):
+        atomic_write_json(self.state_file, self.next_runs())
+        if self.budgets:
+            now = self._clock()
+            atomic_write_json(self.budgets_file, {name: {"tokens": budget.available(), "saved_at": now}
+                                                  for name, budget in self.budgets.items()})
+
+    def start(self):
+        """
+        Starts running jobs on a daemon thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stops the thread after the job that's running, if any.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            self.run_pending()
+            _, wait = self._pop_due(peek=True)
+            self._wakeup.wait(wait)
+
+
+def league_refresh_jobs(league_id=LEAGUE_ID, database_file=None):
+    """
+    The refreshes that keep a league's data warm:
+    - Sleeper's player universe daily, they ask for at most one pull a day
+    - the NFL player ID table weekly
+    - rostered players' current season gamelogs the morning after each game day, during the season only
+    - the league's transactions every TRANSACTIONS_POLL_MINUTES
+    :return: list of RefreshJob
+    """
+    # Imported here, sleeper_api pulls in the Sleeper client and the PFR fetchers.
+    from nfl import nfl_api
+    from nfl.sleeper_api import FantasyLeagueDatabase
+
+    database_file = database_file or os.path.join(DATABASE_DIRECTORY, f"leagueid_{league_id}.json")
+    league = FantasyLeagueDatabase(league_id)
+
+    def refresh_current_season():
+        # A scheduler started in the offseason runs the job once right away, there are no games to fetch.
+        if not in_season(datetime.now()):
+            logging.info("No NFL games are being played, skipping the current season gamelogs")
+            return
+        league.update_players_stats(database_file, years=[str(current_nfl_season())])
+
+    return [
+        RefreshJob("transactions", league.ingest_transactions, every(TRANSACTIONS_POLL_MINUTES * 60), priority=0),
+        RefreshJob("player_universe", FantasyLeagueDatabase.generate_player_database, every(DAY), priority=1, budget="sleeper_players"),
+        RefreshJob("player_id_table", nfl_api.create_player_id_table, every(7 * DAY), priority=2),
+        RefreshJob("current_season_gamelogs", refresh_current_season, after_game_days, priority=3, budget="pfr_gamelogs"),
+    ]
+
+
+def league_refresh_budgets():
+    """
+    :return: dict, budget name -> TokenBucket
+    """
+    return {
+        "sleeper_players": TokenBucket(rate=1 / DAY, capacity=1),
+        # Covers the Monday and Tuesday refreshes back to back, and keeps a failing crawl from retrying PFR every 15 minutes.
+        "pfr_gamelogs": TokenBucket(rate=1 / DAY, capacity=2),
+    }
+
+
+if __name__ == '__main__':
+    logging_steup()
+    scheduler = RefreshScheduler(league_refresh_jobs(), budgets=league_refresh_budgets()).start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        scheduler.stop()
@@ -0,0 +1,174 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+def stat_weight_from_scoring_settings(scoring_settings):
+    """
+    Maps PFR gamelog columns to the points Sleeper awards for them.
+    :param scoring_settings: sleeper ScoringSettings, e.g. league.scoring_settings
+    :return: dict, PFR column -> points per unit
+    """
+    # TODO: To make this scalable, I'll need to get EVERY possible Sleeper scoring stat from API. I only account for TLOOJ atm.
+    return {
+        'Passing_Yds': scoring_settings.pass_yd,  # Passing_Yds.1 is due to yards lost due to sacks. We don't care about that.
+        'Passing_TD': scoring_settings.pass_td,
+        'Receiving_TD': scoring_settings.rec_td,
+        'Rushing_TD': scoring_settings.rush_td,
+        'Kick Returns_TD': scoring_settings.st_td,  # Might need to check this, kr_td is a different stat I think for D/ST?
+        'Punt Returns_TD': scoring_settings.st_td,
+        'Fumbles_TD': scoring_settings.idp_def_td,
+        'Def Interceptions_TD': scoring_settings.idp_def_td,
+        'Scoring_Sfty': scoring_settings.idp_safe,
+        'Receiving_Rec': scoring_settings.rec,
+        'Rushing_Yds': scoring_settings.rush_yd,
+        'Receiving_Yds': scoring_settings.rec_yd,
+        'Kick Returns_Yds': scoring_settings.kr_yd,
+        'Punt Returns_Yds': scoring_settings.pr_yd,
+        'Passing_Int': scoring_settings.pass_int,
+        'Sk': scoring_settings.idp_sack,
+        'Def Interceptions_Int': scoring_settings.idp_int,
+        'Def Interceptions_PD': scoring_settings.idp_pass_def,
+        'Tackles_QBHits': scoring_settings.idp_qb_hit,
+        'Tackles_TFL': scoring_settings.idp_tkl_loss,
+        'Tackles_Solo': scoring_settings.idp_tkl_solo,
+        'Tackles_Ast': scoring_settings.idp_tkl_ast,
+        'Fumbles_Fmb': scoring_settings.fum,
+        'Fumbles_FL': scoring_settings.fum_lost,
+        'Fumbles_Yds': scoring_settings.fum_ret_yd,
+        'Def Interceptions_Yds': scoring_settings.int_ret_yd,
+        "blocked_kick": scoring_settings.idp_blk_kick,  # PFR doesn't include this information. Maybe someday.
+        'Fumbles_FF': scoring_settings.idp_ff,
+        'Fumbles_FR': scoring_settings.idp_fum_rec,
+        'Scoring_2PM': scoring_settings.pass_2pt  # PFR doesn't specify if a 2 pt conversion was a pass or rush, but sleeper scores for it. Assume pass.
+    }
+
+
+class StackedGamelogs:
+    """
+    Many player seasons of gamelogs stacked into one games x stats matrix.
+
+    Attributes:
+        stats (list): Column order of the matrix.
+        matrix (np.ndarray): float64, one row per game. Non numeric cells ("Inactive", "Did Not Play", "null") are 0.
+        rows (list): For each season, the gamelog row indexes of its games, in matrix order.
+        offsets (np.ndarray): Season i owns matrix rows offsets[i]:offsets[i + 1].
+    """
+
+    def __init__(self, stats_tables, stats):
+        """
+        :param stats_tables: list of {stat: {row: value}} gamelog tables, one per player season
+        :param stats: list of the stat columns to stack
+        """
+        self.stats = list(stats)
+        self.rows = []
+        columns = [[] for _ in self.stats]
+        for stats_table in stats_tables:
+            present = [stat for stat in self.stats if stat in stats_table]
+            rows = list(dict.fromkeys(row for stat in present for row in stats_table[stat]))
+            self.rows.append(rows)
+            for column, stat in zip(columns, self.stats):
+                values = stats_table.get(stat)
+                if values is None:
+                    column.extend([None] * len(rows))
+                else:
+                    column.extend(values.get(row) for row in rows)
+
+        self.offsets = np.cumsum([0] + [len(rows) for rows in self.rows])
+        self.matrix = np.zeros((self.offsets[-1], len(self.stats)), dtype=np.float64)
+        for j, column in enumerate(columns):
+            if column:
+                self.matrix[:, j] = pd.to_numeric(pd.Series(column, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+        # Mask out everything that isn't a number so it scores 0, same as the old float() try/except did.
+        self.matrix[~np.isfinite(self.matrix)] = 0.0
+
+    def split(self, values):
+        """
+        Splits a per game array back into per season {row: value} dicts, rounded to 2 decimals.
+        :param values: array with a first axis of length matrix.shape[0]
+        :return: list of dicts, one per season. Seasons without any of the stacked stats get an empty dict.
+        """
+        values = np.round(values, 2)
+        seasons = []
+        for i, rows in enumerate(self.rows):
+            season_values = values[self.offsets[i]:self.offsets[i + 1]]
+            seasons.append(dict(zip(rows, season_values.tolist())))
+        return seasons
+
+
+class ScoringEngine:
+    """
+    Scores gamelogs as a matrix-vector product: the stacked games x stats matrix times the stat_weight vector.
+    """
+
+    def __init__(self, stat_weight):
+        """
+        :param stat_weight: dict, PFR column -> points per unit. Unset (None) weights score 0.
+        """
+        self.stats = list(stat_weight)
+        self.weights = np.array([float(weight or 0) for weight in stat_weight.values()], dtype=np.float64)
+
+    def score(self, stats_tables):
+        """
+        Scores many player seasons at once.
+        :param stats_tables: list of {stat: {row: value}} gamelog tables
+        :return: list of {row: fantasy points} dicts in the same order, empty for seasons without any weighted stats
+        """
+        stacked = StackedGamelogs(stats_tables, self.stats)
+        logging.info(f"Scoring {len(stats_tables)} player seasons, {stacked.matrix.shape[0]} games")
+        return stacked.split(stacked.matrix @ self.weights)
+
+    @staticmethod
+    def stat_weights(scoring_configs):
+        """
+        :param scoring_configs: list of stat_weight dicts or sleeper ScoringSettings
+        :return: list of stat_weight dicts
+        """
+        return [config if isinstance(config, dict) else stat_weight_from_scoring_settings(config) for config in scoring_configs]
+
+    @staticmethod
+    def score_what_if(stats_tables, scoring_configs):
+        """
+        Scores the same gamelogs under many scoring configurations in one pass, nothing is written anywhere.
+        :param stats_tables: list of {stat: {row: value}} gamelog tables, one per player season
+        :param scoring_configs: list of stat_weight dicts or sleeper ScoringSettings
+        :return: WhatIfScores
+        """
+        stat_weights = ScoringEngine.stat_weights(scoring_configs)
+        stats = list(dict.fromkeys(stat for stat_weight in stat_weights for stat in stat_weight))
+        weights = np.array([[float(stat_weight.get(stat) or 0) for stat_weight in stat_weights] for stat in stats], dtype=np.float64)
+        weights = weights.reshape(len(stats), len(stat_weights))
+
+        stacked = StackedGamelogs(stats_tables, stats)
+        logging.info(f"Scoring {len(stats_tables)} player seasons, {stacked.matrix.shape[0]} games under {len(stat_weights)} scoring configs")
+        return WhatIfScores(stacked, stacked.matrix @ weights)
+
+
+class WhatIfScores:
+    """
+    Fantasy points of many player seasons under many scoring configurations.
+
+    Attributes:
+        points (np.ndarray): seasons x games x configs, rounded to 2 decimals. Seasons shorter than the longest one are padded with NaN.
+        rows (list): For each season, the gamelog row indexes along the games axis.
+    """
+
+    def __init__(self, stacked, game_points):
+        """
+        :param stacked: StackedGamelogs that was scored
+        :param game_points: np.ndarray, games x configs
+        """
+        self.rows = stacked.rows
+        lengths = np.diff(stacked.offsets)
+        max_games = int(lengths.max()) if len(lengths) else 0
+        self.points = np.full((len(lengths), max_games, game_points.shape[1]), np.nan)
+        season_index = np.repeat(np.arange(len(lengths)), lengths)
+        game_index = np.arange(len(season_index)) - stacked.offsets[season_index]
+        self.points[season_index, game_index] = np.round(game_points, 2)
+
+    def season_totals(self):
+        """
+        :return: np.ndarray, seasons x configs, points summed over each season's games
+        """
+        return np.nansum(self.points, axis=1)
@@ -10,18 +10,25 @@ from sleeper.model import (
     Player,
     User,
     ScoringSettings,
+    SportState,
+    Transaction,
 )
 import json
 import os
 
-from nfl.utils import logging_steup, is_file_older_than_one_week, create_backup
+from nfl.utils import logging_steup, is_file_older_than_one_week, create_backup, atomic_write_json
 from nfl.json_handler import CustomJSONEncoder
 from nfl.constants import LEAGUE_ID, GLOBAL_NFL_PLAYER_ID_FILE, TRANSACTIONS_DIRECTORY
 from nfl.constants import DATABASE_DIRECTORY
 from nfl.constants import GLOBAL_SLEEPER_PLAYER_DATA_FILE
-from nfl.utils import rename_keys_in_json
 import nfl.nfl_api as nfl_api
 import nfl.nfl_stats as nfl_stats
+from nfl.crawl_journal import CrawlJournal
+from nfl.refresh_manifest import RefreshManifest
+from nfl.roster_diff import RosterDiff, RosterSnapshot
+from nfl.stats_store import LeagueStatsStore
+from nfl.transaction_log import TransactionIngester, TransactionLog
+from nfl.player_store import PlayerStore
 import pandas as pd
 
 
@@ -40,50 +47,63 @@ class FantasyLeagueDatabase:
         """
         logging.info(f"Generating player database from sleeper")
         player_data = PlayerAPIClient.get_all_players(sport=Sport.NFL)
-        player_data_dict = {player_id: Player.to_dict(player) for player_id, player in player_data.items()}
         os.makedirs(DATABASE_DIRECTORY, exist_ok=True)
-        player_data_file = os.path.join(DATABASE_DIRECTORY, "player_data.json")
+        player_data_file = GLOBAL_SLEEPER_PLAYER_DATA_FILE
 
-        with open(player_data_file, 'w') as json_file:
-            json.dump(player_data_dict, json_file, indent=4, cls=CustomJSONEncoder)
+        PlayerStore.write(player_data_file, ((player_id, Player.to_dict(player)) for player_id, player in player_data.items()), encoder=CustomJSONEncoder)
         logging.info(f"{player_data_file=} generated")
 
     @staticmethod
-    def process_roster(roster, users, player_data, player_id_table, get_logs=False):
+    def process_roster(roster, users, player_data, player_id_index, get_logs=False, crawler=None, fetched=None):
         """
         Processes the roster data and returns a dictionary with the owner's display name, team name, and players data.
         :param roster: from league object
-        :param users: from league object
+        :param users: from league object, or the dict from index_users()
         :param player_data: All NFL player data from sleeper's api as json object
-        :param player_id_table: from nfl api for mapping IDs to names
+        :param player_id_index: PlayerIdIndex from nfl api for mapping IDs to names
         :param get_logs: Bool, set True to Query PFR's site to get gamelogs data. For false just return list of Sleeper player IDs
+        :param crawler: Crawler, optional. With get_logs, queue the gamelog fetches on it instead of fetching them now
+        :param fetched: set, optional. With get_logs, collects the (player_id, year) seasons that came back with gamelogs
         :return: dict, owner_data
         """
-        for user in users:
-            if roster.owner_id == user.user_id:
-                owner_data = {
-                    "owner_id": roster.owner_id,
-                    "display_name": user.display_name,
-                    "team_name": user.metadata['team_name'],
-                    "players_data": []
-                }
-                if get_logs:
-                    for player_id in roster.players:
-                        nfl_stats.Stats.fetch_game_log_data(owner_data, player_data, player_id, player_id_table)
-                    return owner_data
-                else:
-                    for player_id in roster.players:
-                        if player_id in player_data:
-                            owner_data["players_data"].append(player_id)
-                    return owner_data
-        return None
+        users_by_id = users if isinstance(users, dict) else FantasyLeagueDatabase.index_users(users)
+        user = users_by_id.get(roster.owner_id)
+        if user is None:
+            return None
+        owner_data = {
+            "owner_id": roster.owner_id,
+            "display_name": user.display_name,
+            "team_name": user.metadata['team_name'],
+            "players_data": []
+        }
+        if get_logs:
+            for player_id in roster.players or []:
+                nfl_stats.Stats.fetch_game_log_data(owner_data, player_data, player_id, player_id_index, crawler=crawler, fetched=fetched)
+        else:
+            for player_id in roster.players or []:
+                if player_id in player_data:
+                    owner_data["players_data"].append(player_id)
+        return owner_data
+
+    @staticmethod
+    def index_users(users):
+        """
+        :param users: from league object
+        :return: dict, user_id -> user
+        """
+        return {user.user_id: user for user in users}
 
     @staticmethod
     def parse_players():
         pass
 
     @staticmethod
-    def initialize_league_data(league_id):
+    def initialize_league_data(league_id, refresh_stale=False):
+        """
+        Loads the league's rosters and users from Sleeper, and the player database and ID index from disk. They're only
+        built here when missing, keeping them fresh is the refresh scheduler's job (see nfl/scheduler.py).
+        :param refresh_stale: bool, default False. Rebuild files older than a week before loading them, for runs without the scheduler
+        """
         rosters = league_id.get_league_rosters_by_id()
         users = league_id.get_users_in_league_by_id()
 
@@ -91,75 +111,117 @@ class FantasyLeagueDatabase:
             logging.info(f"Player database file not found, generating the database.")
             FantasyLeagueDatabase.generate_player_database()
         elif is_file_older_than_one_week(GLOBAL_SLEEPER_PLAYER_DATA_FILE):
-            logging.info(f"Player database is older than a week, updating the database.")
-            FantasyLeagueDatabase.generate_player_database()
+            if refresh_stale:
+                logging.info(f"Player database is older than a week, updating the database.")
+                FantasyLeagueDatabase.generate_player_database()
+            else:
+                logging.warning(f"Player database is older than a week, is the refresh scheduler running?")
 
-        with open(GLOBAL_SLEEPER_PLAYER_DATA_FILE, "r") as file:
-            player_data = json.load(file)
+        player_data = PlayerStore.open(GLOBAL_SLEEPER_PLAYER_DATA_FILE)
 
         if not os.path.exists(f"{GLOBAL_NFL_PLAYER_ID_FILE}"):
             logging.info(f"Player ID table not found, generating the database. {GLOBAL_NFL_PLAYER_ID_FILE}")
-            player_id_table = nfl_api.create_player_id_table()
+            nfl_api.create_player_id_table()
         elif is_file_older_than_one_week(GLOBAL_NFL_PLAYER_ID_FILE):
-            logging.info(f"Player ID table is older than a week, updating the database. {GLOBAL_NFL_PLAYER_ID_FILE}")
-            player_id_table = nfl_api.create_player_id_table()
-        else:
-            player_id_table = pd.read_csv(GLOBAL_NFL_PLAYER_ID_FILE)
+            if refresh_stale:
+                logging.info(f"Player ID table is older than a week, updating the database. {GLOBAL_NFL_PLAYER_ID_FILE}")
+                nfl_api.create_player_id_table()
+            else:
+                logging.warning(f"Player ID table is older than a week, is the refresh scheduler running? {GLOBAL_NFL_PLAYER_ID_FILE}")
+        player_id_index = nfl_api.load_player_id_index()
 
-        return rosters, users, player_data, player_id_table
+        return rosters, users, player_data, player_id_index
 
-    def diff_rostered_players(self, old_database):
+    def diff_rostered_players(self, old_database, session=None):
         """
         Pass in the path to an existing database file, returns a dictionary of players that have been added or dropped from a roster since the database was generated
+        :param session: LeagueSession, optional. Reuses its Sleeper data and in memory database instead of loading them again
         :return: dict, change_owner_data
         """
-        rosters, users, player_data, player_id_table = FantasyLeagueDatabase.initialize_league_data(self.league)
+        if session:
+            return session.roster_changes()
+        rosters, users, player_data, player_id_index = FantasyLeagueDatabase.initialize_league_data(self.league)
+        new_owner_data = FantasyLeagueDatabase.process_rosters(rosters, users, player_data, player_id_index)
+        with open(old_database, "r") as file:
+            old_owner_json = json.load(file)
+        return FantasyLeagueDatabase.diff_rosters(old_owner_json, new_owner_data, player_data)
+
+    @staticmethod
+    def process_rosters(rosters, users, player_data, player_id_index):
+        """
+        :return: list of owner_data for every roster, with players_data holding only the Sleeper player IDs
+        """
         new_owner_data = []
+        users = FantasyLeagueDatabase.index_users(users)
         for roster in rosters:
-            _new_owner_data = FantasyLeagueDatabase.process_roster(roster, users, player_data, player_id_table)
+            _new_owner_data = FantasyLeagueDatabase.process_roster(roster, users, player_data, player_id_index)
             if _new_owner_data:
                 new_owner_data.append(_new_owner_data)
-        with open(old_database, "r") as file:
-            old_owner_json = json.load(file)
+        return new_owner_data
+
+    @staticmethod
+    def diff_rosters(old_owner_json, new_owner_data, player_data):
+        """
+        Compares the rosters in a league database against Sleeper's current ones.
+        :param old_owner_json: league database as json object
+        :param new_owner_data: list of owner_data from process_rosters
+        :param player_data: All NFL player data from sleeper's api
+        :return: dict, change_owner_data
+        """
+        old = RosterSnapshot.from_league_data(old_owner_json)
+        diff = RosterDiff(old, RosterSnapshot.from_owner_data(new_owner_data))
+        new_owners = {new_owner['owner_id']: new_owner for new_owner in new_owner_data}
+        old_names = {details[0]['player_id']: name for roster in old_owner_json for player in roster['players_data'] for name, details in player.items()}
+
+        def player_name(player_id):
+            if player_id in old_names:
+                return old_names[player_id]
+            return f"{player_data[player_id]['first_name']} {player_data[player_id]['last_name']}"
+
+        for player_id, from_owner, to_owner in diff.moves:
+            logging.info(f"id: {player_id} {player_name(player_id)} moved from id: {from_owner} to id: {to_owner}.")
+        for owner_a, owner_b, players_a_to_b, players_b_to_a in diff.trades:
+            logging.info(f"Trade between id: {owner_a} and id: {owner_b}: {players_a_to_b} for {players_b_to_a}.")
+
         change_owner_data = []
         for old_roster in old_owner_json:
-            _change_owner_data = {
-                "owner_id": old_roster['owner_id'],
+            owner_id = old_roster['owner_id']
+            for player_id in diff.drops.get(owner_id, ()):
+                logging.info(f"player_name='{player_name(player_id)}' id: {player_id} has been dropped from id: {owner_id} {old_roster['display_name']}'s roster.")
+            for player_id in diff.adds.get(owner_id, ()):
+                logging.info(f"player_name='{player_name(player_id)}' id: {player_id} has been added to id: {owner_id} {new_owners[owner_id]['display_name']}'s roster.")
+            change_owner_data.append({
+                "owner_id": owner_id,
                 "display_name": old_roster['display_name'],
                 "team_name": old_roster['team_name'],
-                "players": [],
-                "players_delete": []
-            }
-            old_player_list = {}
-            # Find which players were dropped from a team's roster since the last update.
-            for old_player in old_roster['players_data']:
-                for player_name, details in old_player.items():
-                    old_player_list.update({details[0]['player_id']: player_name})
-                    for new_owner in new_owner_data:
-                        if old_roster['owner_id'] == new_owner['owner_id']:
-                            if details[0]['player_id'] not in new_owner['players_data']:
-                                logging.info(f"{player_name=} id: {details[0]['player_id']} has been dropped from id: {old_roster['owner_id']} {old_roster['display_name']}'s roster.")
-                                _change_owner_data["players_delete"].append(details[0]['player_id'])
-            # Find which players were added to a team's roster since the last update.
-            for new_owner in new_owner_data:
-                if old_roster['owner_id'] == new_owner['owner_id']:
-                    for new_player_id in new_owner['players_data']:
-                        if new_player_id not in old_player_list.keys():
-                                player_name = f"{player_data[new_player_id]['first_name']} {player_data[new_player_id]['last_name']}"
-                                logging.info(f"{player_name=} id: {new_player_id} has been added to id: {new_owner['owner_id']} {new_owner['display_name']}'s roster.")
-                                _change_owner_data["players"].append(new_player_id)
-            change_owner_data.append(_change_owner_data)
+                "players": list(diff.adds.get(owner_id, ())),
+                "players_delete": list(diff.drops.get(owner_id, ()))
+            })
 
         return change_owner_data
 
-    def save_transactions_to_file(self, old_database):
+    def ingest_transactions(self, current_week=None):
+        """
+        Appends the league's transactions since the last call to its transaction log. Much cheaper than
+        save_transactions_to_file() for polling, only the current week's transactions are requested.
+        :return: list of the new transactions
+        """
+        with TransactionLog.for_league(self.league_id) as log:
+            return TransactionIngester(self.league, log).poll(current_week=current_week)
+
+    def save_transactions_to_file(self, old_database, session=None):
         """
         Saves the transactions data to a file in the 'transactions' directory.
         :param old_database: path to old database file
+        :param session: LeagueSession, optional. Reuses its Sleeper data and in memory database instead of loading them again
         :return:
         """
-        player_data = FantasyLeagueDatabase.initialize_league_data(self.league)[2]
-        change_owner_data = self.diff_rostered_players(old_database)
+        if session:
+            player_data = session.player_data
+            change_owner_data = session.roster_changes()
+        else:
+            player_data = FantasyLeagueDatabase.initialize_league_data(self.league)[2]
+            change_owner_data = self.diff_rostered_players(old_database)
         roster_changes = []
         for roster in change_owner_data:
             for player_id in roster['players']:
@@ -194,10 +256,8 @@ class FantasyLeagueDatabase:
         if not os.path.exists(file_path):
             os.makedirs(file_path)
 
-        roster_changes = json.dumps(roster_changes, indent=4)
         transactions_file = os.path.join(file_path, f"{time.strftime('%Y%m%d')}_{self.league_id}_transactions.json")
-        with open(transactions_file, 'w') as file:
-            file.write(roster_changes)
+        atomic_write_json(transactions_file, roster_changes, indent=4)
 
         return change_owner_data
 
@@ -205,22 +265,45 @@ class FantasyLeagueDatabase:
         """
         Generates a .json file containing relevant roster information for your league. Make sure there's a player database file to read from, run generate_player_database() first.
         """
-        rosters, users, player_data, player_id_table = FantasyLeagueDatabase.initialize_league_data(self.league)
+        rosters, users, player_data, player_id_index = FantasyLeagueDatabase.initialize_league_data(self.league)
 
         final_data = []
         logging.info(f'Generating league database file for {self.league_id=}')
 
+        league_database_file = os.path.join(DATABASE_DIRECTORY, f"leagueid_{LEAGUE_ID}.json")
+        # Seasons fetched by an earlier, interrupted run are picked up from the journal instead of PFR.
+        journal = CrawlJournal.for_database(league_database_file)
+        crawler = nfl_stats.Stats.gamelog_crawler(journal=journal)
+        fetched = set()
+        users = FantasyLeagueDatabase.index_users(users)
         for roster in rosters:
-            owner_data = FantasyLeagueDatabase.process_roster(roster, users, player_data, player_id_table, get_logs=True)
+            owner_data = FantasyLeagueDatabase.process_roster(roster, users, player_data, player_id_index, get_logs=True,
+                                                              crawler=crawler, fetched=fetched)
             if owner_data:
                 final_data.append(owner_data)
+        crawler.run()
+        logging.info(f"PFR requests for {self.league_id=}: {nfl_stats.http_client.counters()}")
 
-        league_database_file = os.path.join(DATABASE_DIRECTORY, f"leagueid_{LEAGUE_ID}.json")
-        with open(league_database_file, "w") as file:
-            json.dump(final_data, file, indent=4)
+        atomic_write_json(league_database_file, final_data, indent=4)
 
-        # clean up "Unnamed" columns the json file which comes from PFR
-        rename_keys_in_json(league_database_file)
+        with LeagueStatsStore.for_database(league_database_file) as store:
+            store.import_league(final_data)
+
+        manifest = RefreshManifest.for_database(league_database_file)
+        FantasyLeagueDatabase.record_refreshed_seasons(manifest, fetched)
+        manifest.save()
+        journal.clear()
+
+    @staticmethod
+    def record_refreshed_seasons(manifest, fetched):
+        """
+        Records the seasons that were just fetched in the refresh manifest. Only seasons that came back with gamelogs are
+        passed in, a failed fetch or missing page is fetched again on the next incremental update.
+        :param manifest: RefreshManifest
+        :param fetched: set of (player_id, year), see Stats.fetch_game_log_data()
+        """
+        for player_id, year in sorted(fetched):
+            manifest.record(player_id, year)
 
     def update_league_database(self, database_file, years=None, do_update=True):
         """
@@ -231,73 +314,182 @@ class FantasyLeagueDatabase:
         :param do_update: bool, default True. Updates player stats for the players that were recently transacted since the last update.
         """
         create_backup(database_file)
-        rosters, users, player_data, player_id_table = FantasyLeagueDatabase.initialize_league_data(self.league)
-        with open(database_file, "r") as file:
-            league_data = json.load(file)
-        change_owner_data = self.save_transactions_to_file(database_file)
-
-        for change in change_owner_data:
-            owner_id = change['owner_id']
-
-            # Find the corresponding owner in league_data
-            for owner in league_data:
-                if owner['owner_id'] == owner_id:
-                    # Handle players to add
-                    for player_id in change['players']:
-                        if player_id in player_data:
-                            player_info = player_data[player_id]
-                            player_name = f"{player_info['first_name']} {player_info['last_name']}"
-                            logging.info(f"Adding {player_name} to {owner['display_name']}'s roster.")
-                            owner['players_data'].append({player_name: [player_info]})
-
-                    # Handle players to delete
-                    for player_id in change['players_delete']:
-                        for player in owner['players_data']:
-                            for player_name, details in player.items():
-                                if details[0]['player_id'] == player_id:
-                                    logging.info(f"Removing {player_name} from {owner['display_name']}'s roster.")
-                                    owner['players_data'].remove(player)
-                                    break
-
-        with open(database_file, "w") as file:
-            json.dump(league_data, file, indent=4)
-
-        # Update player stats for the players that were added to the roster
-        if do_update:
-            for change in change_owner_data:
-                owner_id = change['owner_id']
-                for owner in league_data:
-                    if owner['owner_id'] == owner_id:
-                        for player_id in change['players']:
-                            FantasyLeagueDatabase(self.league_id).update_player_stats_in_database(database_file=database_file, years=years, update_player=player_id)
-
-    def update_player_stats_in_database(self, database_file, years=None, update_player=None):
+        with LeagueSession(self.league, database_file) as session:
+            change_owner_data = self.save_transactions_to_file(database_file, session=session)
+            session.apply_roster_changes(change_owner_data)
+
+            # Update player stats for the players that were added to the roster
+            if do_update:
+                session.refresh_players({player_id for change in change_owner_data for player_id in change['players']}, years=years)
+
+    def update_player_stats_in_database(self, database_file, years=None, update_player=None, incremental=False):
         """
         Run update_league_database() first, then this
         Updates the player stats in the league database file for the given year. Make sure there's a player database file to read from, run generate_player_database() first.
+        :param update_player: Sleeper player ID, or a set of them, optional. Only update these players instead of every rostered player
+        :param incremental: bool, default False. When years is None, only fetch the seasons the refresh manifest has as still open or missing
+            instead of every season of each player's career. Players the manifest doesn't know yet get a full refresh.
+        """
+        if update_player:
+            player_ids = {update_player} if isinstance(update_player, str) else update_player
+        else:
+            player_ids = None
+        self.update_players_stats(database_file, player_ids=player_ids, years=years, incremental=incremental)
+
+    def update_players_stats(self, database_file, player_ids=None, years=None, incremental=False):
+        """
+        Refreshes the stats of many players in one pass: every gamelog fetch is crawled together, patched into the in memory
+        league database, and the file is written once.
+        :param database_file: path to the league database file
+        :param player_ids: set of Sleeper player IDs, optional, default is None (every rostered player)
+        :param years: list of years to update for every player, or a dict of player_id -> list of years. Optional, default is None
+            (updates data for ALL years each player has served)
+        :param incremental: bool, default False. See update_player_stats_in_database()
+        """
+        with LeagueSession(self.league, database_file) as session:
+            if player_ids is None:
+                player_ids = session.rostered_player_ids()
+            logging.info(f"Updating stats for {len(player_ids)} players in {database_file=}")
+            session.refresh_players(player_ids, years=years, incremental=incremental)
+
+
+class LeagueSession:
+    """
+    One update run against a league database. Sleeper's rosters, users, the player store and the ID index are fetched once,
+    the league database is read once and kept in memory while roster changes and stat refreshes are applied to it, and
+    commit() writes the database, stats store and refresh manifest back once. Fetched seasons are checkpointed to a crawl
+    journal, so rerunning an interrupted update only fetches what's left.
+
+    Use it as a context manager: it commits on a clean exit, and leaves the files untouched if anything raised.
+    """
+
+    def __init__(self, league, database_file):
+        """
+        :param league: SleeperLeague
+        :param database_file: path to the league database file
         """
-        sleeper_player_data, player_id_table = FantasyLeagueDatabase.initialize_league_data(self.league)[2:4]
+        self.league = league
+        self.database_file = database_file
+        self.rosters, self.users, self.player_data, self.player_id_index = FantasyLeagueDatabase.initialize_league_data(league)
         with open(database_file, "r") as file:
-            league_data = json.load(file)
+            self.league_data = json.load(file)
+        self.manifest = RefreshManifest.for_database(database_file)
+        self.journal = CrawlJournal.for_database(database_file)
+        self.crawler = nfl_stats.Stats.gamelog_crawler(journal=self.journal)
+        # player_id -> years queued for refresh, None meaning every season the player has served
+        self.refreshed = {}
+        # (player_id, year) of the queued seasons that came back with gamelogs
+        self.fetched = set()
+        self._roster_changes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    def owners(self):
+        """
+        :return: dict, owner_id -> that owner's roster in the in memory league database
+        """
+        return {owner['owner_id']: owner for owner in self.league_data}
 
-        for roster in league_data:
+    def roster_changes(self):
+        """
+        Players added to or dropped from each roster since the league database was written, computed once per session
+        against the database as it was loaded.
+        :return: dict, change_owner_data
+        """
+        if self._roster_changes is None:
+            new_owner_data = FantasyLeagueDatabase.process_rosters(self.rosters, self.users, self.player_data, self.player_id_index)
+            self._roster_changes = FantasyLeagueDatabase.diff_rosters(self.league_data, new_owner_data, self.player_data)
+        return self._roster_changes
+
+    def apply_roster_changes(self, change_owner_data=None):
+        """
+        Adds and removes players on the in memory league database.
+        :param change_owner_data: optional, defaults to roster_changes()
+        """
+        owners = self.owners()
+        for change in change_owner_data if change_owner_data is not None else self.roster_changes():
+            owner = owners.get(change['owner_id'])
+            if owner is None:
+                continue
+            # Handle players to add
+            for player_id in change['players']:
+                if player_id in self.player_data:
+                    player_info = self.player_data[player_id]
+                    player_name = f"{player_info['first_name']} {player_info['last_name']}"
+                    logging.info(f"Adding {player_name} to {owner['display_name']}'s roster.")
+                    owner['players_data'].append({player_name: [player_info]})
+
+            # Handle players to delete
+            players_delete = set(change['players_delete'])
+            for player in list(owner['players_data']):
+                for player_name, details in player.items():
+                    if details[0]['player_id'] in players_delete:
+                        logging.info(f"Removing {player_name} from {owner['display_name']}'s roster.")
+                        owner['players_data'].remove(player)
+                        break
+
+    def rostered_player_ids(self):
+        """
+        :return: set of the Sleeper player IDs on every roster of the in memory league database
+        """
+        return {details[0]['player_id'] for roster in self.league_data for player in roster['players_data'] for details in player.values()}
+
+    def refresh_players(self, player_ids, years=None, incremental=False):
+        """
+        Queues gamelog fetches for rostered players. Nothing is fetched until commit(), so every player is crawled together.
+        :param player_ids: iterable of Sleeper player IDs, players not on any roster are ignored
+        :param years: list of years to update, or a dict of player_id -> list of years. Optional, default is None (every
+            season each player has served)
+        :param incremental: bool, default False. When years is None, only fetch the seasons the refresh manifest has as
+            still open or missing. Players the manifest doesn't know yet get a full refresh.
+        """
+        player_ids = set(player_ids)
+        for roster in self.league_data:
             for player in roster['players_data']:
                 for player_name, player_data in player.items():
                     player_id = player_data[0]['player_id']
-                    if update_player:
-                        if player_id == update_player:
-                            logging.info(f"Unique update for id: {update_player} Updating {player_name} stats for {roster['display_name']}")
-                            nfl_stats.Stats.fetch_game_log_data(owner_data=roster, player_data=sleeper_player_data, player_id=player_id, player_id_table=player_id_table, update_years=years)
-                        else:
-                            break
-                    else:
-                        nfl_stats.Stats.fetch_game_log_data(owner_data=roster, player_data=sleeper_player_data, player_id=player_id, player_id_table=player_id_table, update_years=years)
+                    if player_id not in player_ids or player_id in self.refreshed:
+                        continue
+                    player_years = years.get(player_id) if isinstance(years, dict) else years
+                    if incremental and player_years is None:
+                        player_years = self.manifest.seasons_to_refresh(player_id)
+                        logging.info(f"Incremental update for id: {player_id} seasons: {player_years if player_years is not None else 'all'}")
+                    logging.info(f"Updating {player_name} stats for {roster['display_name']}")
+                    self.refreshed[player_id] = player_years
+                    nfl_stats.Stats.fetch_game_log_data(owner_data=roster, player_data=self.player_data, player_id=player_id,
+                                                        player_id_index=self.player_id_index, update_years=player_years, crawler=self.crawler,
+                                                        fetched=self.fetched)
+
+    def commit(self):
+        """
+        Runs the queued fetches, then writes the league database, the stats store and the refresh manifest, each once.
+        """
+        if self.refreshed:
+            self.crawler.run()
+            logging.info(f"PFR requests for {self.league.league_id=}: {nfl_stats.http_client.counters()}")
+
+        atomic_write_json(self.database_file, self.league_data, indent=4)
 
-        with open(database_file, "w") as file:
-            json.dump(league_data, file, indent=4)
+        # Readers go to the store instead of the json when it's there, so a new one gets every player, not just the refreshed.
+        store_exists = os.path.exists(LeagueStatsStore.store_file_for(self.database_file))
+        with LeagueStatsStore.for_database(self.database_file) as store:
+            if not store_exists:
+                store.import_league(self.league_data)
+            else:
+                store.sync_rosters(self.league_data)
+                if self.refreshed:
+                    store.upsert_players(self.league_data, player_ids=set(self.refreshed))
 
-        # clean up "Unnamed" columns the json file which comes from PFR
-        rename_keys_in_json(database_file)
+        FantasyLeagueDatabase.record_refreshed_seasons(self.manifest, self.fetched)
+        self.manifest.save()
+        self.journal.clear()
+        self.refreshed = {}
+        self.fetched = set()
 
 
 class SleeperLeague:
@@ -325,6 +517,20 @@ class SleeperLeague:
         league_users = LeagueAPIClient.get_users_in_league(league_id=self.league_id)
         return league_users
 
+    def get_transactions(self, week) -> list[Transaction]:
+        """
+        Provided league ID, returns the league's transactions for one week
+        """
+        return LeagueAPIClient.get_transactions(league_id=self.league_id, week=week)
+
+    @staticmethod
+    def get_current_week() -> int:
+        """
+        Returns the NFL week Sleeper is currently in, the offseason counts as week 1
+        """
+        sport_state: SportState = LeagueAPIClient.get_sport_state(sport=Sport.NFL)
+        return sport_state.leg or sport_state.week or 1
+
     def get_league_scoring_settings(self) -> ScoringSettings:
         league = self.get_league_by_id()
         return league.scoring_settings
@@ -343,7 +549,8 @@ if __name__ == '__main__':
         NFLStatsDatabase('../json/database_filename.json', league).calculate_fantasy_points()
     3. Convert the database object to .csv object
         CustomJSONEncoder.normalize_gamelog_json_database_to_csv_format('../json/database_filename.json')
-    4. Pass the .csv to R script to generate cluster svgs
+    4. Pass the .csv to R script to generate cluster svgs, or cluster in process straight from the stats store
+        clustering.run_cluster_analysis('../json/database_filename.json')
     """
     logging_steup()
     # FantasyLeagueDatabase(LEAGUE_ID).generate_league_database()
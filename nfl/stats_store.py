@@ -0,0 +1,306 @@
+import itertools
+import json
+import logging
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rosters (
+    owner_id TEXT PRIMARY KEY,
+    display_name TEXT,
+    team_name TEXT,
+    sort_order INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    details TEXT,
+    sort_order INTEGER
+);
+CREATE INDEX IF NOT EXISTS players_owner ON players (owner_id);
+CREATE TABLE IF NOT EXISTS gamelogs (
+    player_id TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    stat TEXT NOT NULL,
+    num REAL,
+    value,
+    col INTEGER,
+    PRIMARY KEY (player_id, season, stat, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS gamelogs_stat ON gamelogs (stat, season);
+"""
+
+INSERT_GAMELOG = "INSERT INTO gamelogs (player_id, season, row, stat, num, value, col) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+def _number(value):
+    """
+    :return: float value of a gamelog cell, or None for cells like "Inactive", "Did Not Play" or "null". Percentages like
+        "85%" are stored as 85.0
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.endswith("%"):
+        value = value[:-1]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _season(stats_key):
+    """
+    "2023_stats" -> 2023
+    """
+    return int(stats_key.split("_")[0])
+
+
+class LeagueStatsStore:
+    """
+    SQLite backed store for a league database, so consumers can read one player's gamelogs or one stat column across the
+    league without parsing the whole nested json file.
+
+    Gamelogs are kept one cell per row, keyed by (player_id, season, stat, row). Every cell keeps its original value as well as
+    a REAL `num` column, which is NULL for non numeric cells, so aggregations never have to parse strings, and `col`, the
+    position of its stat in the gamelog table, so stats are read back in PFR's column order.
+    """
+
+    def __init__(self, store_file):
+        self.store_file = store_file
+        self.connection = sqlite3.connect(store_file)
+        self.connection.executescript(SCHEMA)
+        # Stores created before `col` was added read their stats back alphabetically until they are written again.
+        if "col" not in {column[1] for column in self.connection.execute("PRAGMA table_info(gamelogs)")}:
+            self.connection.execute("ALTER TABLE gamelogs ADD COLUMN col INTEGER")
+
+    @staticmethod
+    def store_file_for(database_file):
+        """
+        :param database_file: path to the league database json file
+        :return: path of the store kept alongside it
+        """
+        return f"{os.path.splitext(database_file)[0]}.sqlite"
+
+    @staticmethod
+    def for_database(database_file):
+        """
+        :param database_file: path to the league database json file
+        :return: LeagueStatsStore stored alongside it
+        """
+        return LeagueStatsStore(LeagueStatsStore.store_file_for(database_file))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _gamelog_rows(player_id, season, stats_table, first_col=0):
+        for col, (stat, values) in enumerate(stats_table.items(), first_col):
+            for row, value in values.items():
+                if isinstance(value, (list, dict)):
+                    value = json.dumps(value)
+                yield player_id, season, int(row), stat, _number(value), value, col
+
+    def upsert_seasons(self, seasons):
+        """
+        Replaces the gamelogs of many player seasons in one transaction.
+        :param seasons: iterable of (player_id, season, stats_table) where stats_table is {stat: {row: value}}
+        """
+        with self.connection:
+            self._write_seasons(seasons)
+
+    def _write_seasons(self, seasons):
+        for player_id, season, stats_table in seasons:
+            self.connection.execute("DELETE FROM gamelogs WHERE player_id = ? AND season = ?", (player_id, int(season)))
+            self.connection.executemany(INSERT_GAMELOG, self._gamelog_rows(player_id, int(season), stats_table))
+
+    def upsert_stat(self, stat, values):
+        """
+        Replaces a single stat column, e.g. fantasy_points, for many player seasons in one transaction. The column keeps its
+        position, a new one goes after the season's other columns.
+        :param values: iterable of (player_id, season, {row: value})
+        """
+        with self.connection:
+            for player_id, season, rows in values:
+                col, = self.connection.execute(
+                    "SELECT COALESCE(MAX(CASE WHEN stat = ? THEN col END), MAX(col) + 1, 0) FROM gamelogs WHERE player_id = ? AND season = ?",
+                    (stat, player_id, int(season))).fetchone()
+                self.connection.execute("DELETE FROM gamelogs WHERE player_id = ? AND season = ? AND stat = ?", (player_id, int(season), stat))
+                self.connection.executemany(INSERT_GAMELOG, self._gamelog_rows(player_id, int(season), {stat: rows}, col))
+
+    def upsert_players(self, league_data, player_ids=None):
+        """
+        Writes roster and player details plus every season of gamelogs for the given players from a league database.
+        :param league_data: league database as json object
+        :param player_ids: set of Sleeper player IDs, optional, defaults to every player in league_data
+        """
+        with self.connection:
+            self._write_players(league_data, player_ids)
+
+    def _write_players(self, league_data, player_ids=None):
+        for roster_order, roster in enumerate(league_data):
+            self.connection.execute("INSERT OR REPLACE INTO rosters VALUES (?, ?, ?, ?)",
+                                    (roster['owner_id'], roster['display_name'], roster['team_name'], roster_order))
+            for player_order, player in enumerate(roster['players_data']):
+                for player_name, player_data in player.items():
+                    player_id = player_data[0]['player_id']
+                    if player_ids is not None and player_id not in player_ids:
+                        continue
+                    self.connection.execute("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?)",
+                                            (player_id, roster['owner_id'], player_name, json.dumps(player_data[0]), player_order))
+                    self._write_seasons((player_id, _season(stats_key), stats_table)
+                                        for stats in player_data[1:] for stats_key, stats_table in stats.items())
+
+    def import_league(self, league_data):
+        """
+        Replaces the whole store with the contents of a league database, in one transaction so a failed import leaves the
+        store as it was.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM rosters")
+            self.connection.execute("DELETE FROM players")
+            self.connection.execute("DELETE FROM gamelogs")
+            self._write_players(league_data)
+        logging.info(f"Imported league database into {self.store_file=}")
+
+    def sync_rosters(self, league_data):
+        """
+        Brings roster membership and player details in line with a league database, deleting players that are no longer rostered.
+        Gamelogs of players that are still rostered aren't touched.
+        """
+        rostered = set()
+        with self.connection:
+            self.connection.execute("DELETE FROM rosters")
+            for roster_order, roster in enumerate(league_data):
+                self.connection.execute("INSERT INTO rosters VALUES (?, ?, ?, ?)",
+                                        (roster['owner_id'], roster['display_name'], roster['team_name'], roster_order))
+                for player_order, player in enumerate(roster['players_data']):
+                    for player_name, player_data in player.items():
+                        player_id = player_data[0]['player_id']
+                        rostered.add(player_id)
+                        self.connection.execute("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?)",
+                                                (player_id, roster['owner_id'], player_name, json.dumps(player_data[0]), player_order))
+            stored = {row[0] for row in self.connection.execute("SELECT player_id FROM players")}
+            for player_id in stored - rostered:
+                self.connection.execute("DELETE FROM players WHERE player_id = ?", (player_id,))
+                self.connection.execute("DELETE FROM gamelogs WHERE player_id = ?", (player_id,))
+
+    def player_seasons(self, player_id, seasons=None):
+        """
+        Reads one player's gamelogs.
+        :param seasons: list of seasons, optional, defaults to all
+        :return: dict shaped like the league database, {"YYYY_stats": {stat: {row: value}}} in season order
+        """
+        query = "SELECT season, stat, row, value FROM gamelogs WHERE player_id = ?"
+        params = [player_id]
+        if seasons is not None:
+            query += f" AND season IN ({', '.join('?' for _ in seasons)})"
+            params.extend(int(season) for season in seasons)
+        query += " ORDER BY season, col, stat, row"
+        player_stats = {}
+        for season, stat, row, value in self.connection.execute(query, params):
+            player_stats.setdefault(f"{season}_stats", {}).setdefault(stat, {})[str(row)] = value
+        return player_stats
+
+    def stat_column(self, stat, seasons=None, player_ids=None):
+        """
+        Reads one stat across the league.
+        :return: list of (player_id, season, row, num) where num is None for non numeric cells
+        """
+        query = "SELECT player_id, season, row, num FROM gamelogs WHERE stat = ?"
+        params = [stat]
+        if seasons is not None:
+            query += f" AND season IN ({', '.join('?' for _ in seasons)})"
+            params.extend(int(season) for season in seasons)
+        if player_ids is not None:
+            query += f" AND player_id IN ({', '.join('?' for _ in player_ids)})"
+            params.extend(player_ids)
+        return self.connection.execute(query + " ORDER BY player_id, season, row", params).fetchall()
+
+    def stat_cells(self, stats, seasons=None):
+        """
+        Reads several stats across the league in one query.
+        :param stats: list of stat columns
+        :param seasons: list of seasons, optional, defaults to all
+        :return: list of (player_id, season, row, stat, num, value)
+        """
+        return self.iter_stat_cells(stats, seasons=seasons).fetchall()
+
+    def iter_stat_cells(self, stats=None, seasons=None):
+        """
+        Same as stat_cells(), as a cursor, so the cells can be streamed instead of fetched all at once.
+        :param stats: list of stat columns, optional, defaults to every stat
+        :return: sqlite3.Cursor of (player_id, season, row, stat, num, value), each player season's stats in column order
+        """
+        conditions = []
+        params = []
+        if stats is not None:
+            conditions.append(f"stat IN ({', '.join('?' for _ in stats)})")
+            params.extend(stats)
+        if seasons is not None:
+            conditions.append(f"season IN ({', '.join('?' for _ in seasons)})")
+            params.extend(int(season) for season in seasons)
+        query = "SELECT player_id, season, row, stat, num, value FROM gamelogs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return self.connection.execute(query + " ORDER BY player_id, season, col, stat, row", params)
+
+    def season_tables(self, stats=None, seasons=None):
+        """
+        Streams gamelogs back one player season at a time, only the season being built is held in memory.
+        :param stats: list of stat columns, optional, defaults to every stat
+        :param seasons: list of seasons, optional, defaults to all
+        :return: generator of (player_id, season, {stat: {row: value}}) ordered by player_id and season. Seasons without
+            any of the stats are left out
+        """
+        for (player_id, season), cells in itertools.groupby(self.iter_stat_cells(stats, seasons), key=lambda cell: cell[:2]):
+            stats_table = {}
+            for _, _, row, stat, _, value in cells:
+                stats_table.setdefault(stat, {})[str(row)] = value
+            yield player_id, season, stats_table
+
+    def player_season_keys(self, seasons=None):
+        """
+        :return: list of every stored (player_id, season), ordered like season_tables()
+        """
+        query = "SELECT DISTINCT player_id, season FROM gamelogs"
+        params = []
+        if seasons is not None:
+            query += f" WHERE season IN ({', '.join('?' for _ in seasons)})"
+            params.extend(int(season) for season in seasons)
+        return self.connection.execute(query + " ORDER BY player_id, season", params).fetchall()
+
+    def rosters(self):
+        """
+        :return: list of dicts with owner_id, display_name, team_name and players, a list of (player_id, player_name, details)
+        """
+        rosters = []
+        for owner_id, display_name, team_name in self.connection.execute(
+                "SELECT owner_id, display_name, team_name FROM rosters ORDER BY sort_order"):
+            players = [(player_id, player_name, json.loads(details)) for player_id, player_name, details in self.connection.execute(
+                "SELECT player_id, player_name, details FROM players WHERE owner_id = ? ORDER BY sort_order", (owner_id,))]
+            rosters.append({"owner_id": owner_id, "display_name": display_name, "team_name": team_name, "players": players})
+        return rosters
+
+    def export_league(self):
+        """
+        Rebuilds the nested league database json object from the store.
+        """
+        league_data = []
+        for roster in self.rosters():
+            players_data = []
+            for player_id, player_name, details in roster['players']:
+                seasons = self.player_seasons(player_id)
+                players_data.append({player_name: [details] + [{key: value} for key, value in seasons.items()]})
+            league_data.append({"owner_id": roster['owner_id'], "display_name": roster['display_name'],
+                                "team_name": roster['team_name'], "players_data": players_data})
+        return league_data
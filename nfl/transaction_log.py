@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+from nfl.constants import TRANSACTIONS_DIRECTORY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id TEXT PRIMARY KEY,
+    league_id TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    type TEXT,
+    status TEXT,
+    created INTEGER,
+    status_updated INTEGER,
+    creator TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_created ON transactions (league_id, created);
+CREATE TABLE IF NOT EXISTS transaction_players (
+    transaction_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    roster_id INTEGER,
+    owner_id TEXT,
+    PRIMARY KEY (transaction_id, player_id, action)
+);
+CREATE INDEX IF NOT EXISTS transaction_players_player ON transaction_players (player_id);
+CREATE INDEX IF NOT EXISTS transaction_players_owner ON transaction_players (owner_id);
+CREATE TABLE IF NOT EXISTS roster_owners (
+    league_id TEXT NOT NULL,
+    roster_id INTEGER NOT NULL,
+    owner_id TEXT,
+    PRIMARY KEY (league_id, roster_id)
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    league_id TEXT PRIMARY KEY,
+    week INTEGER NOT NULL,
+    status_updated INTEGER NOT NULL,
+    transaction_id TEXT
+);
+"""
+
+
+def _name(value):
+    """
+    Sleeper enums -> their name, anything else as is.
+    """
+    return getattr(value, "name", value)
+
+
+def _epoch_ms(value):
+    """
+    :param value: datetime, or epoch milliseconds like Sleeper's timestamps
+    """
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return value
+
+
+class TransactionLog:
+    """
+    SQLite log of a league's Sleeper transactions, one row per transaction plus one row per player added or dropped, so it
+    can be queried by player, owner or date without reading every transaction. Also holds the ingestion cursor.
+    """
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        self.connection = sqlite3.connect(log_file)
+        self.connection.executescript(SCHEMA)
+
+    @staticmethod
+    def for_league(league_id):
+        """
+        :return: TransactionLog of the league under TRANSACTIONS_DIRECTORY
+        """
+        return TransactionLog(os.path.join(TRANSACTIONS_DIRECTORY, f"{league_id}_transactions.sqlite"))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cursor(self, league_id):
+        """
+        :return: tuple, (week, status_updated, transaction_id) of the newest transaction ingested, or None
+        """
+        return self.connection.execute(
+            "SELECT week, status_updated, transaction_id FROM cursors WHERE league_id = ?", (league_id,)).fetchone()
+
+    def roster_owners(self, league_id):
+        """
+        :return: dict, roster_id -> owner_id
+        """
+        return dict(self.connection.execute("SELECT roster_id, owner_id FROM roster_owners WHERE league_id = ?", (league_id,)))
+
+    def set_roster_owners(self, league_id, roster_owners):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO roster_owners VALUES (?, ?, ?)",
+                                        [(league_id, roster_id, owner_id) for roster_id, owner_id in roster_owners.items()])
+
+    def append(self, league_id, week, transactions, roster_owners):
+        """
+        Writes transactions and moves the cursor forward in one commit. A transaction already in the log, like a waiver
+        claim that was processed since, is replaced.
+        :param transactions: list of sleeper Transaction
+        :param roster_owners: dict, roster_id -> owner_id
+        """
+        cursor = self.cursor(league_id)
+        status_updated, transaction_id = (cursor[1], cursor[2]) if cursor else (0, None)
+        cursor_week = max(week, cursor[0]) if cursor else week
+        with self.connection:
+            for transaction in transactions:
+                self.connection.execute("DELETE FROM transaction_players WHERE transaction_id = ?", (transaction.transaction_id,))
+                self.connection.execute("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                    transaction.transaction_id, league_id, week, _name(transaction.type), _name(transaction.status),
+                    transaction.created, transaction.status_updated, transaction.creator,
+                    json.dumps({"roster_ids": transaction.roster_ids, "adds": transaction.adds, "drops": transaction.drops,
+                                "consenter_ids": transaction.consenter_ids}),
+                ))
+                players = [(player_id, "add", roster_id) for player_id, roster_id in (transaction.adds or {}).items()]
+                players += [(player_id, "drop", roster_id) for player_id, roster_id in (transaction.drops or {}).items()]
+                self.connection.executemany("INSERT INTO transaction_players VALUES (?, ?, ?, ?, ?)", [
+                    (transaction.transaction_id, player_id, action, roster_id, roster_owners.get(roster_id))
+                    for player_id, action, roster_id in players
+                ])
+                if (transaction.status_updated or 0) >= status_updated:
+                    status_updated, transaction_id = transaction.status_updated or 0, transaction.transaction_id
+            self.connection.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)", (league_id, cursor_week, status_updated, transaction_id))
+
+    def advance(self, league_id, week):
+        """
+        Moves the cursor to week, so polls stop fetching weeks that are over.
+        """
+        cursor = self.cursor(league_id)
+        if cursor is None or cursor[0] < week:
+            with self.connection:
+                self.connection.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)",
+                                        (league_id, week, cursor[1] if cursor else 0, cursor[2] if cursor else None))
+
+    def _query(self, where, params, include_failed):
+        query = ("SELECT t.transaction_id, t.week, t.type, t.status, t.created, p.player_id, p.action, p.roster_id, p.owner_id "
+                 "FROM transactions t JOIN transaction_players p ON p.transaction_id = t.transaction_id WHERE " + where)
+        if not include_failed:
+            query += " AND t.status = 'COMPLETE'"
+        rows = self.connection.execute(query + " ORDER BY t.created, t.transaction_id, p.action, p.player_id", params)
+        columns = ["transaction_id", "week", "type", "status", "created", "player_id", "action", "roster_id", "owner_id"]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def by_player(self, player_id, include_failed=False):
+        """
+        :return: list of dicts, every add and drop of the player, oldest first
+        """
+        return self._query("p.player_id = ?", (player_id,), include_failed)
+
+    def by_owner(self, owner_id, include_failed=False):
+        """
+        :return: list of dicts, every player the owner added or dropped, oldest first
+        """
+        return self._query("p.owner_id = ?", (owner_id,), include_failed)
+
+    def between(self, start=None, end=None, include_failed=False):
+        """
+        :param start: datetime or epoch milliseconds, optional
+        :param end: datetime or epoch milliseconds, optional, exclusive
+        :return: list of dicts, every add and drop created in the range, oldest first
+        """
+        return self._query("t.created >= ? AND t.created < ?",
+                           (_epoch_ms(start) if start is not None else 0, _epoch_ms(end) if end is not None else 2 ** 62), include_failed)
+
+
+class TransactionIngester:
+    """
+    Pulls a league's new transactions from Sleeper into its TransactionLog. Each poll fetches only the weeks from the
+    cursor's week to the current one, usually a single request, and only writes transactions updated since the cursor.
+    """
+
+    def __init__(self, league, log):
+        """
+        :param league: SleeperLeague
+        :param log: TransactionLog
+        """
+        self.league = league
+        self.log = log
+
+    def poll(self, current_week=None):
+        """
+        :param current_week: int, optional, defaults to Sleeper's current NFL week
+        :return: list of the transactions written
+        """
+        league_id = self.league.league_id
+        current_week = current_week or self.league.get_current_week()
+        cursor = self.log.cursor(league_id)
+        first_week, status_updated = (cursor[0], cursor[1]) if cursor else (1, 0)
+
+        roster_owners = self.log.roster_owners(league_id)
+        written = []
+        for week in range(first_week, max(first_week, current_week) + 1):
+            transactions = [transaction for transaction in self.league.get_transactions(week)
+                            if (transaction.status_updated or 0) > status_updated]
+            if not transactions:
+                continue
+            roster_ids = {roster_id for transaction in transactions for roster_id in transaction.roster_ids or []}
+            if not roster_ids <= roster_owners.keys():
+                # Only rosters we haven't seen before cost a roster fetch.
+                roster_owners = {roster.roster_id: roster.owner_id for roster in self.league.get_league_rosters_by_id()}
+                self.log.set_roster_owners(league_id, roster_owners)
+            self.log.append(league_id, week, transactions, roster_owners)
+            written.extend(transactions)
+        self.log.advance(league_id, current_week)
+        logging.info(f"Ingested {len(written)} transactions for {league_id=} up to week {current_week}")
+        return written
@@ -20,6 +20,16 @@ def is_file_older_than_one_week(file_path):
         return False
 
 
+def current_nfl_season(today=None):
+    """
+    The NFL season runs from September into February of the following year, so a season is only finished once March comes around.
+    :param today: date, optional, defaults to now
+    :return: int, the year of the season currently being played, or the upcoming one during the offseason
+    """
+    today = today or datetime.now()
+    return today.year if today.month >= 3 else today.year - 1
+
+
 def validate_file(file_name):
     if os.path.exists(file_name):
         validated = True
@@ -61,6 +71,39 @@ def delete_file(file):
         logging.info(f"delete_file() Failed to delete file: {e}")
 
 
+def atomic_write_json(file_path, data, **kwargs):
+    """
+    Writes json to a temp file next to file_path, then renames it over file_path, so readers never see a half written file.
+    :param file_path: Path to the json file
+    :param data: json object
+    :param kwargs: passed on to json.dump, e.g. indent=4
+    """
+    temp_file = f"{file_path}.tmp"
+    with open(temp_file, 'w') as file:
+        json.dump(data, file, **kwargs)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, file_path)
+
+
+def rename_unnamed_keys(obj):
+    """
+    Recursively renames the keys that start with "Unnamed" to the last part of the key. PFR exports have unnamed columns that are not useful.
+    :param obj: json object
+    :return: renamed copy of obj
+    """
+    if isinstance(obj, dict):
+        new_obj = {}
+        for key, value in obj.items():
+            new_key = key.split('_')[-1] if isinstance(key, str) and key.startswith("Unnamed") else key
+            new_obj[new_key] = rename_unnamed_keys(value)
+        return new_obj
+    elif isinstance(obj, list):
+        return [rename_unnamed_keys(item) for item in obj]
+    else:
+        return obj
+
+
 def rename_keys_in_json(json_file_path):
     """
     Renames the keys in a json file that start with "Unnamed" to the last part of the key. PFR exports have unnamed columns that are not useful.
@@ -69,18 +112,7 @@ def rename_keys_in_json(json_file_path):
     with open(json_file_path, 'r') as file:
         data = json.load(file)
 
-    def rename_keys(obj):
-        if isinstance(obj, dict):
-            new_obj = {}
-            for key, value in obj.items():
-                new_key = key.split('_')[-1] if key.startswith("Unnamed") else key
-                new_obj[new_key] = rename_keys(value)
-            return new_obj
-        elif isinstance(obj, list):
-            return [rename_keys(item) for item in obj]
-        else:
-            return obj
-    renamed_data = rename_keys(data)
+    renamed_data = rename_unnamed_keys(data)
 
     with open(json_file_path, 'w') as file:
         json.dump(renamed_data, file, indent=4)
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import routes
+from app.render_cache import RenderCache
+from app.snapshot import SnapshotLoader
+from tests.test_app.test_snapshot import LEAGUE_DATA
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used_past_max_bytes(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        self.assertEqual(cache.get("a"), "aaaa")
+        cache.put("c", "cccc")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), ("aaaa", "cccc"))
+        self.assertEqual((len(cache), cache.size), (2, 8))
+
+    def test_replacing_a_key_keeps_the_size(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "aaaa")
+        cache.put("a", "aaaaaa")
+        self.assertEqual((len(cache), cache.size), (1, 6))
+
+    def test_keeps_a_fragment_bigger_than_max_bytes(self):
+        cache = RenderCache(max_bytes=4)
+        cache.put("a", "aa")
+        cache.put("b", "bbbbbbbb")
+        self.assertEqual((cache.get("a"), cache.get("b")), (None, "bbbbbbbb"))
+
+
+class TestPlayerTableCache(unittest.TestCase):
+    """
+    get_player_info() caches each rendered season table under the snapshot's version.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        self.write(LEAGUE_DATA)
+        self.rendered = []
+
+        def render_player_table(stats):
+            self.rendered.append(stats)
+            return json.dumps(stats)
+
+        for patcher in (patch.object(routes, "league_snapshot", SnapshotLoader(self.database_file)),
+                        patch.object(routes, "player_table_cache", RenderCache()),
+                        patch.object(routes, "render_player_table", render_player_table)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, league_data):
+        with open(self.database_file, "w") as file:
+            json.dump(league_data, file)
+
+    def test_tables_are_rendered_once_per_version(self):
+        _, tables = routes.get_player_info("4984")
+        routes.get_player_info("4984")
+        self.assertEqual(len(self.rendered), 2)
+        self.assertEqual(json.loads(tables["2023_stats"]), {"Week": {"0": 1}, "Passing_Yds": {"0": 236}})
+
+        league_data = json.loads(json.dumps(LEAGUE_DATA))
+        league_data[0]["players_data"][0]["Josh Allen"][2]["2023_stats"]["Passing_Yds"]["0"] = 300
+        self.write(league_data)
+        # Same size as before, only the mtime tells the loader to look.
+        stat = os.stat(self.database_file)
+        os.utime(self.database_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        _, tables = routes.get_player_info("4984")
+        self.assertEqual(len(self.rendered), 4)
+        self.assertEqual(json.loads(tables["2023_stats"])["Passing_Yds"], {"0": 300})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import json
+import os
+import re
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import routes
+from app.render_cache import RenderCache
+from app.snapshot import SnapshotLoader
+from nfl.stats_store import LeagueStatsStore
+from tests.test_app.test_snapshot import LEAGUE_DATA
+
+# Columns whose names contain other mapped names, a substring rename would have mangled them.
+GAMELOG = {
+    "Rk": {"0": 1, "1": 2},
+    "Week": {"0": 1.0, "1": 2.0},
+    "G#": {"0": 1.0, "1": "null"},
+    "Passing_Yds": {"0": 297, "1": "Inactive"},
+    "Passing_Yds.1": {"0": 12, "1": "Inactive"},
+    "Passing_Cmp%": {"0": 64.7, "1": "Inactive"},
+    "Passing_Sk": {"0": 2, "1": "Inactive"},
+    "Sk": {"0": 0, "1": "Inactive"},
+    "Passing_Lng": {"0": 48, "1": "Inactive"},
+}
+
+
+class TestRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        league_data = json.loads(json.dumps(LEAGUE_DATA))
+        league_data[0]["players_data"][0]["Josh Allen"][0].update({"number": 17, "team": "BUF", "fantasy_positions": ["QB"]})
+        league_data[0]["players_data"][0]["Josh Allen"].append({"2024_stats": GAMELOG})
+        self.write_database(database_file, league_data)
+        for patcher in (patch.object(routes, "league_snapshot", SnapshotLoader(database_file)),
+                        patch.object(routes, "player_table_cache", RenderCache())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = routes.app.test_client()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_database(self, database_file, league_data):
+        with open(database_file, "w") as file:
+            json.dump(league_data, file)
+
+    def get(self, path):
+        # player_info prints the whole player.
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.get(path)
+
+    def test_team(self):
+        response = self.get("/team/1")
+        self.assertEqual(response.status_code, 200)
+        page = response.get_data(as_text=True)
+        self.assertIn("<h1>Team One</h1>", page)
+        self.assertIn("Owner: owner_one", page)
+        self.assertEqual(re.findall(r'href="(/player/\d+)"', page), ["/player/4984", "/player/2449"])
+
+    def test_player(self):
+        response = self.get("/player/4984")
+        self.assertEqual(response.status_code, 200)
+        page = response.get_data(as_text=True)
+        self.assertIn("Josh Allen #17", page)
+        self.assertIn("Rostered by: Team One", page)
+        self.assertEqual(re.findall(r'href="#collapse(\w+)"', page), ["2022_stats", "2023_stats", "2024_stats"])
+        self.assertEqual(re.findall(r'href="(/\w+/\d+)"', page), ["/team/1", "/player/4984"])
+
+    def test_unknown_ids_404(self):
+        for path in ("/team/99", "/player/99", "/team/owner_one", "/player/AlleJo02"):
+            self.assertEqual(self.get(path).status_code, 404, path)
+
+    def test_columns_are_renamed_by_exact_match(self):
+        page = self.get("/player/4984").get_data(as_text=True)
+        table = page[page.index('id="collapse2024_stats"'):]
+        table = table[:table.index("</table>")]
+        self.assertEqual(re.findall(r"<th>(.*?)</th>", table), [
+            "Week", "Game", "Passing Yards", "Yards Lost to Sacks", "Pass Completion %", "Sacked", "Sacks", "Passing_Lng",
+        ])
+        # G# and Week are cast to int, "null" cells are blank.
+        self.assertIn("<td>1</td>\n      <td>1</td>\n      <td>297</td>", table)
+        self.assertIn("<td>2</td>\n      <td></td>\n      <td>Inactive</td>", table)
+
+
+class TestRoutesFromStatsStore(TestRoutes):
+    """
+    The same pages served from the league's stats store, with no json database next to it.
+    """
+
+    def write_database(self, database_file, league_data):
+        with LeagueStatsStore.for_database(database_file) as store:
+            store.import_league(league_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
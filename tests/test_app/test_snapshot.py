@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app.snapshot import SnapshotLoader, StoreSnapshot
+from nfl.stats_store import LeagueStatsStore
+
+LEAGUE_DATA = [
+    {
+        "owner_id": "1",
+        "display_name": "owner_one",
+        "team_name": "Team One",
+        "players_data": [
+            {"Josh Allen": [
+                {"player_id": "4984", "position": "QB"},
+                {"2022_stats": {"Week": {"0": 1, "1": 2}, "Passing_Yds": {"0": 297, "1": "Inactive"}}},
+                {"2023_stats": {"Week": {"0": 1}, "Passing_Yds": {"0": 236}}},
+            ]},
+            {"Stefon Diggs": [{"player_id": "2449", "position": "WR"}]},
+        ],
+    },
+    {
+        "owner_id": "2",
+        "display_name": "owner_two",
+        "team_name": "Team Two",
+        "players_data": [
+            {"T.J. Watt": [
+                {"player_id": "3161", "position": "LB"},
+                {"2023_stats": {"Week": {"0": 1}, "Sk": {"0": 3.0}, "Def. Snaps_Pct": {"0": "85%"}}},
+            ]},
+        ],
+    },
+]
+
+
+class TestSnapshotLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        self.write(LEAGUE_DATA)
+        self.loader = SnapshotLoader(self.database_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, league_data, mtime_ns=None):
+        with open(self.database_file, "w") as file:
+            json.dump(league_data, file)
+        if mtime_ns is not None:
+            os.utime(self.database_file, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_file_serves_the_same_snapshot(self):
+        self.assertIs(self.loader.get(), self.loader.get())
+
+    def test_new_content_is_reloaded(self):
+        snapshot = self.loader.get()
+        league_data = json.loads(json.dumps(LEAGUE_DATA))
+        league_data[1]["team_name"] = "Team Renamed"
+        self.write(league_data, mtime_ns=os.stat(self.database_file).st_mtime_ns + 10 ** 9)
+
+        reloaded = self.loader.get()
+        self.assertIsNot(reloaded, snapshot)
+        self.assertNotEqual(reloaded.version, snapshot.version)
+        self.assertEqual(reloaded.teams["2"]["team"]["team_name"], "Team Renamed")
+        self.assertEqual(snapshot.teams["2"]["team"]["team_name"], "Team Two")
+
+    def test_touched_file_with_the_same_content_keeps_the_snapshot(self):
+        snapshot = self.loader.get()
+        self.write(LEAGUE_DATA, mtime_ns=os.stat(self.database_file).st_mtime_ns + 10 ** 9)
+        self.assertIs(self.loader.get(), snapshot)
+
+    def test_players_index(self):
+        players = self.loader.get().players
+        self.assertEqual(set(players), {"4984", "2449", "3161"})
+        self.assertEqual(players["4984"], {
+            "owner": "Team One",
+            "owner_id": "1",
+            "player_name": "Josh Allen",
+            "details": {"player_id": "4984", "position": "QB"},
+            "seasons": LEAGUE_DATA[0]["players_data"][0]["Josh Allen"][1:],
+        })
+        self.assertEqual(players["2449"]["seasons"], [])
+
+    def test_teams_index(self):
+        teams = self.loader.get().teams
+        self.assertEqual(list(teams), ["1", "2"])
+        self.assertEqual(teams["1"]["team"]["display_name"], "owner_one")
+        self.assertEqual(teams["1"]["roster"], [
+            {"player_name": "Josh Allen", "position": "QB", "player_id": "4984"},
+            {"player_name": "Stefon Diggs", "position": "WR", "player_id": "2449"},
+        ])
+
+    def test_indexes_are_read_only(self):
+        snapshot = self.loader.get()
+        with self.assertRaises(TypeError):
+            snapshot.players["4984"] = {}
+        with self.assertRaises(TypeError):
+            del snapshot.teams["1"]
+
+    def test_serves_the_stats_store_when_there_is_one(self):
+        snapshot = self.loader.get()
+        store_file = LeagueStatsStore.store_file_for(self.database_file)
+        with LeagueStatsStore(store_file) as store:
+            store.import_league(LEAGUE_DATA)
+
+        from_store = self.loader.get()
+        self.assertIsInstance(from_store, StoreSnapshot)
+        self.assertEqual(list(from_store.teams), list(snapshot.teams))
+        self.assertEqual(from_store.teams["1"]["roster"], snapshot.teams["1"]["roster"])
+        for player_id in snapshot.players:
+            self.assertEqual(from_store.player_seasons(player_id), snapshot.player_seasons(player_id), player_id)
+        self.assertIs(self.loader.get(), from_store)
+
+        with LeagueStatsStore(store_file) as store:
+            store.upsert_seasons([("2449", 2023, {"Week": {"0": 1}})])
+        os.utime(store_file, ns=(os.stat(store_file).st_mtime_ns + 10 ** 9,) * 2)
+        reloaded = self.loader.get()
+        self.assertNotEqual(reloaded.version, from_store.version)
+        self.assertEqual(reloaded.player_seasons("2449"), [{"2023_stats": {"Week": {"0": 1}}}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from nfl import clustering
+
+
+class TestClustering(unittest.TestCase):
+
+    def test_ward_clusters_are_numbered_like_cutree(self):
+        features = np.array([[100.0, 1.0], [0.0, 0.0], [101.0, 1.0], [1.0, 0.0], [50.0, 0.5]])
+        self.assertEqual(clustering.ward_clusters(features, 3).tolist(), [1, 2, 1, 2, 3])
+
+    def test_distances_scale_up_missing_columns(self):
+        distances = clustering._distances(np.array([[0.0, 0.0], [3.0, np.nan]]))
+        self.assertAlmostEqual(distances[0, 1], np.sqrt(9 * 2))
+
+    def test_summarize_position(self):
+        games = pd.DataFrame({
+            'sleeper_player_id': ["2", "2", "1"],
+            'player_name': ["B", "B", "A"],
+            'display_name': ["owner", "owner", "owner"],
+            'team_name': ["Team", "Team", "Team"],
+            'position': ["LB DL", "LB DL", "DE"],
+            'height': [75.0, 75.0, 76.0],
+            'weight': [250.0, 250.0, 270.0],
+            'Def. Snaps_Num': [40.0, 60.0, 30.0],
+            'Def. Snaps_Pct': [50.0, 70.0, np.nan],
+            'fantasy_points': [10.0, 5.0, 8.0],
+            'Sk': [1.0, 0.0, 2.0],
+        })
+        group = clustering.PositionGroup("DL", clustering.DEFENSE_SUMMARY[:7], ('Def. Snaps_Pct',), 2, {}, ("DL", "DE", "LB DL"))
+        summary = clustering.summarize_position(games, group)
+        self.assertEqual(summary['ID'].tolist(), ["1", "2"])
+        self.assertEqual(summary['totalSnaps'].tolist(), [30.0, 100.0])
+        self.assertEqual(summary['avgSapsPct'].round(2).fillna(-1).tolist(), [-1, 0.6])
+        self.assertEqual(summary['totalSacks'].tolist(), [2.0, 1.0])
+
+    def test_plot_position_writes_an_svg(self):
+        clusters = pd.DataFrame({
+            'playerName': ["A", "B", "C"],
+            'avgSnaps': [30.0, 50.0, np.nan],
+            'totalFP': [8.0, 15.0, 2.0],
+            'cluster': [1, 2, 1],
+            'index': [1, 2, 1],
+        })
+        with tempfile.TemporaryDirectory() as directory:
+            svg_file = os.path.join(directory, "DL_Cluster.svg")
+            clustering.plot_position(clusters, "DL Cluster Analysis", svg_file)
+            with open(svg_file) as file:
+                svg = file.read()
+        self.assertIn("<svg", svg)
+        self.assertIn("DL Cluster Analysis", svg)
+
+
+if __name__ == '__main__':
+    unittest.main()
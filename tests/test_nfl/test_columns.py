@@ -0,0 +1,26 @@
+import unittest
+
+from nfl.columns import canonical_column_name, canonical_column_names
+from nfl.utils import rename_unnamed_keys
+
+
+class TestCanonicalColumnNames(unittest.TestCase):
+
+    def test_flattens_pfr_headers(self):
+        self.assertEqual(canonical_column_name(("Passing", "Yds")), "Passing_Yds")
+        self.assertEqual(canonical_column_name(("Passing", "Yds.1")), "Passing_Yds.1")
+        self.assertEqual(canonical_column_name(("Unnamed: 0_level_0", "Rk")), "Rk")
+        self.assertEqual(canonical_column_name(("Unnamed: 6_level_0", "Unnamed: 6_level_1")), "1")
+        self.assertEqual(canonical_column_name("Sk"), "Sk")
+
+    def test_matches_the_old_unnamed_cleanup(self):
+        columns = [
+            ("Unnamed: 0_level_0", "Rk"), ("Unnamed: 1_level_0", "Week"), ("Unnamed: 6_level_0", "Unnamed: 6_level_1"),
+            ("Rushing", "Yds"), ("Off. Snaps", "Pct"), ("Unnamed: 30_level_0", "Sk"),
+        ]
+        flattened = {'_'.join(map(str, column)).strip(): None for column in columns}
+        self.assertEqual(canonical_column_names(columns), list(rename_unnamed_keys(flattened)))
+
+
+if __name__ == '__main__':
+    unittest.main()
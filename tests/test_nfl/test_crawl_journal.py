@@ -0,0 +1,98 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from nfl.crawl_journal import CrawlJournal
+from nfl.nfl_stats import Stats
+from nfl.utils import atomic_write_json
+
+STATS = {"2023_stats": {"Week": {"0": 1}, "Passing_Yds": {"0": 236}}}
+
+
+class TestCrawlJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal_file = os.path.join(self.temp_dir.name, "leagueid_1_crawl_journal.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resumes_finished_units(self):
+        journal = CrawlJournal(self.journal_file)
+        journal.record("AlleJo02", 2023, STATS)
+        journal.record("AlleJo02", "2017", None)
+
+        resumed = CrawlJournal(self.journal_file)
+        self.assertEqual(len(resumed), 2)
+        self.assertEqual(resumed.get("AlleJo02", "2023"), (True, STATS))
+        self.assertEqual(resumed.get("AlleJo02", 2017), (True, None))
+        self.assertEqual(resumed.get("AlleJo02", 2022), (False, None))
+
+    def test_skips_partial_and_expired_lines(self):
+        CrawlJournal(self.journal_file).record("AlleJo02", 2023, STATS)
+        with open(self.journal_file, "a") as file:
+            file.write('{"pfr_id": "WattTJ00", "ye')
+        self.assertEqual(len(CrawlJournal(self.journal_file)), 1)
+
+        time.sleep(0.01)
+        self.assertEqual(len(CrawlJournal(self.journal_file, max_age=0)), 0)
+
+    def test_clear_removes_journal(self):
+        journal = CrawlJournal(self.journal_file)
+        journal.record("AlleJo02", 2023, STATS)
+        journal.clear()
+        self.assertFalse(os.path.exists(self.journal_file))
+        self.assertEqual(len(CrawlJournal(self.journal_file)), 0)
+
+    def test_atomic_write_json_replaces_file(self):
+        database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        atomic_write_json(database_file, [1])
+        atomic_write_json(database_file, [1, 2], indent=4)
+        with open(database_file) as file:
+            self.assertEqual(file.read(), "[\n    1,\n    2\n]")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["leagueid_1.json"])
+
+    def test_interrupted_crawl_resumes_from_the_journal(self):
+        fetched = []
+
+        def gamelogs_data(stats):
+            fetched.append(stats.year)
+            return pd.DataFrame({"Week": [1], "Passing_Yds": [stats.year]})
+
+        def interrupt(stats):
+            raise KeyboardInterrupt
+
+        seasons = [str(year) for year in range(2014, 2024)]
+        with patch.object(Stats, "gamelogs_data", gamelogs_data):
+            crawler = Stats.gamelog_crawler(CrawlJournal(self.journal_file))
+            crawler.max_workers = 1
+            crawler.submit("AlleJo02", seasons[0], lambda stats: None)
+            crawler.submit("AlleJo02", seasons[1], interrupt)
+            for year in seasons[2:]:
+                crawler.submit("AlleJo02", year, lambda stats: None)
+            with self.assertRaises(KeyboardInterrupt):
+                crawler.run()
+            time.sleep(0.1)
+            first_run = len(fetched)
+            self.assertLess(first_run, len(seasons))
+
+            merged = {}
+            crawler = Stats.gamelog_crawler(CrawlJournal(self.journal_file))
+            for year in seasons:
+                crawler.submit("AlleJo02", year, merged.update)
+            crawler.run()
+
+        # Every season was fetched exactly once across both runs, the journal's seasons weren't fetched again.
+        self.assertEqual(sorted(fetched), list(range(2014, 2024)))
+        self.assertEqual(sorted(merged), [f"{year}_stats" for year in seasons])
+        # 2014 came back from the journal, its row keys went through json.
+        self.assertEqual(merged["2014_stats"]["Passing_Yds"], {"0": 2014})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+import unittest
+
+from nfl.crawler import TokenBucket, HostRateLimiter, Crawler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_acquire_waits_for_refill_when_empty(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.5, capacity=1, clock=clock, sleep=clock.sleep)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 2.0)
+        self.assertAlmostEqual(clock.now, 2.0)
+
+    def test_tokens_do_not_exceed_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+        clock.now = 100
+        bucket.acquire()
+        bucket.acquire()
+        self.assertAlmostEqual(bucket.acquire(), 1.0)
+
+    def test_pause_holds_tokens_then_releases_one(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+        bucket.pause(30)
+        self.assertAlmostEqual(bucket.try_acquire(), 30.0)
+        # A shorter pause doesn't cut the one in effect short.
+        bucket.pause(1)
+        self.assertAlmostEqual(bucket.acquire(), 30.0)
+        self.assertAlmostEqual(clock.now, 30.0)
+        self.assertAlmostEqual(bucket.acquire(), 0.1)
+
+
+class TestHostRateLimiter(unittest.TestCase):
+
+    def test_one_bucket_per_host(self):
+        limiter = HostRateLimiter(requests_per_minute=60)
+        a = limiter.bucket("https://www.pro-football-reference.com/players/A/AlleJo03.htm")
+        b = limiter.bucket("https://www.pro-football-reference.com/players/W/WardCh00.htm")
+        c = limiter.bucket("https://api.sleeper.app/v1/players/nfl")
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertEqual(a.rate, 1)
+
+
+class TestCrawler(unittest.TestCase):
+
+    def test_callbacks_run_in_submission_order(self):
+        def fetch(pfr_player_id, year):
+            time.sleep(random.random() / 100)
+            return f"{pfr_player_id}_{year}"
+
+        crawler = Crawler(fetch=fetch, max_workers=4)
+        merged = []
+        for pfr_player_id in ["AlleJo03", "WardCh00"]:
+            for year in ["2021", "2022", "2023"]:
+                crawler.submit(pfr_player_id, year, merged.append)
+            crawler.then(lambda pfr_player_id=pfr_player_id: merged.append(f"{pfr_player_id}_done"))
+        self.assertEqual(len(crawler), 6)
+        crawler.run()
+        self.assertEqual(merged, ["AlleJo03_2021", "AlleJo03_2022", "AlleJo03_2023", "AlleJo03_done",
+                                  "WardCh00_2021", "WardCh00_2022", "WardCh00_2023", "WardCh00_done"])
+        self.assertEqual(len(crawler), 0)
+
+    def test_jobs_run_concurrently_and_duplicates_fetch_once(self):
+        calls = []
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fetch(pfr_player_id, year):
+            calls.append((pfr_player_id, year))
+            barrier.wait()
+            return year
+
+        crawler = Crawler(fetch=fetch, max_workers=2)
+        results = []
+        crawler.submit("AlleJo03", "2022", results.append)
+        crawler.submit("AlleJo03", "2023", results.append)
+        crawler.submit("AlleJo03", "2023", results.append)
+        crawler.run()
+        self.assertEqual(sorted(calls), [("AlleJo03", "2022"), ("AlleJo03", "2023")])
+        self.assertEqual(results, ["2022", "2023", "2023"])
+
+    def test_failed_job_is_skipped_and_later_callbacks_still_run(self):
+        def fetch(pfr_player_id, year):
+            if year == "2022":
+                raise RuntimeError("429 after retries")
+            return year
+
+        crawler = Crawler(fetch=fetch, max_workers=2)
+        results = []
+        for year in ["2021", "2022", "2023"]:
+            crawler.submit("AlleJo03", year, results.append)
+        crawler.then(lambda: results.append("done"))
+        failed = crawler.run()
+        self.assertEqual(failed, [("AlleJo03", "2022")])
+        self.assertEqual(results, ["2021", "2023", "done"])
+
+    def test_interrupt_cancels_queued_jobs(self):
+        calls = []
+
+        def fetch(pfr_player_id, year):
+            calls.append(year)
+            time.sleep(0.05)
+            return year
+
+        def interrupt(result):
+            raise KeyboardInterrupt
+
+        crawler = Crawler(fetch=fetch, max_workers=1)
+        crawler.submit("AlleJo03", "2010", interrupt)
+        for year in range(2011, 2021):
+            crawler.submit("AlleJo03", str(year), lambda result: None)
+        started = time.monotonic()
+        with self.assertRaises(KeyboardInterrupt):
+            crawler.run()
+        self.assertLess(time.monotonic() - started, 0.4)
+        time.sleep(0.1)
+        # The job that was running when the interrupt came finishes, nothing after it starts.
+        self.assertLessEqual(len(calls), 2)
+        self.assertEqual(len(crawler), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import pyarrow.parquet as pq
+
+from nfl.exporter import GamelogExporter, PLAYER_COLUMNS
+from nfl.stats_store import LeagueStatsStore
+
+LEAGUE_DATA = [
+    {
+        "owner_id": "1",
+        "display_name": "owner_one",
+        "team_name": "Team One",
+        "players_data": [
+            {"Josh Allen": [
+                {"player_id": "4984", "fantasy_positions": ["QB"], "height": "77", "weight": "237"},
+                {"2022_stats": {"Week": {"0": 1, "1": 2}, "Passing_Yds": {"0": 297, "1": "Inactive"}}},
+                {"2023_stats": {"Week": {"0": 1}, "Rushing_Yds": {"0": 12}}},
+            ]},
+        ],
+    },
+]
+
+
+class TestGamelogExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unions_stat_columns_across_seasons(self):
+        exporter = GamelogExporter(LEAGUE_DATA)
+        self.assertEqual(exporter.columns(), PLAYER_COLUMNS + ["Week", "Passing_Yds", "Rushing_Yds"])
+        self.assertEqual(exporter.schema()[1], {"Week", "Rushing_Yds"})
+        player = ["Josh Allen", "owner_one", "Team One", "QB", "4984", "77", "237"]
+        self.assertEqual(list(exporter.rows()), [
+            player + [2022, 1, 297, None],
+            player + [2022, 2, "Inactive", None],
+            player + [2023, 1, None, 12],
+        ])
+
+    def test_filters_seasons(self):
+        rows = list(GamelogExporter(LEAGUE_DATA, seasons=["2023"]).rows())
+        self.assertEqual([row[PLAYER_COLUMNS.index("season")] for row in rows], [2023])
+
+    def test_streams_from_the_stats_store(self):
+        # Only the store exists, the json database is never read.
+        json_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        # Diggs sorts before Allen by player_id, but comes after him on the rosters.
+        league_data = LEAGUE_DATA + [{"owner_id": "2", "display_name": "owner_two", "team_name": "Team Two", "players_data": [
+            {"Stefon Diggs": [{"player_id": "2449", "fantasy_positions": ["WR"]}, {"2023_stats": {"Week": {"0": 1}, "Receiving_Yds": {"0": 148}}}]},
+        ]}]
+        with LeagueStatsStore.for_database(json_file) as store:
+            store.import_league(league_data)
+
+        exporter = GamelogExporter.from_file(json_file)
+        self.assertEqual(exporter.columns(), PLAYER_COLUMNS + ["Week", "Passing_Yds", "Rushing_Yds", "Receiving_Yds"])
+        self.assertEqual(exporter.schema()[1], {"Week", "Rushing_Yds", "Receiving_Yds"})
+        from_json = GamelogExporter(league_data)
+        self.assertEqual(list(exporter.rows()), list(from_json.rows()))
+        self.assertEqual([row[PLAYER_COLUMNS.index("season")] for row in GamelogExporter.from_file(json_file, seasons=[2023]).rows()], [2023, 2023])
+
+    def test_to_csv(self):
+        output_file = os.path.join(self.temp_dir.name, "league.csv")
+        self.assertEqual(GamelogExporter(LEAGUE_DATA).to_csv(output_file), 3)
+        with open(output_file, newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([(row["season"], row["Passing_Yds"], row["Rushing_Yds"]) for row in rows],
+                         [("2022", "297", ""), ("2022", "Inactive", ""), ("2023", "", "12")])
+
+    def test_to_parquet(self):
+        output_file = os.path.join(self.temp_dir.name, "league.parquet")
+        self.assertEqual(GamelogExporter(LEAGUE_DATA).to_parquet(output_file, batch_rows=2), 3)
+        table = pq.read_table(output_file)
+        self.assertEqual(table.column("Rushing_Yds").to_pylist(), [None, None, 12.0])
+        self.assertEqual(table.column("Passing_Yds").to_pylist(), ["297", "Inactive", None])
+
+
+if __name__ == '__main__':
+    unittest.main()
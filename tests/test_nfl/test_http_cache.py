@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+import zlib
+from unittest.mock import patch
+
+from nfl.http_cache import ResponseCache, OfflineCacheMiss, pfr_ttl, CURRENT_SEASON_TTL, PLAYER_PAGE_TTL
+
+GAMELOG_URL = "https://www.pro-football-reference.com/players/A/AlleJo03/gamelog/{year}/"
+PLAYER_URL = "https://www.pro-football-reference.com/players/A/AlleJo03.htm"
+
+
+class TestPfrTtl(unittest.TestCase):
+
+    @patch("nfl.http_cache.current_nfl_season", return_value=2024)
+    def test_past_seasons_never_expire(self, mock_season):
+        self.assertIsNone(pfr_ttl(GAMELOG_URL.format(year=2023)))
+
+    @patch("nfl.http_cache.current_nfl_season", return_value=2024)
+    def test_current_season_expires(self, mock_season):
+        self.assertEqual(pfr_ttl(GAMELOG_URL.format(year=2024)), CURRENT_SEASON_TTL)
+
+    def test_player_page_expires(self):
+        self.assertEqual(pfr_ttl(PLAYER_URL), PLAYER_PAGE_TTL)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_then_get_round_trips_across_instances(self):
+        ResponseCache(self.directory).put(PLAYER_URL, "<table></table>")
+        self.assertEqual(ResponseCache(self.directory).get(PLAYER_URL), "<table></table>")
+
+    def test_get_returns_none_when_missing(self):
+        self.assertIsNone(ResponseCache(self.directory).get(PLAYER_URL))
+
+    @patch("nfl.http_cache.time.time")
+    def test_expired_entries_are_not_returned(self, mock_time):
+        cache = ResponseCache(self.directory, ttl_policy=lambda url: 10)
+        mock_time.return_value = 1000
+        cache.put(PLAYER_URL, "body")
+        mock_time.return_value = 1009
+        self.assertEqual(cache.get(PLAYER_URL), "body")
+        mock_time.return_value = 1011
+        self.assertIsNone(cache.get(PLAYER_URL))
+
+    @patch("nfl.http_cache.current_nfl_season")
+    @patch("nfl.http_cache.time.time")
+    def test_current_season_page_expires_after_the_season_ends(self, mock_time, mock_season):
+        cache = ResponseCache(self.directory)
+        url = GAMELOG_URL.format(year=2024)
+        mock_season.return_value = 2024
+        mock_time.return_value = 1000
+        cache.put(url, "in season")
+        # March comes around, 2024 is a past season now but the page was fetched before it ended.
+        mock_season.return_value = 2025
+        mock_time.return_value = 1000 + CURRENT_SEASON_TTL + 1
+        self.assertIsNone(cache.get(url))
+        cache.put(url, "final")
+        mock_time.return_value = 1000 + 100 * CURRENT_SEASON_TTL
+        self.assertEqual(cache.get(url), "final")
+
+    def test_entries_without_an_expiry_are_fetched_again(self):
+        cache = ResponseCache(self.directory)
+        cache.put(PLAYER_URL, "body")
+        del cache._index[cache.key(PLAYER_URL)]["expires_at"]
+        self.assertIsNone(cache.get(PLAYER_URL))
+
+    def test_offline_mode_raises_on_miss(self):
+        cache = ResponseCache(self.directory, offline=True)
+        with self.assertRaises(OfflineCacheMiss):
+            cache.get(PLAYER_URL)
+
+    @patch("nfl.http_cache.time.time")
+    def test_least_recently_used_entries_are_evicted(self, mock_time):
+        body = os.urandom(600).hex()
+        cache = ResponseCache(self.directory, max_bytes=len(zlib.compress(body.encode())) * 2)
+        for i, year in enumerate([2020, 2021, 2022]):
+            mock_time.return_value = 1000 + i
+            if year == 2022:
+                cache.get(GAMELOG_URL.format(year=2020))
+            cache.put(GAMELOG_URL.format(year=year), body)
+        self.assertIsNotNone(cache.get(GAMELOG_URL.format(year=2020)))
+        self.assertIsNone(cache.get(GAMELOG_URL.format(year=2021)))
+        self.assertIsNotNone(cache.get(GAMELOG_URL.format(year=2022)))
+
+
+if __name__ == '__main__':
+    unittest.main()
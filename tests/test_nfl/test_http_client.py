@@ -0,0 +1,76 @@
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from requests.exceptions import HTTPError
+
+from nfl.crawler import HostRateLimiter
+from nfl.http_cache import ResponseCache
+from nfl.http_client import HTTPClient, parse_retry_after
+from nfl.pfr_standin import PFRStandin
+
+PLAYER_PATH = "/players/A/AlleJo02.htm"
+
+
+class TestHTTPClient(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.limiter = HostRateLimiter(requests_per_minute=60000, burst=100)
+        self.client = HTTPClient(max_retries=2, backoff_base=0.01, limiter=self.limiter, cache=ResponseCache(self.temp_dir.name))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("12"), 12.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_retry_after_pauses_the_host_for_every_worker(self):
+        with PFRStandin(burst_every=1, burst_length=1, retry_after=1) as standin:
+            url = f"{standin.url}{PLAYER_PATH}"
+            self.client.get(url)
+            # The worker itself doesn't sleep, only the paused limiter can hold the retry back.
+            with patch.object(HTTPClient, "backoff", return_value=0.0):
+                started = time.monotonic()
+                self.client.get(url)
+                elapsed = time.monotonic() - started
+            counters = standin.counters()
+        self.assertGreaterEqual(elapsed, 0.9)
+        self.assertEqual(counters["statuses"], {200: 2, 429: 1})
+        self.assertEqual(self.client.counters()["retries"], 1)
+
+    def test_5xx_backs_off_and_retries(self):
+        with PFRStandin(burst_every=1, burst_length=2, burst_status=503, retry_after=None) as standin:
+            url = f"{standin.url}{PLAYER_PATH}"
+            self.client.get(url)
+            self.assertEqual(self.client.get(url).status_code, 200)
+            counters = standin.counters()
+        self.assertEqual(counters["statuses"], {200: 2, 503: 2})
+        self.assertEqual(self.client.counters()["retries"], 2)
+        self.assertGreater(self.client.counters()["backoff_seconds"], 0)
+
+    def test_gives_up_after_max_retries(self):
+        with PFRStandin(burst_every=1, burst_length=100, burst_status=503, retry_after=0) as standin:
+            url = f"{standin.url}{PLAYER_PATH}"
+            self.client.get(url)
+            with self.assertRaises(HTTPError) as raised:
+                self.client.get(url)
+            counters = standin.counters()
+        self.assertEqual(raised.exception.response.status_code, 503)
+        self.assertEqual(counters["statuses"], {200: 1, 503: 3})
+
+    def test_404_is_not_retried(self):
+        with PFRStandin(players={}) as standin:
+            with self.assertRaises(HTTPError) as raised:
+                self.client.get(f"{standin.url}{PLAYER_PATH}")
+            counters = standin.counters()
+        self.assertEqual(raised.exception.response.status_code, 404)
+        self.assertEqual(counters["requests"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
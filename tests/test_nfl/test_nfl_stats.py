@@ -0,0 +1,178 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from requests import Response
+from requests.exceptions import HTTPError
+
+from nfl.crawler import Crawler
+from nfl.nfl_stats import PlayerProfile, Stats
+from nfl.pfr_id_overrides import PFRIdOverrides
+from nfl.player_id_index import PlayerIdIndex
+
+PLAYER_ID = "11632"
+
+
+def http_error(status_code):
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(f"{status_code} error", response=response)
+
+
+class TestGuessPfrId(unittest.TestCase):
+    """
+    fetch_game_log_data() guesses the PFR ID of players the ID table doesn't have, checking each guess's birth date.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.overrides = PFRIdOverrides(os.path.join(self.temp_dir.name, "pfr_id_overrides.json"))
+        self.player_id_index = PlayerIdIndex({PLAYER_ID: (None, None, None, "Malik Nabers")})
+        self.owner_data = {"owner_id": "1", "display_name": "owner", "team_name": "Team", "players_data": []}
+        self.fetched_seasons = []
+        patches = [
+            patch("nfl.nfl_stats.pfr_id_overrides", self.overrides),
+            patch.object(Stats, "get_years_of_service", lambda stats: ["2024"]),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def guess(self, birth_date, birthdays):
+        """
+        :param birthdays: dict, guessed PFR ID -> birth date on its page, or an exception the probe raises. IDs not in it have no page
+        """
+        def check_players_birthday(stats):
+            birthday = birthdays.get(stats.pfr_player_id)
+            if isinstance(birthday, Exception):
+                raise birthday
+            return birthday
+
+        player_data = {PLAYER_ID: {"player_id": PLAYER_ID, "first_name": "Malik", "last_name": "Nabers", "birth_date": birth_date}}
+        crawler = Crawler(fetch=lambda pfr_player_id, year: self.fetched_seasons.append((pfr_player_id, year)))
+        with patch.object(Stats, "check_players_birthday", check_players_birthday):
+            Stats.fetch_game_log_data(self.owner_data, player_data, PLAYER_ID, self.player_id_index, crawler=crawler)
+        crawler.run()
+
+    def test_matching_birthday_is_remembered(self):
+        self.guess("2003-07-28", {"NabeMa00": "1990-01-01", "NabeMa01": "2003-07-28"})
+        self.assertEqual(self.overrides.lookup(PLAYER_ID), (True, "NabeMa01"))
+        self.assertEqual(self.fetched_seasons, [("NabeMa01", "2024")])
+
+    def test_no_match_is_remembered_as_a_miss(self):
+        self.guess("2003-07-28", {"NabeMa00": "1990-01-01"})
+        self.assertEqual(self.overrides.lookup(PLAYER_ID), (True, None))
+        self.assertEqual(self.fetched_seasons, [])
+
+    def test_failed_probe_is_not_remembered_as_a_miss(self):
+        self.guess("2003-07-28", {"NabeMa00": "1990-01-01", "NabeMa01": http_error(429), "NabeMa02": ConnectionError()})
+        self.assertEqual(self.overrides.lookup(PLAYER_ID), (False, None))
+        self.assertEqual(self.fetched_seasons, [])
+
+    def test_missing_birth_date_never_matches_a_missing_page(self):
+        self.guess(None, {})
+        known, pfr_id = self.overrides.lookup(PLAYER_ID)
+        self.assertIsNone(pfr_id)
+        self.assertEqual(self.fetched_seasons, [])
+
+
+class TestFetchGameLogData(unittest.TestCase):
+
+    def test_only_seasons_with_gamelogs_count_as_fetched(self):
+        def fetch(pfr_player_id, year):
+            if year == "2022":
+                raise http_error(429)
+            return {f"{year}_stats": {"Week": {"0": 1}}} if year == "2023" else None
+
+        player_id_index = PlayerIdIndex({"4984": ("AlleJo02", None, None, "Josh Allen")})
+        player_data = {"4984": {"player_id": "4984", "first_name": "Josh", "last_name": "Allen"}}
+        owner_data = {"owner_id": "1", "display_name": "owner", "team_name": "Team", "players_data": []}
+        crawler = Crawler(fetch=fetch)
+        fetched = set()
+        Stats.fetch_game_log_data(owner_data, player_data, "4984", player_id_index, update_years=["2022", "2023", "2024"],
+                                  crawler=crawler, fetched=fetched)
+        crawler.run()
+        self.assertEqual(fetched, {("4984", "2023")})
+        self.assertEqual(owner_data["players_data"][0]["Josh Allen"], [player_data["4984"], {"2023_stats": {"Week": {"0": 1}}}])
+
+
+def profile_page(name):
+    return f'<h1>{name}</h1><p><strong>Position</strong>: QB</p><span data-birth="1996-05-21"></span>'
+
+
+class TestPlayerProfile(unittest.TestCase):
+
+    def setUp(self):
+        PlayerProfile.clear()
+        self.addCleanup(PlayerProfile.clear)
+
+    def test_different_players_are_fetched_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_page(url):
+            # Both fetches have to be in flight at once to get past the barrier.
+            barrier.wait()
+            return profile_page(url)
+
+        profiles = []
+        with patch.object(Stats, "get_page", get_page):
+            threads = [threading.Thread(target=lambda pfr_id=pfr_id: profiles.append(PlayerProfile.fetch(pfr_id)))
+                       for pfr_id in ("AlleJo02", "WardCh00")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len([profile for profile in profiles if profile is not None]), 2)
+
+    def test_same_player_is_fetched_once(self):
+        urls = []
+
+        def get_page(url):
+            urls.append(url)
+            return profile_page("Josh Allen")
+
+        with patch.object(Stats, "get_page", get_page):
+            threads = [threading.Thread(target=PlayerProfile.fetch, args=("AlleJo02",)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            profile = PlayerProfile.fetch("AlleJo02")
+        self.assertEqual(len(urls), 1)
+        self.assertEqual((profile.name, profile.position, profile.birth_date), ("Josh Allen", "QB", "1996-05-21"))
+
+    def test_errors_are_not_memoized_but_404s_are(self):
+        responses = {"AlleJo02": [http_error(503), profile_page("Josh Allen")], "AlleJo09": [http_error(404)]}
+
+        def get_page(url):
+            response = responses[url.rsplit("/", 1)[1][:-len(".htm")]].pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        with patch.object(Stats, "get_page", get_page):
+            with self.assertRaises(HTTPError):
+                PlayerProfile.fetch("AlleJo02")
+            self.assertEqual(PlayerProfile.fetch("AlleJo02").name, "Josh Allen")
+            self.assertIsNone(PlayerProfile.fetch("AlleJo09"))
+            self.assertIsNone(PlayerProfile.fetch("AlleJo09"))
+
+    @patch("nfl.nfl_stats.time.time")
+    def test_profiles_expire(self, mock_time):
+        names = ["Josh Allen", "Joshua Allen"]
+        with patch.object(Stats, "get_page", lambda url: profile_page(names.pop(0))):
+            mock_time.return_value = 1000
+            self.assertEqual(PlayerProfile.fetch("AlleJo02").name, "Josh Allen")
+            mock_time.return_value = 1000 + PlayerProfile.ttl - 1
+            self.assertEqual(PlayerProfile.fetch("AlleJo02").name, "Josh Allen")
+            mock_time.return_value = 1000 + PlayerProfile.ttl
+            self.assertEqual(PlayerProfile.fetch("AlleJo02").name, "Joshua Allen")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from nfl.pfr_id_overrides import PFRIdOverrides
+
+
+class TestPFRIdOverrides(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.overrides_file = os.path.join(self.temp_dir.name, "pfr_id_overrides.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unique_cases_are_known(self):
+        self.assertEqual(PFRIdOverrides(self.overrides_file).lookup("5840"), (True, "AlleJo03"))
+
+    def test_unknown_player_has_to_be_guessed(self):
+        self.assertEqual(PFRIdOverrides(self.overrides_file).lookup("11632"), (False, None))
+
+    def test_resolved_guess_is_persisted(self):
+        PFRIdOverrides(self.overrides_file).resolve("11632", "NabeMa00")
+        self.assertEqual(PFRIdOverrides(self.overrides_file).lookup("11632"), (True, "NabeMa00"))
+
+    @patch("nfl.pfr_id_overrides.time.time")
+    def test_misses_expire(self, mock_time):
+        overrides = PFRIdOverrides(self.overrides_file, miss_expiry=100)
+        mock_time.return_value = 1000
+        overrides.miss("11632")
+        mock_time.return_value = 1100
+        self.assertEqual(overrides.lookup("11632"), (True, None))
+        mock_time.return_value = 1101
+        self.assertEqual(overrides.lookup("11632"), (False, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import importlib.util
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+from requests.exceptions import HTTPError
+
+from nfl.crawler import HostRateLimiter
+from nfl.http_cache import ResponseCache
+from nfl.http_client import HTTPClient
+from nfl.pfr_standin import PFRStandin, RECORDED_ORIGIN
+
+LXML_INSTALLED = importlib.util.find_spec("lxml") is not None
+
+
+class TestPFRStandin(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.client = HTTPClient(backoff_base=0.01, limiter=HostRateLimiter(requests_per_minute=60000, burst=100),
+                                 cache=ResponseCache(self.temp_dir.name))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_serves_player_and_gamelog_pages(self):
+        players = {"AlleJo02": {"name": "Josh Allen", "birth_date": "1996-05-21", "seasons": [2022, 2023]}}
+        with PFRStandin(players=players) as standin:
+            page = self.client.get_text(f"{standin.url}/players/A/AlleJo02.htm")
+            gamelog = self.client.get_text(f"{standin.url}/players/A/AlleJo02/gamelog/2023/")
+            no_games = self.client.get_text(f"{standin.url}/players/A/AlleJo02/gamelog/2019/")
+        self.assertIn("Josh Allen", page)
+        self.assertIn('data-birth="1996-05-21"', page)
+        self.assertIn('<th colspan="6">Passing</th>', gamelog)
+        self.assertNotIn("<table", no_games)
+
+    def test_unknown_ids_404(self):
+        with PFRStandin(players={"AlleJo02": {}}, missing={"AlleJo02"}) as standin:
+            for path in ("/players/A/AlleJo02.htm", "/players/A/AlleJo03.htm", "/players/B/AlleJo02.htm", "/players/A/"):
+                with self.assertRaises(HTTPError) as raised:
+                    self.client.get(f"{standin.url}{path}")
+                self.assertEqual(raised.exception.response.status_code, 404)
+
+    def test_bursts_send_retry_after_and_client_retries(self):
+        with PFRStandin(burst_every=1, burst_length=2, burst_status=503, retry_after=0) as standin:
+            url = f"{standin.url}/players/A/AlleJo02.htm"
+            self.assertEqual(requests.get(url).status_code, 200)
+            response = requests.get(url)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers["Retry-After"], "0")
+            self.assertEqual(requests.get(url).status_code, 503)
+
+            self.assertIn("Alle", self.client.get(url).text)
+            self.client.get(url)
+            counters = standin.counters()
+        self.assertEqual(self.client.counters()["retries"], 2)
+        self.assertEqual(counters["requests"], 7)
+        self.assertEqual(counters["statuses"], {200: 3, 503: 4})
+
+    def test_latency(self):
+        latencies = []
+        with PFRStandin(latency=lambda: latencies.append(1) or 0.01) as standin:
+            self.client.get(f"{standin.url}/players/A/AlleJo02.htm")
+        self.assertEqual(latencies, [1])
+
+    def test_serves_recorded_pages(self):
+        recordings = ResponseCache(self.temp_dir.name, ttl_policy=lambda url: None)
+        recordings.put(f"{RECORDED_ORIGIN}/players/A/AlleJo02.htm", "<h1>Recorded</h1>")
+        with PFRStandin(recordings=recordings, players={}) as standin:
+            self.assertEqual(self.client.get(f"{standin.url}/players/A/AlleJo02.htm").text, "<h1>Recorded</h1>")
+
+    @unittest.skipUnless(LXML_INSTALLED, "pandas.read_html needs lxml")
+    def test_pfr_base_url_points_the_fetchers_at_the_standin(self):
+        from nfl.nfl_stats import PlayerProfile, Stats
+        players = {"AlleJo02": {"name": "Josh Allen", "position": "QB", "birth_date": "1996-05-21", "seasons": [2022, 2023]}}
+        with PFRStandin(players=players) as standin, patch("nfl.nfl_stats.PFR_BASE_URL", standin.url), \
+                patch("nfl.nfl_stats.http_client", self.client):
+            PlayerProfile.clear()
+            profile = PlayerProfile.fetch("AlleJo02")
+            gamelogs = Stats(year=2023, pfr_player_id="AlleJo02").gamelogs_data()
+            PlayerProfile.clear()
+        self.assertEqual((profile.name, profile.position, profile.birth_date), ("Josh Allen", "QB", "1996-05-21"))
+        self.assertEqual(profile.seasons, ["2022", "2023"])
+        self.assertEqual(len(gamelogs), 17)
+
+
+if __name__ == '__main__':
+    unittest.main()
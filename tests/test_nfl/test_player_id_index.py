@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from nfl.player_id_index import PlayerIdIndex, _clean_id
+
+
+class TestPlayerIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.temp_dir.name, "player_id_index.pickle")
+        self.index = PlayerIdIndex({
+            "4984": ("AlleJo02", "00-0034857", "3918298", "Josh Allen"),
+            "11632": (None, "00-0039150", None, "Some Rookie"),
+        })
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lookups(self):
+        self.assertEqual(self.index.pfr_id("4984"), "AlleJo02")
+        self.assertEqual(self.index.gsis_id(4984), "00-0034857")
+        self.assertEqual(self.index.espn_id("4984"), "3918298")
+        self.assertEqual(self.index.name("4984"), "Josh Allen")
+        self.assertIsNone(self.index.pfr_id("11632"))
+        self.assertIsNone(self.index.pfr_id("0"))
+        self.assertIsNone(self.index.get("0"))
+        self.assertEqual(self.index.get("11632")["name"], "Some Rookie")
+        self.assertIn("4984", self.index)
+
+    def test_save_and_load_round_trip(self):
+        self.index.save(self.index_file)
+        PlayerIdIndex._loaded.clear()
+        loaded = PlayerIdIndex.load(self.index_file)
+        self.assertEqual(loaded.records, self.index.records)
+        self.assertIs(PlayerIdIndex.load(self.index_file), loaded)
+
+    def test_clean_id_handles_pandas_values(self):
+        self.assertEqual(_clean_id(4984.0), "4984")
+        self.assertIsNone(_clean_id(float("nan")))
+        self.assertEqual(_clean_id("AlleJo02"), "AlleJo02")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from nfl.player_store import PlayerStore, PlayerStoreMismatch, OPEN_ATTEMPTS
+
+PLAYERS = {
+    "4984": {"player_id": "4984", "first_name": "Josh", "last_name": "Allen", "position": "QB", "fantasy_positions": ["QB"],
+             "team": "BUF", "number": 17, "news_updated": 1700000000, "search_rank": 20},
+    "3161": {"player_id": "3161", "first_name": "T.J.", "last_name": "Watt", "position": "LB", "fantasy_positions": ["LB"],
+             "team": "PIT", "number": 90},
+}
+
+
+class TestPlayerStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_file = os.path.join(self.temp_dir.name, "player_data.jsonl")
+        PlayerStore.write(self.store_file, iter(PLAYERS.items()))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_reads_single_records_and_drops_unused_fields(self):
+        store = PlayerStore.open(self.store_file)
+        self.assertEqual(len(store), 2)
+        self.assertIn("3161", store)
+        self.assertNotIn("1", store)
+        self.assertEqual(store["4984"]["first_name"], "Josh")
+        self.assertEqual(store["4984"]["fantasy_positions"], ["QB"])
+        self.assertNotIn("news_updated", store["4984"])
+        self.assertIsNone(store["3161"]["birth_date"])
+        with self.assertRaises(KeyError):
+            store["1"]
+
+    def test_open_reuses_store_until_rewritten(self):
+        store = PlayerStore.open(self.store_file)
+        self.assertIs(PlayerStore.open(self.store_file), store)
+        PlayerStore.write(self.store_file, iter([("4984", PLAYERS["4984"])]))
+        os.utime(PlayerStore.index_file_for(self.store_file), (1, 1))
+        self.assertEqual(list(PlayerStore.open(self.store_file)), ["4984"])
+
+    def test_reopen_leaves_the_previous_store_readable(self):
+        store = PlayerStore.open(self.store_file)
+        PlayerStore.write(self.store_file, iter([("4984", PLAYERS["4984"])]))
+        os.utime(PlayerStore.index_file_for(self.store_file), (1, 1))
+        self.assertEqual(list(PlayerStore.open(self.store_file)), ["4984"])
+        # A caller still holding the old store keeps reading the players it was opened with.
+        self.assertFalse(store._data.closed)
+        self.assertEqual(store["3161"]["last_name"], "Watt")
+
+    def test_index_from_another_write_is_rejected(self):
+        index_file = PlayerStore.index_file_for(self.store_file)
+        old_index_file = f"{index_file}.old"
+        shutil.copyfile(index_file, old_index_file)
+        PlayerStore.write(self.store_file, iter([("3161", PLAYERS["3161"]), ("4984", PLAYERS["4984"])]))
+        new_index_file = f"{index_file}.new"
+        shutil.copyfile(index_file, new_index_file)
+        # A reader between the writer's two replaces: new data, old index.
+        shutil.copyfile(old_index_file, index_file)
+        os.utime(index_file, (2, 2))
+        with self.assertRaises(PlayerStoreMismatch):
+            PlayerStore(self.store_file)
+
+        with patch("nfl.player_store.time.sleep") as mock_sleep:
+            with self.assertRaises(PlayerStoreMismatch):
+                PlayerStore.open(self.store_file)
+            self.assertEqual(mock_sleep.call_count, OPEN_ATTEMPTS - 1)
+
+            # The writer finishes while open() is waiting.
+            mock_sleep.side_effect = lambda seconds: shutil.copyfile(new_index_file, index_file)
+            store = PlayerStore.open(self.store_file)
+        self.assertEqual(list(store), ["3161", "4984"])
+        self.assertEqual(store["3161"]["last_name"], "Watt")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from nfl.refresh_manifest import RefreshManifest
+
+
+@patch("nfl.refresh_manifest.current_nfl_season", return_value=2024)
+class TestRefreshManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unknown_player_needs_full_refresh(self, mock_season):
+        self.assertIsNone(RefreshManifest.for_database(self.database_file).seasons_to_refresh("5840"))
+
+    def test_only_open_and_missing_seasons_are_refreshed(self, mock_season):
+        manifest = RefreshManifest.for_database(self.database_file)
+        for season in ["2019", "2020", "2021", "2022"]:
+            manifest.record("5840", season)
+        self.assertEqual(manifest.seasons_to_refresh("5840", current_season=2024), ["2023", "2024"])
+
+    def test_current_season_stays_open_across_saves(self, mock_season):
+        manifest = RefreshManifest.for_database(self.database_file)
+        manifest.record("5840", "2023")
+        manifest.record("5840", "2024")
+        manifest.save()
+        manifest = RefreshManifest.for_database(self.database_file)
+        self.assertTrue(manifest.data["5840"]["2023"]["complete"])
+        self.assertFalse(manifest.data["5840"]["2024"]["complete"])
+        self.assertEqual(manifest.seasons_to_refresh("5840", current_season=2024), ["2024"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from nfl.roster_diff import RosterDiff, RosterSnapshot
+
+OLD_LEAGUE_DATA = [
+    {"owner_id": "1", "players_data": [{"Josh Allen": [{"player_id": "4984"}]}, {"T.J. Watt": [{"player_id": "3161"}]}]},
+    {"owner_id": "2", "players_data": [{"Tyreek Hill": [{"player_id": "3321"}]}, {"Derrick Henry": [{"player_id": "3198"}]}]},
+    {"owner_id": "3", "players_data": [{"Travis Kelce": [{"player_id": "1466"}]}]},
+]
+
+
+class TestRosterDiff(unittest.TestCase):
+
+    def test_adds_drops_moves_and_trades(self):
+        old = RosterSnapshot.from_league_data(OLD_LEAGUE_DATA)
+        new = RosterSnapshot.from_owner_data([
+            {"owner_id": "1", "players_data": ["4984", "3321"]},
+            {"owner_id": "2", "players_data": ["3198", "3161", "9999"]},
+            {"owner_id": "3", "players_data": []},
+        ])
+        diff = RosterDiff(old, new)
+        self.assertEqual(diff.adds, {"1": ("3321",), "2": ("3161", "9999"), "3": ()})
+        self.assertEqual(diff.drops, {"1": ("3161",), "2": ("3321",), "3": ("1466",)})
+        self.assertEqual(diff.moves, [("3161", "1", "2"), ("3321", "2", "1")])
+        self.assertEqual(diff.trades, [("1", "2", ("3161",), ("3321",))])
+        self.assertTrue(diff)
+
+    def test_one_way_move_is_not_a_trade(self):
+        old = RosterSnapshot({"1": ["4984"], "2": []})
+        diff = RosterDiff(old, RosterSnapshot({"1": [], "2": ["4984"]}))
+        self.assertEqual(diff.moves, [("4984", "1", "2")])
+        self.assertEqual(diff.trades, [])
+
+    def test_unchanged_rosters(self):
+        old = RosterSnapshot.from_league_data(OLD_LEAGUE_DATA)
+        diff = RosterDiff(old, RosterSnapshot.from_league_data(OLD_LEAGUE_DATA))
+        self.assertFalse(diff)
+        self.assertEqual(diff.moves, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
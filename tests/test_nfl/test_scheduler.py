@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from nfl.crawler import TokenBucket
+from nfl.scheduler import RefreshJob, RefreshScheduler, after_game_days, every, league_refresh_budgets, league_refresh_jobs
+
+
+class FakeClock:
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRefreshScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.temp_dir.name, "refresh_schedule.json")
+        self.clock = FakeClock()
+        self.runs = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def job(self, name, interval, priority=10, budget=None, fail=False):
+        def run():
+            self.runs.append(name)
+            if fail:
+                raise RuntimeError("Sleeper is down")
+        return RefreshJob(name, run, every(interval), priority=priority, budget=budget)
+
+    def test_runs_due_jobs_by_priority_and_persists_next_runs(self):
+        scheduler = RefreshScheduler([self.job("slow", 60, priority=2), self.job("fast", 10, priority=0)],
+                                     state_file=self.state_file, clock=self.clock)
+        self.assertEqual(scheduler.run_pending(), ["fast", "slow"])
+        self.assertEqual(scheduler.run_pending(), [])
+        with open(self.state_file) as file:
+            self.assertEqual(json.load(file), {"fast": 1010.0, "slow": 1060.0})
+
+        self.clock.now = 1015.0
+        self.assertEqual(scheduler.run_pending(), ["fast"])
+
+        restarted = RefreshScheduler([self.job("slow", 60), self.job("fast", 10)], state_file=self.state_file, clock=self.clock)
+        self.assertEqual(restarted.next_runs(), {"fast": 1025.0, "slow": 1060.0})
+
+    def test_schedule_dedupes(self):
+        scheduler = RefreshScheduler([self.job("a", 10)], state_file=self.state_file, clock=self.clock)
+        self.assertFalse(scheduler.schedule("a", 2000.0))
+        self.assertEqual(scheduler.run_pending(), ["a"])
+        self.assertTrue(scheduler.schedule("a"))
+        self.assertFalse(scheduler.schedule("a"))
+        self.assertEqual(scheduler.run_pending(), ["a"])
+        self.assertEqual(self.runs, ["a", "a"])
+
+    def test_budget_and_failures_delay_jobs(self):
+        budget = TokenBucket(rate=1 / 100, capacity=1, clock=self.clock)
+        scheduler = RefreshScheduler([self.job("limited", 1, budget="pfr"), self.job("broken", 3600, fail=True)],
+                                     state_file=self.state_file, budgets={"pfr": budget}, clock=self.clock)
+        self.assertEqual(sorted(scheduler.run_pending()), ["broken", "limited"])
+        self.clock.now = 1001.0
+        self.assertEqual(scheduler.run_pending(), [])
+        self.assertEqual(scheduler.next_runs(), {"limited": 1100.0, "broken": 1900.0})
+
+    def test_budgets_survive_a_restart(self):
+        budget = TokenBucket(rate=1 / 100, capacity=1, clock=self.clock)
+        scheduler = RefreshScheduler([self.job("limited", 1, budget="pfr")], state_file=self.state_file,
+                                     budgets={"pfr": budget}, clock=self.clock)
+        self.assertEqual(scheduler.run_pending(), ["limited"])
+
+        # A fresh bucket starts full, the saved state says the token was spent 30s ago.
+        self.clock.now = 1030.0
+        restarted = RefreshScheduler([self.job("limited", 1, budget="pfr")], state_file=self.state_file,
+                                     budgets={"pfr": TokenBucket(rate=1 / 100, capacity=1, clock=self.clock)}, clock=self.clock)
+        self.assertEqual(restarted.run_pending(), [])
+        self.assertEqual(restarted.next_runs(), {"limited": 1100.0})
+        self.clock.now = 1100.0
+        self.assertEqual(restarted.run_pending(), ["limited"])
+
+    def test_after_game_days(self):
+        thursday_night = datetime(2024, 9, 5, 23, 0).timestamp()
+        self.assertEqual(datetime.fromtimestamp(after_game_days(thursday_night)), datetime(2024, 9, 6, 6, 0))
+        friday = datetime(2024, 9, 6, 6, 0).timestamp()
+        self.assertEqual(datetime.fromtimestamp(after_game_days(friday)), datetime(2024, 9, 9, 6, 0))
+
+    def test_after_game_days_skips_the_offseason(self):
+        last_february_refresh = datetime(2025, 2, 28, 6, 0).timestamp()
+        # Nothing runs until the first refresh weekday in September.
+        self.assertEqual(datetime.fromtimestamp(after_game_days(last_february_refresh)), datetime(2025, 9, 1, 6, 0))
+
+    @patch("nfl.sleeper_api.FantasyLeagueDatabase")
+    def test_current_season_gamelogs_only_crawl_in_season(self, mock_league_database):
+        jobs = {job.name: job for job in league_refresh_jobs("1", database_file="leagueid_1.json")}
+        job = jobs["current_season_gamelogs"]
+        self.assertIn(job.budget, league_refresh_budgets())
+        update_players_stats = mock_league_database.return_value.update_players_stats
+
+        with patch("nfl.scheduler.in_season", return_value=False):
+            job.run()
+        update_players_stats.assert_not_called()
+        with patch("nfl.scheduler.in_season", return_value=True), patch("nfl.scheduler.current_nfl_season", return_value=2024):
+            job.run()
+        update_players_stats.assert_called_once_with("leagueid_1.json", years=["2024"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.run_benchmarks import SCORING_SETTINGS
+from benchmarks.synthetic_league import SyntheticLeague
+from nfl.nfl_stats import NFLStatsDatabase
+from nfl.scoring import ScoringEngine, stat_weight_from_scoring_settings
+from nfl.stats_store import LeagueStatsStore
+
+# Every kind of cell the per cell loop ran into: numbers as str and float, "null", "Inactive", rows missing from some
+# columns, stats no setting weights, and a season without any weighted stat.
+LEAGUE_DATA = [
+    {
+        "owner_id": "1",
+        "display_name": "owner_one",
+        "team_name": "Team One",
+        "players_data": [
+            {"Josh Allen": [
+                {"player_id": "4984", "position": "QB"},
+                {"2022_stats": {
+                    "Week": {"0": 1, "1": 2, "2": 3},
+                    "Passing_Yds": {"0": "297", "1": "Inactive", "2": 263},
+                    "Passing_TD": {"0": 2, "1": "Inactive", "2": "null"},
+                    "Passing_Int": {"0": "1", "2": 0},
+                    "Passing_Cmp%": {"0": 64.7, "1": "Inactive", "2": 71.0},
+                    "Rushing_Yds": {"0": 37, "1": "Inactive", "2": "-3"},
+                    "Off. Snaps_Pct": {"0": "100%", "1": "Inactive", "2": "97%"},
+                }},
+                {"2023_stats": {"Week": {"0": 1}, "Passing_Yds": {"0": 236.0}, "Fumbles_FL": {"0": "null"}}},
+            ]},
+            {"Harrison Butker": [
+                {"player_id": "4227", "position": "K"},
+                {"2023_stats": {"Week": {"0": 1, "1": 2}, "Scoring_XPM": {"0": 3, "1": 1}}},
+            ]},
+        ],
+    },
+    {
+        "owner_id": "2",
+        "display_name": "owner_two",
+        "team_name": "Team Two",
+        "players_data": [
+            {"T.J. Watt": [
+                {"player_id": "3161", "position": "LB"},
+                {"2023_stats": {
+                    "Week": {"0": 1, "1": 2},
+                    "Sk": {"0": "3.0", "1": 0.5},
+                    "Tackles_Solo": {"0": 4, "1": "Did Not Play"},
+                    "Tackles_Ast": {"1": 2},
+                    "Def. Snaps_Pct": {"0": "85%", "1": "91%"},
+                }},
+            ]},
+        ],
+    },
+]
+
+
+def per_cell_fantasy_points(database_data, stat_weight):
+    """
+    The per cell loop calculate_fantasy_points() ran before scoring moved to a matrix product.
+    :return: dict, (player_id, year) -> {row: fantasy points}, seasons without weighted stats are left out
+    """
+    points = {}
+    for roster in database_data:
+        for player_data in roster['players_data']:
+            for player_name, stats in player_data.items():
+                for stat_dict in stats[1:]:
+                    for year, stats_table in stat_dict.items():
+                        combined_stats = {}
+                        for stat_key, week_stats in stats_table.items():
+                            if stat_key not in stat_weight:
+                                continue
+                            for index, stat_value in week_stats.items():
+                                try:
+                                    fantasy_points = stat_weight[stat_key] * float(stat_value)
+                                except (ValueError, TypeError):
+                                    fantasy_points = 0
+                                combined_stats[index] = combined_stats.get(index, 0) + round(fantasy_points, 2)
+                        if combined_stats:
+                            points[(stats[0]['player_id'], year)] = combined_stats
+    return points
+
+
+class TestCalculateFantasyPoints(unittest.TestCase):
+    """
+    The matrix product has to score every cell like the per cell loop it replaced did.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        # Leave settings unset (None) too, the loop scored those 0.
+        self.league = SimpleNamespace(scoring_settings=SimpleNamespace(**{**SCORING_SETTINGS, "idp_tkl_ast": None}))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assert_matches_per_cell_loop(self, database_data):
+        with open(self.database_file, "w") as file:
+            json.dump(database_data, file)
+        expected = per_cell_fantasy_points(copy.deepcopy(database_data), stat_weight_from_scoring_settings(self.league.scoring_settings))
+
+        NFLStatsDatabase(self.database_file, self.league).calculate_fantasy_points()
+
+        with open(self.database_file) as file:
+            scored = json.load(file)
+        actual = {}
+        for roster in scored:
+            for player_data in roster['players_data']:
+                for stats in player_data.values():
+                    for stat_dict in stats[1:]:
+                        for year, stats_table in stat_dict.items():
+                            if "fantasy_points" in stats_table:
+                                actual[(stats[0]['player_id'], year)] = stats_table["fantasy_points"]
+        self.assertEqual(actual.keys(), expected.keys())
+        for season, season_points in expected.items():
+            self.assertEqual(actual[season].keys(), season_points.keys(), season)
+            for row, points in season_points.items():
+                # The loop summed without rounding, so allow its float error: 2e-13, relative past 1 point.
+                self.assertAlmostEqual(actual[season][row], points, delta=2e-13 * max(1.0, abs(points)), msg=(season, row))
+        return actual
+
+    def test_matches_per_cell_loop(self):
+        actual = self.assert_matches_per_cell_loop(LEAGUE_DATA)
+        self.assertEqual(actual[("4984", "2022_stats")], {"0": 21.58, "1": 0.0, "2": 10.22})
+        self.assertNotIn(("4227", "2023_stats"), actual)
+
+    def test_matches_per_cell_loop_on_synthetic_league(self):
+        league = SyntheticLeague(teams=2, roster_size=6, seasons=2, games_per_season=6, seed=3)
+        self.assert_matches_per_cell_loop(league.league_data)
+
+
+class TestScoreWhatIf(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        with open(self.database_file, "w") as file:
+            json.dump(LEAGUE_DATA, file)
+        self.settings = SimpleNamespace(**SCORING_SETTINGS)
+        # Settings as is, full PPR and a dict that weights a stat the settings don't know.
+        self.configs = [
+            self.settings,
+            {**stat_weight_from_scoring_settings(self.settings), "Receiving_Rec": 1},
+            {"Passing_TD": 6, "Scoring_XPM": 1},
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_points_are_seasons_by_games_by_configs(self):
+        keys, scores = NFLStatsDatabase(self.database_file, SimpleNamespace(scoring_settings=self.settings)).score_what_if(self.configs)
+
+        self.assertEqual(keys, [("4984", "Josh Allen", "2022_stats"), ("4984", "Josh Allen", "2023_stats"),
+                                ("4227", "Harrison Butker", "2023_stats"), ("3161", "T.J. Watt", "2023_stats")])
+        self.assertEqual(scores.points.shape, (4, 3, 3))
+        self.assertEqual(scores.rows, [["0", "1", "2"], ["0"], ["0", "1"], ["0", "1"]])
+        # Seasons shorter than the longest are padded with NaN.
+        self.assertTrue(np.isnan(scores.points[1, 1:]).all())
+        np.testing.assert_allclose(scores.season_totals(), np.nansum(scores.points, axis=1))
+
+    def test_each_config_matches_a_single_config_run(self):
+        keys, scores = NFLStatsDatabase(self.database_file, SimpleNamespace(scoring_settings=self.settings)).score_what_if(self.configs)
+        stats_tables = [stats_table for roster in LEAGUE_DATA for player_data in roster['players_data']
+                        for stats in player_data.values() for stat_dict in stats[1:] for stats_table in stat_dict.values()]
+
+        for c, config in enumerate(self.configs):
+            stat_weight = config if isinstance(config, dict) else stat_weight_from_scoring_settings(config)
+            for i, season_points in enumerate(ScoringEngine(stat_weight).score(stats_tables)):
+                games = len(scores.rows[i])
+                self.assertEqual(list(season_points), scores.rows[i][:len(season_points)], keys[i])
+                # A season without any of this config's stats scores 0 here and {} on its own.
+                expected = [season_points.get(row, 0.0) for row in scores.rows[i]]
+                np.testing.assert_allclose(scores.points[i, :games, c], expected, rtol=0, atol=2e-13, err_msg=str((keys[i], c)))
+
+    def test_reads_the_stats_store_when_there_is_one(self):
+        database = NFLStatsDatabase(self.database_file, SimpleNamespace(scoring_settings=self.settings))
+        keys, scores = database.score_what_if(self.configs)
+        with LeagueStatsStore.for_database(self.database_file) as store:
+            store.import_league(LEAGUE_DATA)
+
+        with patch("builtins.open", side_effect=AssertionError("read the json database")):
+            store_keys, store_scores = database.score_what_if(self.configs)
+
+        # The store orders seasons by player_id.
+        order = [keys.index(key) for key in store_keys]
+        self.assertEqual(sorted(order), list(range(len(keys))))
+        self.assertEqual(store_scores.rows, [scores.rows[i] for i in order])
+        np.testing.assert_array_equal(store_scores.points, scores.points[order])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from nfl import sleeper_api
+from nfl.crawl_journal import CrawlJournal
+from nfl.nfl_stats import Stats
+from nfl.player_id_index import PlayerIdIndex
+from nfl.refresh_manifest import RefreshManifest
+from nfl.sleeper_api import FantasyLeagueDatabase, LeagueSession
+from nfl.stats_store import LeagueStatsStore
+
+# Sleeper ID -> (PFR ID, name), every player has a PFR ID so nothing is guessed.
+PLAYERS = {
+    "4984": ("AlleJo02", "Josh Allen", "QB"),
+    "2449": ("DiggSt00", "Stefon Diggs", "WR"),
+    "3161": ("WattTJ99", "T.J. Watt", "LB"),
+    "1466": ("KelcTr00", "Travis Kelce", "TE"),
+}
+
+
+def details(player_id):
+    first_name, last_name = PLAYERS[player_id][1].split(" ", 1)
+    return {"player_id": player_id, "first_name": first_name, "last_name": last_name, "position": PLAYERS[player_id][2]}
+
+
+def league_data():
+    return [
+        {"owner_id": "1", "display_name": "owner_one", "team_name": "Team One", "players_data": [
+            {"Josh Allen": [details("4984"), {"2022_stats": {"Week": {"0": 1}, "Passing_Yds": {"0": 297}}}]},
+            {"Stefon Diggs": [details("2449"), {"2022_stats": {"Week": {"0": 1}, "Receiving_Yds": {"0": 148}}}]},
+        ]},
+        {"owner_id": "2", "display_name": "owner_two", "team_name": "Team Two", "players_data": [
+            {"T.J. Watt": [details("3161"), {"2022_stats": {"Week": {"0": 1}, "Sk": {"0": 3}}}]},
+            {"Travis Kelce": [details("1466"), {"2022_stats": {"Week": {"0": 1}, "Receiving_Yds": {"0": 103}}}]},
+        ]},
+    ]
+
+
+class LeagueDatabaseTestCase(unittest.TestCase):
+    """
+    A league database in a temp directory, with Sleeper and PFR patched out. Every gamelog PFR serves has one row whose
+    Yds is the season, except seasons in self.no_page, which 404.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_file = os.path.join(self.temp_dir.name, "leagueid_1.json")
+        with open(self.database_file, "w") as file:
+            json.dump(league_data(), file)
+        self.requested = []
+        self.no_page = set()
+        player_id_index = PlayerIdIndex({player_id: (pfr_id, None, None, name) for player_id, (pfr_id, name, _) in PLAYERS.items()})
+        player_data = {player_id: details(player_id) for player_id in PLAYERS}
+        self.initialize_league_data = patch.object(FantasyLeagueDatabase, "initialize_league_data",
+                                                   return_value=([], [], player_data, player_id_index)).start()
+        patch.object(Stats, "gamelogs_data", lambda stats: self.gamelogs(stats.pfr_player_id, stats.year)).start()
+        self.addCleanup(patch.stopall)
+        self.league = FantasyLeagueDatabase("1")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def gamelogs(self, pfr_player_id, year):
+        self.requested.append((pfr_player_id, str(year)))
+        if (pfr_player_id, str(year)) in self.no_page:
+            return None
+        return pd.DataFrame({"Week": [1], "Yds": [year]})
+
+    def database(self):
+        with open(self.database_file) as file:
+            return json.load(file)
+
+    @staticmethod
+    def seasons(database):
+        """
+        :return: dict, player_id -> {season key: stats table}
+        """
+        return {stats[0]['player_id']: {key: table for stat_dict in stats[1:] for key, table in stat_dict.items()}
+                for roster in database for player in roster['players_data'] for stats in player.values()}
+
+
+class TestLeagueSession(LeagueDatabaseTestCase):
+
+    def test_loads_once_and_writes_once(self):
+        with patch("nfl.sleeper_api.open", wraps=open, create=True) as mock_open, \
+                patch("nfl.sleeper_api.atomic_write_json", wraps=sleeper_api.atomic_write_json) as mock_write:
+            self.league.update_players_stats(self.database_file, years=["2023"])
+
+        self.assertEqual(self.initialize_league_data.call_count, 1)
+        self.assertEqual([call.args[0] for call in mock_open.call_args_list], [self.database_file])
+        self.assertEqual([call.args[0] for call in mock_write.call_args_list], [self.database_file])
+        self.assertEqual(len(self.requested), len(PLAYERS))
+        self.assertEqual({player_id: seasons["2023_stats"]["Yds"] for player_id, seasons in self.seasons(self.database()).items()},
+                         {player_id: {"0": 2023} for player_id in PLAYERS})
+
+    def test_exception_leaves_every_file_untouched(self):
+        with open(self.database_file) as file:
+            before = file.read()
+
+        with self.assertRaises(ValueError):
+            with LeagueSession(self.league.league, self.database_file) as session:
+                session.refresh_players(PLAYERS, years=["2023"])
+                session.apply_roster_changes([{"owner_id": "1", "players": [], "players_delete": ["4984"]}])
+                raise ValueError
+
+        with open(self.database_file) as file:
+            self.assertEqual(file.read(), before)
+        self.assertEqual(self.requested, [])
+        self.assertEqual(os.listdir(self.temp_dir.name), ["leagueid_1.json"])
+
+    def test_database_store_manifest_and_journal_agree(self):
+        self.no_page = {("AlleJo02", "2023"), ("KelcTr00", "2022")}
+
+        with LeagueSession(self.league.league, self.database_file) as session:
+            session.apply_roster_changes([{"owner_id": "2", "players": [], "players_delete": ["3161"]}])
+            session.refresh_players(session.rostered_player_ids(), years=["2022", "2023"])
+
+        database = self.database()
+        with LeagueStatsStore.for_database(self.database_file) as store:
+            self.assertEqual(store.export_league(), database)
+        # Seasons without a page keep what the database had, and aren't marked as fetched.
+        seasons = self.seasons(database)
+        self.assertEqual(seasons["4984"]["2022_stats"]["Yds"], {"0": 2022})
+        self.assertNotIn("2023_stats", seasons["4984"])
+        self.assertEqual(seasons["1466"]["2022_stats"], {"Week": {"0": 1}, "Receiving_Yds": {"0": 103}})
+        self.assertNotIn("3161", seasons)
+        manifest = RefreshManifest.for_database(self.database_file)
+        self.assertEqual({player_id: sorted(seasons) for player_id, seasons in manifest.data.items()},
+                         {"4984": ["2022"], "2449": ["2022", "2023"], "1466": ["2023"]})
+        self.assertFalse(os.path.exists(CrawlJournal.for_database(self.database_file).journal_file))
+
+    def test_new_store_gets_every_player(self):
+        self.league.update_players_stats(self.database_file, player_ids={"1466"}, years=["2023"])
+        with LeagueStatsStore.for_database(self.database_file) as store:
+            self.assertEqual(store.export_league(), self.database())
+        self.league.update_players_stats(self.database_file, player_ids={"4984"}, years=["2023"])
+        with LeagueStatsStore.for_database(self.database_file) as store:
+            self.assertEqual(store.export_league(), self.database())
+
+
+class TestUpdatePlayersStats(LeagueDatabaseTestCase):
+
+    def updated(self):
+        """
+        :return: set of player_ids whose 2023 season is in the database
+        """
+        return {player_id for player_id, seasons in self.seasons(self.database()).items() if "2023_stats" in seasons}
+
+    def test_single_player_behind_another_on_the_roster(self):
+        # The old loop gave up on a roster at its first player that didn't match, Kelce is second on his.
+        self.league.update_player_stats_in_database(self.database_file, years=["2023"], update_player="1466")
+        self.assertEqual(self.requested, [("KelcTr00", "2023")])
+        self.assertEqual(self.updated(), {"1466"})
+
+    def test_many_players_across_rosters_in_one_write(self):
+        # Not in database order, and Kelce sits behind a player who isn't updated.
+        player_ids = ["1466", "4984", "2449"]
+        with patch("nfl.sleeper_api.atomic_write_json", wraps=sleeper_api.atomic_write_json) as mock_write:
+            self.league.update_players_stats(self.database_file, player_ids=set(player_ids), years=["2023"])
+
+        self.assertEqual(mock_write.call_count, 1)
+        self.assertEqual(sorted(self.requested), [("AlleJo02", "2023"), ("DiggSt00", "2023"), ("KelcTr00", "2023")])
+        self.assertEqual(self.updated(), set(player_ids))
+        # Roster and player order are kept.
+        self.assertEqual([list(player) for roster in self.database() for player in roster['players_data']],
+                         [["Josh Allen"], ["Stefon Diggs"], ["T.J. Watt"], ["Travis Kelce"]])
+
+    def test_years_per_player(self):
+        self.league.update_players_stats(self.database_file, player_ids={"1466", "2449"},
+                                         years={"1466": ["2022", "2023"], "2449": ["2023"]})
+        self.assertEqual(sorted(self.requested), [("DiggSt00", "2023"), ("KelcTr00", "2022"), ("KelcTr00", "2023")])
+        seasons = self.seasons(self.database())
+        self.assertEqual(seasons["1466"]["2022_stats"]["Yds"], {"0": 2022})
+        self.assertEqual(seasons["2449"]["2022_stats"], {"Week": {"0": 1}, "Receiving_Yds": {"0": 148}})
+
+
+if __name__ == '__main__':
+    unittest.main()
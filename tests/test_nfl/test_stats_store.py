@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from nfl.stats_store import LeagueStatsStore
+
+LEAGUE_DATA = [
+    {
+        "owner_id": "1",
+        "display_name": "owner_one",
+        "team_name": "Team One",
+        "players_data": [
+            {"Josh Allen": [
+                {"player_id": "4984", "position": "QB"},
+                {"2022_stats": {"Week": {"0": 1, "1": 2}, "Passing_Yds": {"0": "297", "1": "Inactive"}}},
+                {"2023_stats": {"Week": {"0": 1}, "Passing_Yds": {"0": 236}}},
+            ]},
+        ],
+    },
+    {
+        "owner_id": "2",
+        "display_name": "owner_two",
+        "team_name": "Team Two",
+        "players_data": [
+            {"T.J. Watt": [
+                {"player_id": "3161", "position": "LB"},
+                {"2023_stats": {"Week": {"0": 1}, "Sk": {"0": "3.0"}, "Def. Snaps_Pct": {"0": "85%"}}},
+            ]},
+        ],
+    },
+]
+
+
+class TestLeagueStatsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = LeagueStatsStore.for_database(os.path.join(self.temp_dir.name, "leagueid_1.json"))
+        self.store.import_league(LEAGUE_DATA)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_export_round_trips_league_data(self):
+        self.assertEqual(self.store.export_league(), LEAGUE_DATA)
+
+    def test_player_seasons_filters_by_season(self):
+        self.assertEqual(self.store.player_seasons("4984", seasons=[2023]),
+                         {"2023_stats": {"Week": {"0": 1}, "Passing_Yds": {"0": 236}}})
+
+    def test_stat_column_returns_numbers_across_league(self):
+        self.assertEqual(self.store.stat_column("Passing_Yds"), [("4984", 2022, 0, 297.0), ("4984", 2022, 1, None), ("4984", 2023, 0, 236.0)])
+        self.assertEqual(self.store.stat_column("Sk", seasons=[2023]), [("3161", 2023, 0, 3.0)])
+
+    def test_stat_cells_reads_several_stats(self):
+        self.assertEqual(self.store.stat_cells(["Sk", "Def. Snaps_Pct", "Passing_Yds"], seasons=[2023]), [
+            ("3161", 2023, 0, "Sk", 3.0, "3.0"),
+            ("3161", 2023, 0, "Def. Snaps_Pct", 85.0, "85%"),
+            ("4984", 2023, 0, "Passing_Yds", 236.0, 236),
+        ])
+
+    def test_season_tables_stream_player_seasons(self):
+        self.assertEqual(list(self.store.season_tables()), [
+            ("3161", 2023, {"Week": {"0": 1}, "Def. Snaps_Pct": {"0": "85%"}, "Sk": {"0": "3.0"}}),
+            ("4984", 2022, {"Week": {"0": 1, "1": 2}, "Passing_Yds": {"0": "297", "1": "Inactive"}}),
+            ("4984", 2023, {"Week": {"0": 1}, "Passing_Yds": {"0": 236}}),
+        ])
+        self.assertEqual(list(self.store.season_tables(["Passing_Yds"], seasons=[2022])),
+                         [("4984", 2022, {"Passing_Yds": {"0": "297", "1": "Inactive"}})])
+        self.assertEqual(self.store.player_season_keys(), [("3161", 2023), ("4984", 2022), ("4984", 2023)])
+
+    def test_stats_keep_their_column_order(self):
+        stats_table = {"Rk": {"0": 1, "1": 2}, "Year": {"0": 2023, "1": 2023}, "Passing_Yds": {"0": 236, "1": 0}, "Date": {"0": "2023-09-11"}}
+        self.store.upsert_seasons([("4984", 2023, stats_table)])
+        self.assertEqual(list(self.store.player_seasons("4984", seasons=[2023])["2023_stats"]), ["Rk", "Year", "Passing_Yds", "Date"])
+        self.assertEqual([list(table) for player_id, _, table in self.store.season_tables() if player_id == "4984"],
+                         [["Week", "Passing_Yds"], ["Rk", "Year", "Passing_Yds", "Date"]])
+        exported = self.store.export_league()[0]["players_data"][0]["Josh Allen"]
+        self.assertEqual(list(exported[2]["2023_stats"]), ["Rk", "Year", "Passing_Yds", "Date"])
+
+    def test_upsert_stat_replaces_one_column(self):
+        self.store.upsert_stat("fantasy_points", [("4984", 2023, {"0": 13.44})])
+        self.store.upsert_stat("Week", [("4984", 2023, {"0": 2})])
+        self.store.upsert_stat("fantasy_points", [("4984", 2023, {"0": 14.44})])
+        self.assertEqual(self.store.stat_column("fantasy_points"), [("4984", 2023, 0, 14.44)])
+        self.assertEqual(self.store.player_seasons("4984", seasons=[2023]),
+                         {"2023_stats": {"Week": {"0": 2}, "Passing_Yds": {"0": 236}, "fantasy_points": {"0": 14.44}}})
+        self.assertEqual(list(self.store.player_seasons("4984", seasons=[2023])["2023_stats"]), ["Week", "Passing_Yds", "fantasy_points"])
+
+    def test_failed_import_leaves_the_store_as_it_was(self):
+        broken = LEAGUE_DATA[:1] + [dict(LEAGUE_DATA[1], players_data=[{"T.J. Watt": [{"position": "LB"}]}])]
+        with self.assertRaises(KeyError):
+            self.store.import_league(broken)
+        self.assertEqual(self.store.export_league(), LEAGUE_DATA)
+
+    def test_sync_rosters_deletes_dropped_players(self):
+        self.store.sync_rosters(LEAGUE_DATA[:1] + [dict(LEAGUE_DATA[1], players_data=[])])
+        self.assertEqual(self.store.player_seasons("3161"), {})
+        self.assertEqual(self.store.rosters()[1]["players"], [])
+        self.assertIn("2022_stats", self.store.player_seasons("4984"))
+
+    def test_opens_a_store_from_before_column_order(self):
+        store_file = os.path.join(self.temp_dir.name, "old.sqlite")
+        with sqlite3.connect(store_file) as connection:
+            connection.execute("CREATE TABLE gamelogs (player_id TEXT NOT NULL, season INTEGER NOT NULL, row INTEGER NOT NULL, "
+                               "stat TEXT NOT NULL, num REAL, value, PRIMARY KEY (player_id, season, stat, row)) WITHOUT ROWID")
+            connection.execute("INSERT INTO gamelogs VALUES ('4984', 2023, 0, 'Week', 1.0, 1)")
+        connection.close()
+        with LeagueStatsStore(store_file) as store:
+            self.assertEqual(store.player_seasons("4984"), {"2023_stats": {"Week": {"0": 1}}})
+            store.upsert_stat("fantasy_points", [("4984", 2023, {"0": 14.44})])
+            self.assertEqual(list(store.player_seasons("4984")["2023_stats"]), ["Week", "fantasy_points"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+from nfl.transaction_log import TransactionIngester, TransactionLog
+
+
+def transaction(transaction_id, created, adds=None, drops=None, status="COMPLETE"):
+    return SimpleNamespace(transaction_id=transaction_id, type="FREE_AGENT", status=status, created=created, status_updated=created,
+                           creator="u1", roster_ids=sorted(set((adds or {}).values()) | set((drops or {}).values())),
+                           adds=adds, drops=drops, consenter_ids=[])
+
+
+class FakeLeague:
+    league_id = "1"
+
+    def __init__(self):
+        self.weeks = {}
+        self.requests = []
+
+    def get_transactions(self, week):
+        self.requests.append(week)
+        return self.weeks.get(week, [])
+
+    def get_league_rosters_by_id(self):
+        self.requests.append("rosters")
+        return [SimpleNamespace(roster_id=1, owner_id="owner1"), SimpleNamespace(roster_id=2, owner_id="owner2")]
+
+
+class TestTransactionLog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log = TransactionLog(os.path.join(self.temp_dir.name, "1_transactions.sqlite"))
+        self.league = FakeLeague()
+        self.ingester = TransactionIngester(self.league, self.log)
+
+    def tearDown(self):
+        self.log.close()
+        self.temp_dir.cleanup()
+
+    def test_poll_only_writes_new_transactions(self):
+        self.league.weeks[1] = [transaction("a", 1000, adds={"4984": 1})]
+        self.league.weeks[2] = [transaction("b", 2000, adds={"3161": 2}, drops={"4984": 1})]
+        self.assertEqual([t.transaction_id for t in self.ingester.poll(current_week=2)], ["a", "b"])
+        self.assertEqual(self.log.cursor("1"), (2, 2000, "b"))
+
+        self.league.requests.clear()
+        self.league.weeks[2].append(transaction("c", 3000, drops={"3161": 2}, status="FAILED"))
+        self.assertEqual([t.transaction_id for t in self.ingester.poll(current_week=2)], ["c"])
+        self.assertEqual(self.league.requests, [2])
+
+    def test_queries(self):
+        self.league.weeks[1] = [transaction("a", 1000, adds={"4984": 1}), transaction("b", 2000, adds={"3161": 2}, drops={"4984": 1})]
+        self.ingester.poll(current_week=1)
+        self.assertEqual([(row["transaction_id"], row["action"], row["owner_id"]) for row in self.log.by_player("4984")],
+                         [("a", "add", "owner1"), ("b", "drop", "owner1")])
+        self.assertEqual([row["player_id"] for row in self.log.by_owner("owner2")], ["3161"])
+        self.assertEqual([row["transaction_id"] for row in self.log.between(1500, datetime.fromtimestamp(3))], ["b", "b"])
+
+    def test_advances_cursor_without_transactions(self):
+        self.ingester.poll(current_week=3)
+        self.assertEqual(self.log.cursor("1"), (3, 0, None))
+        self.league.requests.clear()
+        self.ingester.poll(current_week=3)
+        self.assertEqual(self.league.requests, [3])
+
+
+if __name__ == '__main__':
+    unittest.main()